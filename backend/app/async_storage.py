@@ -0,0 +1,382 @@
+"""Async storage for the API's request handlers.
+
+The backends in ``app.storage`` are synchronous: called from an ``async def``
+endpoint, every round trip blocks the event loop and stalls all other
+requests behind it. The API uses the instances here instead; Celery tasks
+keep using the sync ones. Both read and write the same data.
+
+- ``AsyncRedisStorage`` talks to Redis through a ``redis.asyncio`` client
+  with a bounded connection pool (requests wait for a free connection
+  rather than opening unlimited ones).
+- ``AsyncCosmosStorage`` (in ``app.cosmos_storage``) uses
+  ``azure.cosmos.aio``; its client is created in the app lifespan by
+  ``open_async_storage()`` with a bounded connection pool.
+- ``ThreadedStorage`` runs a sync backend's calls in worker threads, for
+  backends without a native async client.
+
+The exported stores are wrapped in ``IdentityMappedStorage``: within one
+request (see ``IdentityMapMiddleware``) each key is read from the backend
+at most once.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import redis.asyncio as aioredis
+from fastapi import HTTPException
+
+from app import storage
+from app.cached_storage import AsyncCachedStorage, CachedStorage
+from app.config import settings
+from app.storage import UNIQUE_CLAIM, UNIQUE_RELEASE, RedisKeyspace, RedisStorage, StorageCodec, default_codec
+
+logger = logging.getLogger(__name__)
+
+async_redis_client = aioredis.Redis(
+    connection_pool=aioredis.BlockingConnectionPool.from_url(
+        settings.redis_url,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+    )
+)
+# Storage values may be binary (see ``StorageCodec``): read and written
+# through a second pool that doesn't decode responses
+async_redis_binary_client = aioredis.Redis(
+    connection_pool=aioredis.BlockingConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+    )
+)
+
+
+class AsyncRedisStorage(RedisKeyspace):
+    """Async counterpart of ``RedisStorage`` (same keys, TTLs, membership sets and indexes)."""
+
+    def __init__(
+        self,
+        prefix: str,
+        track_members: bool = False,
+        scan_count: int = 1000,
+        ttl_seconds: Optional[int] = None,
+        codec: Optional[StorageCodec] = None,
+    ):
+        self.prefix = prefix
+        self.track_members = track_members
+        self.scan_count = scan_count
+        self.ttl_seconds = ttl_seconds
+        self.codec = codec or default_codec
+
+    async def get(self, key: str) -> Optional[dict]:
+        data = await async_redis_binary_client.get(f"{self.prefix}:{key}")
+        return self.codec.decode(data) if data else None
+
+    async def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Get several values in one round trip. Missing keys are omitted."""
+        if not keys:
+            return {}
+        values = await async_redis_binary_client.mget([f"{self.prefix}:{key}" for key in keys])
+        return {key: self.codec.decode(data) for key, data in zip(keys, values) if data}
+
+    async def set(self, key: str, value: Any) -> None:
+        data = self.codec.encode(value)
+        if not self.track_members:
+            await async_redis_binary_client.set(f"{self.prefix}:{key}", data, ex=self.ttl_seconds)
+            return
+        pipe = async_redis_binary_client.pipeline()
+        pipe.set(f"{self.prefix}:{key}", data, ex=self.ttl_seconds)
+        pipe.sadd(self.members_key, key)
+        await pipe.execute()
+
+    async def set_many(self, items: dict[str, Any]) -> None:
+        """Set several values in one round trip (a pipeline)."""
+        if not items:
+            return
+        pipe = async_redis_binary_client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(f"{self.prefix}:{key}", self.codec.encode(value), ex=self.ttl_seconds)
+        if self.track_members:
+            pipe.sadd(self.members_key, *items)
+        await pipe.execute()
+
+    async def delete(self, key: str) -> None:
+        if not self.track_members:
+            await async_redis_client.delete(f"{self.prefix}:{key}")
+            return
+        pipe = async_redis_client.pipeline()
+        pipe.delete(f"{self.prefix}:{key}")
+        pipe.srem(self.members_key, key)
+        await pipe.execute()
+
+    async def exists(self, key: str) -> bool:
+        return await async_redis_client.exists(f"{self.prefix}:{key}") > 0
+
+    async def list_all(self) -> list[dict]:
+        return [value async for value in self.iter_all()]
+
+    async def iter_all(self, batch_size: Optional[int] = None) -> AsyncIterator[dict]:
+        """Yield all values with this prefix, fetched ``batch_size`` keys at a time."""
+        batch_size = batch_size or self.scan_count
+        batch: list[str] = []
+        seen: set[str] = set()
+        async for key in self._iter_keys(batch_size):
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append(key)
+            if len(batch) >= batch_size:
+                for value in await self._load(batch):
+                    yield value
+                batch = []
+        if batch:
+            for value in await self._load(batch):
+                yield value
+
+    def _iter_keys(self, count: int) -> AsyncIterator[str]:
+        if self.track_members:
+            return async_redis_client.sscan_iter(self.members_key, count=count)
+        return self._scan_keys(count)
+
+    async def _scan_keys(self, count: int) -> AsyncIterator[str]:
+        start = len(self.prefix) + 1
+        async for name in async_redis_client.scan_iter(match=f"{self.prefix}:*", count=count):
+            yield name[start:]
+
+    async def _load(self, keys: list[str]) -> list[dict]:
+        values = await async_redis_binary_client.mget([f"{self.prefix}:{key}" for key in keys])
+        missing = [key for key, data in zip(keys, values) if not data]
+        if missing and self.track_members:
+            await async_redis_client.srem(self.members_key, *missing)
+        return [self.codec.decode(data) for data in values if data]
+
+    async def claim_unique(self, index: str, value: str, key: str) -> bool:
+        """Map ``value`` to ``key`` unless another key holds it. Returns False if taken."""
+        return bool(await async_redis_client.eval(
+            UNIQUE_CLAIM, 2, self._unique_key(index), self._unique_claimed_key(index), value, key, time.time(),
+        ))
+
+    async def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        return await async_redis_client.hget(self._unique_key(index), value)
+
+    async def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        return bool(await async_redis_client.eval(
+            UNIQUE_RELEASE, 2, self._unique_key(index), self._unique_claimed_key(index),
+            value, key, time.time(), min_age_seconds,
+        ))
+
+
+class ThreadedStorage:
+    """Async interface over a sync storage backend, each call run in a worker thread."""
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    async def get(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._storage.get, key)
+
+    async def get_many(self, keys: list[str]) -> dict[str, dict]:
+        return await asyncio.to_thread(self._storage.get_many, keys)
+
+    async def set(self, key: str, value: Any) -> None:
+        await asyncio.to_thread(self._storage.set, key, value)
+
+    async def set_many(self, items: dict[str, Any]) -> None:
+        await asyncio.to_thread(self._storage.set_many, items)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._storage.delete, key)
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._storage.exists, key)
+
+    async def list_all(self) -> list[dict]:
+        return await asyncio.to_thread(self._storage.list_all)
+
+    async def iter_all(self, batch_size: Optional[int] = None) -> AsyncIterator[dict]:
+        for value in await asyncio.to_thread(self._storage.list_all):
+            yield value
+
+    async def claim_unique(self, index: str, value: str, key: str) -> bool:
+        return await asyncio.to_thread(self._storage.claim_unique, index, value, key)
+
+    async def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        return await asyncio.to_thread(self._storage.lookup_unique, index, value)
+
+    async def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        return await asyncio.to_thread(self._storage.release_unique, index, value, key, min_age_seconds)
+
+
+# Per-request maps of {store: {key: value or None}}; None outside a request
+_identity_map: ContextVar[Optional[dict]] = ContextVar("storage_identity_map", default=None)
+
+
+@contextmanager
+def identity_map_scope() -> Iterator[None]:
+    """Give the enclosed code (one request) its own, initially empty identity map."""
+    token = _identity_map.set({})
+    try:
+        yield
+    finally:
+        _identity_map.reset(token)
+
+
+class IdentityMappedStorage:
+    """Read-through identity map over an async storage backend.
+
+    Inside an ``identity_map_scope`` the first ``get``/``exists``/
+    ``get_many`` of a key reads the backend and later ones return the same
+    object (or the same miss); writes go to the backend and update the map.
+    Outside a scope (tests, scripts) every call goes to the backend.
+    Listing and unique-index calls are never mapped.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _entries(self) -> Optional[dict]:
+        scope = _identity_map.get()
+        return None if scope is None else scope.setdefault(self, {})
+
+    async def get(self, key: str) -> Optional[dict]:
+        entries = self._entries()
+        if entries is None:
+            return await self.backend.get(key)
+        if key not in entries:
+            entries[key] = await self.backend.get(key)
+        return entries[key]
+
+    async def get_or_404(self, key: str, detail: str = "Not found") -> dict:
+        """``get``, raising HTTP 404 with ``detail`` if the key doesn't exist."""
+        value = await self.get(key)
+        if value is None:
+            raise HTTPException(status_code=404, detail=detail)
+        return value
+
+    async def refresh(self, key: str) -> Optional[dict]:
+        """Re-read a key from the backend, replacing the mapped value."""
+        value = await self.backend.get(key)
+        entries = self._entries()
+        if entries is not None:
+            entries[key] = value
+        return value
+
+    async def get_many(self, keys: list[str]) -> dict[str, dict]:
+        entries = self._entries()
+        if entries is None:
+            return await self.backend.get_many(keys)
+        missing = [key for key in keys if key not in entries]
+        if missing:
+            found = await self.backend.get_many(missing)
+            for key in missing:
+                entries[key] = found.get(key)
+        return {key: entries[key] for key in keys if entries[key] is not None}
+
+    async def exists(self, key: str) -> bool:
+        # A mapped read costs the same round trip / RU as an existence check
+        # and saves the read that usually follows it
+        if self._entries() is None:
+            return await self.backend.exists(key)
+        return await self.get(key) is not None
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.backend.set(key, value)
+        entries = self._entries()
+        if entries is not None:
+            entries[key] = value
+
+    async def set_many(self, items: dict[str, Any]) -> None:
+        await self.backend.set_many(items)
+        entries = self._entries()
+        if entries is not None:
+            entries.update(items)
+
+    async def delete(self, key: str) -> None:
+        await self.backend.delete(key)
+        entries = self._entries()
+        if entries is not None:
+            entries[key] = None
+
+    async def list_all(self) -> list[dict]:
+        return await self.backend.list_all()
+
+    def iter_all(self, batch_size: Optional[int] = None) -> AsyncIterator[dict]:
+        return self.backend.iter_all(batch_size)
+
+    async def claim_unique(self, index: str, value: str, key: str) -> bool:
+        return await self.backend.claim_unique(index, value, key)
+
+    async def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        return await self.backend.lookup_unique(index, value)
+
+    async def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        return await self.backend.release_unique(index, value, key, min_age_seconds)
+
+
+def _async_view(sync_storage):
+    """Async storage over the same data as a backend from ``app.storage``."""
+    if isinstance(sync_storage, CachedStorage):
+        # Same process-wide cache, so writes through either path invalidate it
+        return AsyncCachedStorage(
+            _async_view(sync_storage.backend),
+            sync_storage.name,
+            sync_storage.cache_ttl_seconds,
+            sync_storage.cache,
+            async_redis_client,
+        )
+    if isinstance(sync_storage, RedisStorage):
+        return AsyncRedisStorage(
+            sync_storage.prefix,
+            track_members=sync_storage.track_members,
+            scan_count=sync_storage.scan_count,
+            ttl_seconds=sync_storage.ttl_seconds,
+            codec=sync_storage.codec,
+        )
+    # Imported lazily, like in app.storage, so azure-cosmos stays optional
+    from app.cosmos_storage import AsyncCosmosStorage, CosmosStorage
+
+    if isinstance(sync_storage, CosmosStorage):
+        return AsyncCosmosStorage(
+            sync_storage.database_name,
+            sync_storage.container_name,
+            partition_key_field=sync_storage._pk_field,
+            codec=sync_storage.codec,
+        )
+    return ThreadedStorage(sync_storage)
+
+
+_backends = [
+    _async_view(sync_storage)
+    for sync_storage in (storage.jobs_db, storage.proposals_db, storage.users_db, storage.settings_db)
+]
+jobs_db, proposals_db, users_db, settings_db = (IdentityMappedStorage(backend) for backend in _backends)
+
+_cosmos_client = None
+
+
+async def open_async_storage() -> None:
+    """Create the shared async Cosmos DB client, if Cosmos is in use (application startup)."""
+    global _cosmos_client
+    stores = [backend for backend in _backends if hasattr(backend, "open")]
+    if not stores or _cosmos_client is not None:
+        return
+    from app.cosmos_storage import create_async_cosmos_client
+
+    _cosmos_client = create_async_cosmos_client()
+    for store in stores:
+        store.open(_cosmos_client)
+    logger.info("Async Cosmos DB client opened", extra={"containers": [s.container_name for s in stores]})
+
+
+async def close_async_storage() -> None:
+    """Close the Cosmos DB client and both Redis pools (application shutdown)."""
+    global _cosmos_client
+    if _cosmos_client is not None:
+        await _cosmos_client.close()
+        _cosmos_client = None
+    await async_redis_client.aclose(close_connection_pool=True)
+    await async_redis_binary_client.aclose(close_connection_pool=True)
@@ -1,21 +1,23 @@
 import json
 import logging
+import time
 import uuid
 from datetime import datetime
 from typing import Optional
 
 import bcrypt
 from jose import jwt
-from fastapi import Cookie, Depends, Header, HTTPException, Response
+from fastapi import Cookie, Depends, Header, HTTPException, Query, Response
 
 from app.config import settings
-from app.storage import redis_client
+from app.async_storage import async_redis_client
 from app.models.user import UserRole
 
 logger = logging.getLogger(__name__)
 
 SESSION_PREFIX = "session"
 SESSION_ALGORITHM = "HS256"
+THUMBNAIL_TOKEN_SCOPE = "thumbnails"
 
 
 # --- Password hashing ---
@@ -30,7 +32,7 @@ def verify_password(password: str, password_hash: str) -> bool:
 
 # --- Session management ---
 
-def create_session(user_id: str, role: str, email: str) -> str:
+async def create_session(user_id: str, role: str, email: str) -> str:
     """Create a session in Redis and return a signed session ID."""
     session_id = str(uuid.uuid4())
 
@@ -41,7 +43,7 @@ def create_session(user_id: str, role: str, email: str) -> str:
         "email": email,
         "created_at": datetime.now().isoformat(),
     }
-    redis_client.setex(
+    await async_redis_client.setex(
         f"{SESSION_PREFIX}:{session_id}",
         settings.session_ttl_seconds,
         json.dumps(session_data),
@@ -56,7 +58,7 @@ def create_session(user_id: str, role: str, email: str) -> str:
     return signed
 
 
-def get_session(signed_id: str) -> Optional[dict]:
+async def get_session(signed_id: str) -> Optional[dict]:
     """Verify signed session ID and return session data from Redis."""
     try:
         payload = jwt.decode(
@@ -68,13 +70,13 @@ def get_session(signed_id: str) -> Optional[dict]:
     except Exception:
         return None
 
-    raw = redis_client.get(f"{SESSION_PREFIX}:{session_id}")
+    raw = await async_redis_client.get(f"{SESSION_PREFIX}:{session_id}")
     if raw is None:
         return None
     return json.loads(raw)
 
 
-def delete_session(signed_id: str) -> None:
+async def delete_session(signed_id: str) -> None:
     """Delete a session from Redis."""
     try:
         payload = jwt.decode(
@@ -83,11 +85,41 @@ def delete_session(signed_id: str) -> None:
             algorithms=[SESSION_ALGORITHM],
         )
         session_id = payload["session_id"]
-        redis_client.delete(f"{SESSION_PREFIX}:{session_id}")
+        await async_redis_client.delete(f"{SESSION_PREFIX}:{session_id}")
     except Exception:
         pass
 
 
+# --- Thumbnail tokens ---
+# <img src> requests can't carry the Authorization header, and cross-site
+# cookies are blocked on some browsers, so thumbnail URLs carry a
+# short-lived signed token instead. Its expiry is rounded to the TTL, so
+# the token (and every URL containing it) stays the same for a while and
+# browsers keep serving thumbnails from their cache.
+
+def create_thumbnail_token(user_id: str) -> tuple[str, int]:
+    """Return a signed thumbnail token for ``user_id`` and its expiry (epoch seconds)."""
+    ttl = settings.thumbnail_token_ttl_seconds
+    expires_at = (int(time.time()) // ttl + 2) * ttl
+    token = jwt.encode(
+        {"sub": user_id, "scope": THUMBNAIL_TOKEN_SCOPE, "exp": expires_at},
+        settings.session_secret_key,
+        algorithm=SESSION_ALGORITHM,
+    )
+    return token, expires_at
+
+
+def verify_thumbnail_token(token: str) -> Optional[str]:
+    """Return the user ID of a valid, unexpired thumbnail token, or None."""
+    try:
+        payload = jwt.decode(token, settings.session_secret_key, algorithms=[SESSION_ALGORITHM])
+    except Exception:
+        return None
+    if payload.get("scope") != THUMBNAIL_TOKEN_SCOPE:
+        return None
+    return payload.get("sub")
+
+
 def set_session_cookie(response: Response, signed_id: str) -> None:
     """Set the session cookie on the response."""
     is_prod = settings.environment == "production"
@@ -113,7 +145,7 @@ def clear_session_cookie(response: Response) -> None:
 
 # --- FastAPI dependencies ---
 
-def get_current_user(
+async def get_current_user(
     session_id: Optional[str] = Cookie(None),
     authorization: Optional[str] = Header(None),
 ) -> dict:
@@ -132,7 +164,7 @@ def get_current_user(
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    session = get_session(token)
+    session = await get_session(token)
     if not session:
         logger.warning("Session lookup failed for provided token")
         raise HTTPException(status_code=401, detail="Session expired or invalid")
@@ -140,9 +172,23 @@ def get_current_user(
     return session
 
 
+async def get_thumbnail_user(
+    t: Optional[str] = Query(None, description="Thumbnail token from GET /api/v1/auth/thumbnail-token"),
+    session_id: Optional[str] = Cookie(None),
+    authorization: Optional[str] = Header(None),
+) -> dict:
+    """Dependency: authenticate by thumbnail token, else by session."""
+    if t:
+        user_id = verify_thumbnail_token(t)
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="Thumbnail token expired or invalid")
+        return {"user_id": user_id}
+    return await get_current_user(session_id, authorization)
+
+
 def require_role(required_role: UserRole):
     """Dependency factory: require a specific role."""
-    def _check(current_user: dict = Depends(get_current_user)) -> dict:
+    async def _check(current_user: dict = Depends(get_current_user)) -> dict:
         if current_user.get("role") != required_role.value:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         return current_user
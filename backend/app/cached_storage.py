@@ -0,0 +1,337 @@
+"""In-process read-through cache for rarely-changing storage keys.
+
+``settings_db`` is read whenever an API key or the invite code is needed and
+``users_db`` on ``/auth/me``: each a Redis or Cosmos DB round trip for data
+that changes about once a week. ``CachedStorage`` (sync) and
+``AsyncCachedStorage`` wrap any backend with one process-wide LRU
+(``StorageCache``), each store with its own TTL (``STORAGE_CACHE_TTL_SECONDS``).
+
+Writes through a wrapper drop the key locally and publish an invalidation on
+Redis pub/sub; every process's cache listens and drops it too. Nothing is
+cached while a process isn't subscribed (the listener isn't running yet, or
+lost its connection and may have missed invalidations), so a value is never
+served stale beyond what the TTL allows for an unannounced write (one made
+through an unwrapped backend). Values are cached serialized, so callers
+can't mutate a cached copy.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import orjson
+import redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "storage_cache:invalidate"
+
+_MISSING = object()
+
+
+class StorageCache:
+    """Thread-safe LRU of storage values with per-entry expiry, invalidated over pub/sub."""
+
+    def __init__(self, redis_client, max_entries: int = 10_000):
+        self._redis = redis_client
+        self.max_entries = max_entries
+        self.origin = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Optional[bytes]]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation: a read that started before one
+        # doesn't cache what it read (it may predate the write)
+        self.generation = 0
+        self.listening = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: dict[str, dict[str, int]] = {}
+
+    # --- Entries ---
+
+    def lookup(self, store: str, key: str) -> Any:
+        """The cached value (None for a cached miss), or ``_MISSING``."""
+        with self._lock:
+            entry = self._entries.get((store, key))
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end((store, key))
+                self._count(store, "hits")
+                return None if entry[1] is None else orjson.loads(entry[1])
+            if entry is not None:
+                del self._entries[(store, key)]
+            self._count(store, "misses")
+            return _MISSING
+
+    def put(self, store: str, key: str, value: Any, ttl_seconds: float, generation: int) -> None:
+        """Cache a value read from the backend, unless invalidated since ``generation``."""
+        data = None if value is None else orjson.dumps(value)
+        with self._lock:
+            if not self.listening or generation != self.generation:
+                return
+            self._entries[(store, key)] = (time.monotonic() + ttl_seconds, data)
+            self._entries.move_to_end((store, key))
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._count(evicted[0], "evictions")
+
+    def invalidate(self, store: str, key: str) -> None:
+        with self._lock:
+            self.generation += 1
+            if self._entries.pop((store, key), None) is not None:
+                self._count(store, "invalidations")
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def message(self, store: str, keys: list[str]) -> bytes:
+        """The pub/sub message announcing a write to ``keys`` of ``store``."""
+        return orjson.dumps({"origin": self.origin, "store": store, "keys": keys})
+
+    def publish(self, store: str, keys: list[str]) -> None:
+        """Drop the keys here and tell other processes to drop them (one message)."""
+        for key in keys:
+            self.invalidate(store, key)
+        try:
+            self._redis.publish(INVALIDATION_CHANNEL, self.message(store, keys))
+        except redis.RedisError as e:
+            logger.warning("Storage cache invalidation publish failed", extra={"store": store, "error": str(e)})
+
+    def handle_message(self, data) -> None:
+        try:
+            message = orjson.loads(data)
+            if message.get("origin") != self.origin:
+                # Processes not yet upgraded still publish a single "key"
+                keys = message["keys"] if "keys" in message else [message["key"]]
+                for key in keys:
+                    self.invalidate(message["store"], key)
+        except (ValueError, KeyError, AttributeError, TypeError):
+            logger.warning("Ignoring malformed storage cache invalidation", extra={"data": str(data)[:200]})
+
+    # --- Invalidation listener ---
+
+    def start(self) -> None:
+        """Start the background thread that subscribes to invalidations (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="storage-cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _set_listening(self, listening: bool) -> None:
+        # Entries cached before (re)subscribing may have missed invalidations
+        with self._lock:
+            self.listening = listening
+            self.generation += 1
+            self._entries.clear()
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                self._set_listening(True)
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.handle_message(message["data"])
+            except redis.RedisError as e:
+                logger.warning("Storage cache invalidation listener failed", extra={"error": str(e)})
+            finally:
+                self._set_listening(False)
+                try:
+                    pubsub.close()
+                except redis.RedisError:
+                    pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    # --- Metrics ---
+
+    def _count(self, store: str, counter: str) -> None:
+        stats = self._stats.setdefault(store, {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0})
+        stats[counter] += 1
+
+    def stats(self) -> dict:
+        """This process's hit/miss counters per store."""
+        with self._lock:
+            stores = {}
+            for store, counters in self._stats.items():
+                total = counters["hits"] + counters["misses"]
+                stores[store] = {**counters, "hit_ratio": round(counters["hits"] / total, 4) if total else 0.0}
+            return {"listening": self.listening, "entries": len(self._entries), "stores": stores}
+
+
+def _cached_many(cache: StorageCache, store: str, keys: list[str]) -> tuple[dict, list[str]]:
+    """Split ``keys`` into the values cached (misses cached as None left out) and the keys to load."""
+    found, missing = {}, []
+    for key in keys:
+        value = cache.lookup(store, key)
+        if value is _MISSING:
+            missing.append(key)
+        elif value is not None:
+            found[key] = value
+    return found, missing
+
+
+class CachedStorage:
+    """Read-through cache over a sync storage backend (``get``/``get_many``/``exists``).
+
+    Writes go to the backend and invalidate the key in every process.
+    Listing and unique-index calls are not cached.
+    """
+
+    def __init__(self, backend, name: str, ttl_seconds: float, cache: StorageCache):
+        self.backend = backend
+        self.name = name
+        self.cache_ttl_seconds = ttl_seconds
+        self.cache = cache
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self.cache.lookup(self.name, key)
+        if value is _MISSING:
+            generation = self.cache.generation
+            value = self.backend.get(key)
+            self.cache.put(self.name, key, value, self.cache_ttl_seconds, generation)
+        return value
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        found, missing = _cached_many(self.cache, self.name, keys)
+        if missing:
+            generation = self.cache.generation
+            loaded = self.backend.get_many(missing)
+            for key in missing:
+                self.cache.put(self.name, key, loaded.get(key), self.cache_ttl_seconds, generation)
+            found.update(loaded)
+        return found
+
+    def exists(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(key, value)
+        self.cache.publish(self.name, [key])
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        self.backend.set_many(items)
+        if items:
+            self.cache.publish(self.name, list(items))
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+        self.cache.publish(self.name, [key])
+
+    def list_all(self) -> list[dict]:
+        return self.backend.list_all()
+
+    def iter_all(self, batch_size: Optional[int] = None) -> Iterator[dict]:
+        return self.backend.iter_all(batch_size)
+
+    def claim_unique(self, index: str, value: str, key: str) -> bool:
+        return self.backend.claim_unique(index, value, key)
+
+    def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        return self.backend.lookup_unique(index, value)
+
+    def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        return self.backend.release_unique(index, value, key, min_age_seconds)
+
+    def __contains__(self, key: str) -> bool:
+        return self.exists(key)
+
+    def __getitem__(self, key: str) -> dict:
+        data = self.get(key)
+        if data is None:
+            raise KeyError(key)
+        return data
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+
+class AsyncCachedStorage:
+    """Async counterpart of ``CachedStorage``, sharing the process's ``StorageCache``.
+
+    Invalidations are published through ``async_redis_client``.
+    """
+
+    def __init__(self, backend, name: str, ttl_seconds: float, cache: StorageCache, async_redis_client):
+        self.backend = backend
+        self.name = name
+        self.cache_ttl_seconds = ttl_seconds
+        self.cache = cache
+        self._async_redis = async_redis_client
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = self.cache.lookup(self.name, key)
+        if value is _MISSING:
+            generation = self.cache.generation
+            value = await self.backend.get(key)
+            self.cache.put(self.name, key, value, self.cache_ttl_seconds, generation)
+        return value
+
+    async def get_many(self, keys: list[str]) -> dict[str, dict]:
+        found, missing = _cached_many(self.cache, self.name, keys)
+        if missing:
+            generation = self.cache.generation
+            loaded = await self.backend.get_many(missing)
+            for key in missing:
+                self.cache.put(self.name, key, loaded.get(key), self.cache_ttl_seconds, generation)
+            found.update(loaded)
+        return found
+
+    async def exists(self, key: str) -> bool:
+        return await self.get(key) is not None
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.backend.set(key, value)
+        await self._publish([key])
+
+    async def set_many(self, items: dict[str, Any]) -> None:
+        await self.backend.set_many(items)
+        if items:
+            await self._publish(list(items))
+
+    async def delete(self, key: str) -> None:
+        await self.backend.delete(key)
+        await self._publish([key])
+
+    async def _publish(self, keys: list[str]) -> None:
+        for key in keys:
+            self.cache.invalidate(self.name, key)
+        try:
+            await self._async_redis.publish(INVALIDATION_CHANNEL, self.cache.message(self.name, keys))
+        except redis.RedisError as e:
+            logger.warning("Storage cache invalidation publish failed", extra={"store": self.name, "error": str(e)})
+
+    async def list_all(self) -> list[dict]:
+        return await self.backend.list_all()
+
+    def iter_all(self, batch_size: Optional[int] = None) -> AsyncIterator[dict]:
+        return self.backend.iter_all(batch_size)
+
+    async def claim_unique(self, index: str, value: str, key: str) -> bool:
+        return await self.backend.claim_unique(index, value, key)
+
+    async def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        return await self.backend.lookup_unique(index, value)
+
+    async def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        return await self.backend.release_unique(index, value, key, min_age_seconds)
+
+
+def uncached(storage):
+    """The backend behind a ``CachedStorage``, or ``storage`` itself."""
+    return storage.backend if isinstance(storage, CachedStorage) else storage
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from app.config import settings
 
 # Create Celery app
@@ -21,3 +22,30 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,  # Process one task at a time
     worker_max_tasks_per_child=50,  # Restart worker after 50 tasks (prevent memory leaks)
 )
+
+# Retention (archive old proposals, prune expired jobs from the job index),
+# scheduled only when enabled. The single worker runs the scheduler (--beat);
+# with several workers, run one `celery -A app.celery_app beat` instead
+if settings.job_retention_days or settings.retention_archive != "off":
+    celery_app.conf.beat_schedule = {
+        "enforce-retention": {
+            "task": "app.tasks.enforce_retention",
+            "schedule": settings.retention_interval_seconds,
+        },
+    }
+
+
+# Each worker process keeps its own storage cache (see app.cached_storage),
+# which only caches while subscribed to invalidations
+@worker_process_init.connect
+def start_storage_cache(**kwargs):
+    from app.storage import storage_cache
+
+    storage_cache.start()
+
+
+@worker_process_shutdown.connect
+def stop_storage_cache(**kwargs):
+    from app.storage import storage_cache
+
+    storage_cache.stop()
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from typing import Optional
+from typing import Literal, Optional
 import json
 
 
@@ -12,6 +12,9 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     api_version: str = "v1"
 
+    # Responses smaller than this (bytes) are sent uncompressed
+    compression_minimum_size: int = 1024
+
     # CORS
     cors_origins: list[str] = ["http://localhost:3000"]
 
@@ -30,12 +33,109 @@ class Settings(BaseSettings):
     webflow_collection_id: Optional[str] = None
     openai_api_key: Optional[str] = None
 
+    # Webflow response cache (conditional GETs, stored in Redis)
+    webflow_cache_enabled: bool = True
+    webflow_cache_ttl_seconds: int = 3600
+
+    # Shared Webflow HTTP client (one keep-alive pool per API process)
+    webflow_http2: bool = False
+    webflow_max_connections: int = 20
+    webflow_max_keepalive_connections: int = 10
+
+    # Coalesce identical concurrent Webflow reads: "off", "local" (per process)
+    # or "redis" (across API processes)
+    webflow_single_flight: Literal["off", "local", "redis"] = "local"
+
+    # Collection schemas (image/alt-text field discovery) cached per process
+    collection_schema_ttl_seconds: int = 3600
+
+    # Items endpoint: cache of serialized CMSItemResponse pages
+    items_projection_cache_enabled: bool = True
+    items_projection_ttl_seconds: int = 300
+
+    # Item search index (SQLite FTS5; ":memory:" for a per-process index)
+    search_index_path: str = "search_index.db"
+    search_short_alt_chars: int = 25
+
+    # Publishing after apply: "immediate" (each PATCH goes live, the original
+    # behavior), "batch" (stage all writes, then one publish call per chunk)
+    # or "staged" (never publish)
+    webflow_publish_mode: Literal["immediate", "batch", "staged"] = "immediate"
+    webflow_publish_batch_size: int = 100
+
+    # Job pipeline: max target items buffered between page fetch and generation
+    job_pipeline_queue_size: int = 100
+
+    # Job event stream (SSE): keep-alive comment interval for idle connections
+    # (each one also re-reads the job) and the longest a stream stays open
+    job_events_heartbeat_seconds: int = 15
+    job_events_max_stream_seconds: int = 1800
+
+    # Collection audit: max runtime of one audit before its lock expires, the
+    # age after which a cached report is refreshed (0 = never by age), and how
+    # long after a failed run reads wait before queueing another
+    audit_lock_seconds: int = 1800
+    audit_report_max_age_seconds: int = 86400
+    audit_retry_cooldown_seconds: int = 300
+
+    # Thumbnail proxy: resized Webflow CDN images, cached on disk (LRU by size)
+    thumbnail_cache_dir: str = "thumbnail_cache"
+    thumbnail_cache_max_bytes: int = 512 * 1024 * 1024
+    thumbnail_widths: list[int] = [160, 320, 640]
+    thumbnail_allowed_hosts: list[str] = [
+        "cdn.prod.website-files.com",
+        "uploads-ssl.webflow.com",
+        "assets.website-files.com",
+        "assets-global.website-files.com",
+    ]
+    thumbnail_max_source_bytes: int = 25 * 1024 * 1024
+
     # Redis
     redis_url: str = "redis://localhost:6379"
+    # Async client used by API requests: pool size, and seconds a request
+    # waits for a free connection before failing
+    redis_max_connections: int = 50
+    redis_pool_timeout_seconds: float = 5.0
+    # RedisStorage listing: keys per SCAN/MGET batch, and whether each prefix
+    # keeps a membership set so listing reads the set instead of walking the
+    # keyspace (run scripts.backfill_storage_members after enabling)
+    redis_scan_count: int = 1000
+    redis_storage_member_sets: bool = False
+
+    # Stored values (jobs, proposals, users, settings): "json" (untagged
+    # text, the only format older releases read) or "orjson"/"msgpack"
+    # (tagged binary). This release reads every format whatever is
+    # configured; switch writers only once no older process is running (see
+    # README). Tagged values of at least storage_compression_min_bytes are
+    # zstd-compressed (0: never).
+    storage_codec: Literal["json", "orjson", "msgpack"] = "json"
+    storage_compression_min_bytes: int = 4096
+
+    # In-process cache of rarely-changing stores ("jobs", "proposals",
+    # "users", "settings"): seconds a value is cached per store (stores not
+    # listed aren't cached), and max cached values per process
+    storage_cache_ttl_seconds: dict[str, int] = {"users": 60, "settings": 300}
+    storage_cache_max_entries: int = 10_000
+
+    # Retention: jobs and proposals expire this many days after their last
+    # write (Redis key TTL; Cosmos DB container defaultTtl, applied by
+    # scripts.apply_retention). 0 keeps them forever.
+    job_retention_days: int = 0
+    # Archive: proposals of jobs older than retention_archive_after_days are
+    # compressed into cold storage ("file": gzip JSON lines under
+    # retention_archive_dir; "cosmos": the archive container) and dropped
+    # from the hot store. Keep this below job_retention_days.
+    retention_archive: Literal["off", "file", "cosmos"] = "off"
+    retention_archive_after_days: int = 7
+    retention_archive_dir: str = "archive"
+    # Celery beat interval of the archive / job index pruning task
+    retention_interval_seconds: int = 3600
 
     # Session / Auth
     session_secret_key: str = "change-me-in-production"
     session_ttl_seconds: int = 86400  # 24 hours
+    # Signed tokens in thumbnail URLs (<img> can't send the session header)
+    thumbnail_token_ttl_seconds: int = 3600
 
     # Azure Cosmos DB
     cosmos_db_url: Optional[str] = None
@@ -45,6 +145,9 @@ class Settings(BaseSettings):
     cosmos_db_proposals_container: str = "proposals"
     cosmos_db_users_container: str = "users"
     cosmos_db_settings_container: str = "settings"
+    cosmos_db_archive_container: str = "proposals-archive"
+    # Async client used by API requests: max concurrent connections per process
+    cosmos_max_connections: int = 50
 
     model_config = {"env_file": ".env", "case_sensitive": False}
 
@@ -1,54 +1,153 @@
-import json
+import asyncio
+import base64
+import hashlib
 import logging
-from typing import Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator, Optional
 
+import orjson
+from azure.core import MatchConditions
 from azure.cosmos import CosmosClient
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+
+from app.config import settings
+from app.storage import ORJSON_OPTIONS, StorageCodec, default_codec
 
 logger = logging.getLogger(__name__)
 
+_SELECT_DATA = "SELECT c.data, c.blob FROM c"
+_SELECT_MANY = "SELECT * FROM c WHERE ARRAY_CONTAINS(@ids, c.id)"
+
+
+def _document(key: str, pk_field: str, value: Any, codec: StorageCodec) -> dict:
+    """The document stored for ``value``: plain JSON in "data", or, once large
+    enough to be compressed, the codec's bytes base64-encoded in "blob"
+    (keeps big proposal lists well under the 2 MB item limit)."""
+    document = {"id": key, pk_field: key}
+    raw = orjson.dumps(value, default=str, option=ORJSON_OPTIONS)
+    if codec.compresses(len(raw)):
+        document["blob"] = base64.b64encode(codec.encode(value)).decode()
+    else:
+        document["data"] = orjson.loads(raw)
+    return document
+
+
+def _payload(item: dict, codec: StorageCodec) -> Optional[Any]:
+    """The value stored in a document, or None for index documents."""
+    if item.get("blob") is not None:
+        return codec.decode(base64.b64decode(item["blob"]))
+    return item.get("data")
+
+
+# Unique secondary indexes (value -> key): each mapping is its own document
+# in the container, with no "data" field so it never shows up in
+# get/iter_all. Its id is derived from the value (hashed, since ids can't
+# contain '/', '?' or '#'), so create_item fails for a taken value and
+# point reads serve lookups. A release deletes only the revision it checked
+# (If-Match on its etag), so a concurrent release and re-claim isn't undone.
+
+def _unique_id(index: str, value: str) -> str:
+    return f"idx:{index}:{hashlib.sha256(value.encode()).hexdigest()}"
+
+
+def _unique_document(doc_id: str, pk_field: str, key: str) -> dict:
+    return {"id": doc_id, pk_field: doc_id, "target": key, "claimed_at": time.time()}
+
+
+def _releasable(document: Optional[dict], key: str, min_age_seconds: float) -> bool:
+    """Whether an index document is held by ``key`` and was claimed at least
+    ``min_age_seconds`` ago (falling back to its last-modified time)."""
+    if document is None or document.get("target") != key:
+        return False
+    claimed_at = document.get("claimed_at", document.get("_ts", 0))
+    return time.time() - claimed_at >= min_age_seconds
+
+
+# Bulk writes (set_many). Documents are partitioned by their own key, so a
+# transactional batch (one partition) would never hold more than one: each
+# document is upserted on its own, concurrently. Concurrent upserts per
+# set_many on the sync client (its connection pool size), and on the async
+# client (half the default COSMOS_MAX_CONNECTIONS, so one bulk write leaves
+# connections for other requests):
+_SYNC_BULK_CONCURRENCY = 10
+_ASYNC_BULK_CONCURRENCY = 25
+
 
 class CosmosStorage:
     """Azure Cosmos DB-backed storage with dict-like interface.
 
     Drop-in replacement for RedisStorage. Each instance maps to one
     Cosmos DB container. Documents are keyed by id (also the
-    partition key), with the payload stored in a 'data' field.
+    partition key), with the payload stored in a 'data' field, or
+    compressed in a 'blob' field once large (see ``_document``).
     """
 
     def __init__(self, client: CosmosClient, database_name: str, container_name: str,
-                 partition_key_field: str = "job_id"):
+                 partition_key_field: str = "job_id", codec: Optional[StorageCodec] = None):
         self._database = client.get_database_client(database_name)
         self._container = self._database.get_container_client(container_name)
+        self.database_name = database_name
+        self.container_name = container_name
         self._pk_field = partition_key_field
+        self.codec = codec or default_codec
 
     def get(self, key: str) -> Optional[dict]:
         """Get value by key. Returns None if not found."""
         try:
             item = self._container.read_item(item=key, partition_key=key)
-            return item.get("data")
+            return _payload(item, self.codec)
         except CosmosResourceNotFoundError:
             return None
         except Exception as e:
             logger.error(f"Cosmos DB read error for key '{key}': {e}")
             raise
 
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Get several documents with one query. Missing keys are omitted."""
+        if not keys:
+            return {}
+        items = self._container.query_items(
+            query=_SELECT_MANY,
+            parameters=[{"name": "@ids", "value": list(keys)}],
+            enable_cross_partition_query=True,
+        )
+        values = {item["id"]: _payload(item, self.codec) for item in items}
+        return {key: value for key, value in values.items() if value is not None}
+
     def set(self, key: str, value: Any) -> None:
         """Set value by key (upsert semantics)."""
-        document = {
-            "id": key,
-            self._pk_field: key,
-            "data": json.loads(json.dumps(value, default=str)),
-        }
-        self._container.upsert_item(document)
+        self._container.upsert_item(_document(key, self._pk_field, value, self.codec))
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Upsert several documents concurrently (``_SYNC_BULK_CONCURRENCY`` at a time)."""
+        documents = [_document(key, self._pk_field, value, self.codec) for key, value in items.items()]
+        if len(documents) == 1:
+            self._container.upsert_item(documents[0])
+        elif documents:
+            with ThreadPoolExecutor(max_workers=min(len(documents), _SYNC_BULK_CONCURRENCY)) as pool:
+                # list() re-raises the first failed upsert
+                list(pool.map(self._container.upsert_item, documents))
 
     def list_all(self) -> list[dict]:
         """Return all documents' data payloads."""
-        items = list(self._container.query_items(
-            query="SELECT * FROM c",
+        return list(self.iter_all())
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[dict]:
+        """Yield all documents' data payloads, fetched one query page at a time."""
+        items = self._container.query_items(
+            query=_SELECT_DATA,
             enable_cross_partition_query=True,
-        ))
-        return [item.get("data") for item in items if item.get("data") is not None]
+            max_item_count=batch_size,
+        )
+        for item in items:
+            value = _payload(item, self.codec)
+            if value is not None:
+                yield value
 
     def delete(self, key: str) -> None:
         """Delete item by key."""
@@ -65,6 +164,65 @@ class CosmosStorage:
         except CosmosResourceNotFoundError:
             return False
 
+    # --- Retention ---
+
+    def default_ttl(self) -> Optional[int]:
+        """The container's ``defaultTtl`` in seconds, or None if items never expire."""
+        return self._container.read().get("defaultTtl")
+
+    def set_default_ttl(self, ttl_seconds: Optional[int]) -> None:
+        """Make items expire ``ttl_seconds`` after their last write (None: never).
+
+        Replacing a container resets every property not sent, and
+        ``replace_container`` can't send all of them (unique keys, computed
+        properties, ...): the current definition is read and sent back whole,
+        with only ``defaultTtl`` changed.
+        """
+        properties = {key: value for key, value in self._container.read().items() if not key.startswith("_")}
+        properties.pop("defaultTtl", None)
+        if ttl_seconds is not None:
+            properties["defaultTtl"] = ttl_seconds
+        self._database.client_connection.ReplaceContainer(self._container.container_link, properties)
+
+    # --- Unique secondary indexes (value -> key) ---
+
+    def _read_unique(self, doc_id: str) -> Optional[dict]:
+        try:
+            return self._container.read_item(item=doc_id, partition_key=doc_id)
+        except CosmosResourceNotFoundError:
+            return None
+
+    def claim_unique(self, index: str, value: str, key: str) -> bool:
+        """Map ``value`` to ``key`` unless another key holds it. Returns False if taken."""
+        doc_id = _unique_id(index, value)
+        try:
+            self._container.create_item(_unique_document(doc_id, self._pk_field, key))
+            return True
+        except CosmosResourceExistsError:
+            return (self._read_unique(doc_id) or {}).get("target") == key
+
+    def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        """Return the key ``value`` maps to, or None."""
+        return (self._read_unique(_unique_id(index, value)) or {}).get("target")
+
+    def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        """Remove the mapping for ``value`` if it still points at ``key`` and was
+        claimed at least ``min_age_seconds`` ago. Returns True if removed."""
+        doc_id = _unique_id(index, value)
+        document = self._read_unique(doc_id)
+        if not _releasable(document, key, min_age_seconds):
+            return False
+        try:
+            self._container.delete_item(
+                item=doc_id,
+                partition_key=doc_id,
+                etag=document.get("_etag"),
+                match_condition=MatchConditions.IfNotModified,
+            )
+        except (CosmosResourceNotFoundError, CosmosAccessConditionFailedError):
+            return False
+        return True
+
     def __contains__(self, key: str) -> bool:
         return self.exists(key)
 
@@ -76,3 +234,138 @@ class CosmosStorage:
 
     def __setitem__(self, key: str, value: Any) -> None:
         self.set(key, value)
+
+
+class AsyncCosmosStorage:
+    """Async counterpart of ``CosmosStorage`` on ``azure.cosmos.aio``.
+
+    Same documents and unique-index layout as the sync class. Instances are
+    created at import and bound to the shared async client with ``open()``
+    in the app lifespan; using one before that raises RuntimeError.
+    """
+
+    def __init__(self, database_name: str, container_name: str, partition_key_field: str = "job_id",
+                 codec: Optional[StorageCodec] = None):
+        self.database_name = database_name
+        self.container_name = container_name
+        self._pk_field = partition_key_field
+        self.codec = codec or default_codec
+        self._container_client = None
+
+    def open(self, client) -> None:
+        """Bind to a container of an ``azure.cosmos.aio.CosmosClient``."""
+        self._container_client = client.get_database_client(self.database_name).get_container_client(
+            self.container_name
+        )
+
+    @property
+    def _container(self):
+        if self._container_client is None:
+            raise RuntimeError(f"Cosmos container '{self.container_name}' used before open()")
+        return self._container_client
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Get value by key. Returns None if not found."""
+        try:
+            item = await self._container.read_item(item=key, partition_key=key)
+            return _payload(item, self.codec)
+        except CosmosResourceNotFoundError:
+            return None
+
+    async def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Get several documents with one query. Missing keys are omitted."""
+        if not keys:
+            return {}
+        items = self._container.query_items(
+            query=_SELECT_MANY,
+            parameters=[{"name": "@ids", "value": list(keys)}],
+        )
+        values = {item["id"]: _payload(item, self.codec) async for item in items}
+        return {key: value for key, value in values.items() if value is not None}
+
+    async def set(self, key: str, value: Any) -> None:
+        """Set value by key (upsert semantics)."""
+        await self._container.upsert_item(_document(key, self._pk_field, value, self.codec))
+
+    async def set_many(self, items: dict[str, Any]) -> None:
+        """Upsert several documents concurrently (``_ASYNC_BULK_CONCURRENCY`` at a time)."""
+        semaphore = asyncio.Semaphore(_ASYNC_BULK_CONCURRENCY)
+
+        async def upsert(key: str, value: Any) -> None:
+            async with semaphore:
+                await self._container.upsert_item(_document(key, self._pk_field, value, self.codec))
+
+        await asyncio.gather(*(upsert(key, value) for key, value in items.items()))
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._container.delete_item(item=key, partition_key=key)
+        except CosmosResourceNotFoundError:
+            pass
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self._container.read_item(item=key, partition_key=key)
+            return True
+        except CosmosResourceNotFoundError:
+            return False
+
+    async def list_all(self) -> list[dict]:
+        return [value async for value in self.iter_all()]
+
+    async def iter_all(self, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """Yield all documents' data payloads, fetched one query page at a time."""
+        async for item in self._container.query_items(query=_SELECT_DATA, max_item_count=batch_size):
+            value = _payload(item, self.codec)
+            if value is not None:
+                yield value
+
+    async def _read_unique(self, doc_id: str) -> Optional[dict]:
+        try:
+            return await self._container.read_item(item=doc_id, partition_key=doc_id)
+        except CosmosResourceNotFoundError:
+            return None
+
+    async def claim_unique(self, index: str, value: str, key: str) -> bool:
+        """Map ``value`` to ``key`` unless another key holds it. Returns False if taken."""
+        doc_id = _unique_id(index, value)
+        try:
+            await self._container.create_item(_unique_document(doc_id, self._pk_field, key))
+            return True
+        except CosmosResourceExistsError:
+            return (await self._read_unique(doc_id) or {}).get("target") == key
+
+    async def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        return (await self._read_unique(_unique_id(index, value)) or {}).get("target")
+
+    async def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        doc_id = _unique_id(index, value)
+        document = await self._read_unique(doc_id)
+        if not _releasable(document, key, min_age_seconds):
+            return False
+        try:
+            await self._container.delete_item(
+                item=doc_id,
+                partition_key=doc_id,
+                etag=document.get("_etag"),
+                match_condition=MatchConditions.IfNotModified,
+            )
+        except (CosmosResourceNotFoundError, CosmosAccessConditionFailedError):
+            return False
+        return True
+
+
+def create_async_cosmos_client():
+    """Create the process-wide ``azure.cosmos.aio`` client.
+
+    Requests go through one aiohttp session whose connector is capped at
+    ``COSMOS_MAX_CONNECTIONS``, so a burst of requests queues for a
+    connection instead of opening unbounded sockets to Cosmos DB.
+    """
+    import aiohttp
+    from azure.core.pipeline.transport import AioHttpTransport
+    from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=settings.cosmos_max_connections))
+    transport = AioHttpTransport(session=session, session_owner=True)
+    return AsyncCosmosClient(settings.cosmos_db_url, settings.cosmos_db_key, transport=transport)
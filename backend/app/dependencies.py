@@ -0,0 +1,33 @@
+"""Shared FastAPI dependencies used across routers."""
+
+import asyncio
+import logging
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from app.key_manager import get_webflow_api_token
+from app.services.webflow_client import WebflowClient, MockWebflowClient
+
+logger = logging.getLogger(__name__)
+
+
+async def get_webflow_client(request: Request) -> AsyncIterator[WebflowClient]:
+    """Dependency: the process-wide Webflow client (mock if no token is configured).
+
+    The shared client is owned by ``app.state.webflow_clients`` (created in the
+    app lifespan), so routes must not close it. It is held for the request, so
+    a token change never closes it under an in-flight call; a response that
+    keeps using it after the handler returns must ``retain`` it.
+    """
+    token = await asyncio.to_thread(get_webflow_api_token)
+    if not token:
+        logger.warning("No Webflow API token found, using mock client")
+        yield MockWebflowClient()
+        return
+    pool = request.app.state.webflow_clients
+    client = await pool.acquire(token)
+    try:
+        yield client
+    finally:
+        await pool.release(client)
@@ -1,31 +1,62 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.async_storage import close_async_storage, open_async_storage
 from app.config import settings
 from app.logging_config import configure_logging
-from app.middleware import RequestLoggingMiddleware
-from app.routers import items, jobs, auth, admin
+from app.middleware import CompressionMiddleware, IdentityMapMiddleware, RequestLoggingMiddleware
+from app.routers import items, jobs, auth, admin, collections, thumbnails
+from app.services.response_cache import get_response_cache
+from app.services.single_flight import get_single_flight
+from app.services.thumbnails import close_thumbnail_service
+from app.services.webflow_client import WebflowClientPool
+from app.storage import storage_cache
 
 # Configure structured JSON logging before anything else creates loggers
 configure_logging(settings.log_level)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create process-wide resources on startup and release them on shutdown."""
+    await open_async_storage()
+    storage_cache.start()
+    app.state.webflow_clients = WebflowClientPool(
+        cache=get_response_cache(),
+        http2=settings.webflow_http2,
+        max_connections=settings.webflow_max_connections,
+        max_keepalive_connections=settings.webflow_max_keepalive_connections,
+        single_flight=get_single_flight(),
+    )
+    yield
+    await app.state.webflow_clients.aclose()
+    await close_thumbnail_service()
+    storage_cache.stop()
+    await close_async_storage()
+
+
 app = FastAPI(
     title="Webflow SEO Tool API",
     version=settings.api_version,
     description="Generate and apply SEO-friendly alt text for Webflow CMS",
+    lifespan=lifespan,
 )
 
 # Middleware is applied in reverse order — RequestLogging runs outermost (first in, last out)
+app.add_middleware(IdentityMapMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
 app.add_middleware(RequestLoggingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["Content-Type", "Authorization", "Cookie"],
+    allow_headers=["Content-Type", "Authorization", "Cookie", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
 # Register routers
@@ -33,6 +64,8 @@ app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(items.router)
 app.include_router(jobs.router)
+app.include_router(collections.router)
+app.include_router(thumbnails.router)
 
 
 @app.get("/health")
@@ -1,10 +1,21 @@
 import logging
 import time
 import uuid
+import zlib
+from typing import Optional
 
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.async_storage import identity_map_scope
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip-only compression
+    brotli = None
 
 logger = logging.getLogger(__name__)
 
@@ -63,3 +74,170 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
         response.headers["X-Request-ID"] = request_id
         return response
+
+
+# Streamed events must reach the client immediately, and images are
+# already compressed, so never compress either
+_UNCOMPRESSED_CONTENT_TYPES = ("text/event-stream", "image/")
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._c.process(data) + (self._c.finish() if final else self._c.flush())
+
+
+class IdentityMapMiddleware:
+    """Give each HTTP request its own storage identity map.
+
+    Storage reads made while handling the request (dependencies, route and
+    streamed body) are cached per key, so a key is fetched at most once.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with identity_map_scope():
+            await self.app(scope, receive, send)
+
+
+def negotiate_encoding(accept_encoding: str, supported: tuple[str, ...]) -> Optional[str]:
+    """The ``supported`` coding the client weights highest (q > 0), or None.
+
+    ``supported`` is in server preference order, which breaks ties. A ``*``
+    entry weights every coding not listed explicitly.
+    """
+    weights: dict[str, float] = {}
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, negotiated via ``Accept-Encoding``.
+
+    - The coding with the highest q-value wins (``q=0`` refuses it); on a tie
+      brotli is preferred when ``brotli`` is installed
+    - Bodies smaller than ``minimum_size`` are sent uncompressed
+    - Streaming bodies (NDJSON export) are flushed chunk by chunk
+    - Server-Sent Events, images and already-encoded responses pass through untouched
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        supported = ("br", "gzip") if brotli is not None else ("gzip",)
+        encoding = negotiate_encoding(Headers(scope=scope).get("Accept-Encoding", ""), supported)
+        if encoding == "br":
+            responder = _CompressionResponder(
+                self.app, "br", lambda: _BrotliStream(self.brotli_quality), self.minimum_size
+            )
+        elif encoding == "gzip":
+            responder = _CompressionResponder(
+                self.app, "gzip", lambda: _GzipStream(self.gzip_level), self.minimum_size
+            )
+        else:
+            await self.app(scope, receive, send)
+            return
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, stream_factory, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.stream_factory = stream_factory
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.stream = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or headers.get(
+                "content-type", ""
+            ).startswith(_UNCOMPRESSED_CONTENT_TYPES)
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Hold the start message until the first body chunk decides the headers
+                self.initial_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            self.stream = self.stream_factory()
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            compressed = self.stream.compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(compressed))
+            await self.send(self.initial_message)
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        compressed = self.stream.compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
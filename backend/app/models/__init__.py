@@ -1,18 +1,24 @@
-from .cms_item import CMSItem, CMSItemResponse, ImageWithAltText
-from .job import Job, JobStatus, JobProgress, CreateJobRequest, JobResponse
+from .cms_item import CMSItem, CMSItemResponse, ImageWithAltText, ItemSearchResult, ItemSearchResponse, ReindexResponse
+from .job import Job, JobStatus, JobProgress, CreateJobRequest, JobResponse, JobSummary, JobListResponse
 from .proposal import Proposal, ProposalResponse, ApplyProposalRequest, ApplyProposalResponse
-from .user import UserRole, UserCreate, UserLogin, UserInDB, UserResponse, UserUpdate, InviteUserRequest
+from .user import UserRole, UserCreate, UserLogin, UserInDB, UserResponse, ThumbnailTokenResponse, UserUpdate, InviteUserRequest
 from .api_keys import ApiKeysUpdate, ApiKeyStatus, ApiKeysResponse
+from .audit import AuditImageRef, DuplicateAltTextGroup, AltTextAuditReport, AuditError, CollectionAuditResponse
 
 __all__ = [
     "CMSItem",
     "CMSItemResponse",
     "ImageWithAltText",
+    "ItemSearchResult",
+    "ItemSearchResponse",
+    "ReindexResponse",
     "Job",
     "JobStatus",
     "JobProgress",
     "CreateJobRequest",
     "JobResponse",
+    "JobSummary",
+    "JobListResponse",
     "Proposal",
     "ProposalResponse",
     "ApplyProposalRequest",
@@ -22,9 +28,15 @@ __all__ = [
     "UserLogin",
     "UserInDB",
     "UserResponse",
+    "ThumbnailTokenResponse",
     "UserUpdate",
     "InviteUserRequest",
     "ApiKeysUpdate",
     "ApiKeyStatus",
     "ApiKeysResponse",
+    "AuditImageRef",
+    "DuplicateAltTextGroup",
+    "AltTextAuditReport",
+    "AuditError",
+    "CollectionAuditResponse",
 ]
@@ -0,0 +1,58 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+
+class AuditImageRef(BaseModel):
+    """One image in a duplicate alt-text group."""
+
+    item_id: str
+    item_name: str
+    field_name: str = Field(..., description="Image field slug (e.g., '1-after')")
+
+
+class DuplicateAltTextGroup(BaseModel):
+    """Images sharing exactly the same alt text."""
+
+    alt_text: str
+    count: int
+    images: list[AuditImageRef]
+
+
+class AltTextAuditReport(BaseModel):
+    """Alt-text coverage, length distribution and duplicates for one collection."""
+
+    collection_id: str
+    generated_at: str
+    items: int
+    images: int
+    with_alt: int
+    missing_alt: int
+    over_limit: int = Field(..., description="Alt texts longer than 125 characters")
+    coverage_percentage: float
+    length_histogram: dict[str, int]
+    duplicate_group_count: int
+    duplicate_groups: list[DuplicateAltTextGroup] = Field(
+        ..., description="Largest groups first (capped)"
+    )
+    items_recomputed: int = Field(0, description="Items re-extracted in the last run")
+    items_removed: int = Field(0, description="Items dropped since the previous run")
+
+
+class AuditError(BaseModel):
+    """Why the most recent audit run failed."""
+
+    error: str
+    failed_at: str
+
+
+class CollectionAuditResponse(BaseModel):
+    """Cached audit report plus its freshness."""
+
+    collection_id: str
+    status: Literal["ready", "pending"]
+    stale: bool = False
+    refreshing: bool = False
+    report: Optional[AltTextAuditReport] = None
+    last_error: Optional[AuditError] = Field(
+        None, description="Failure of the latest run, if it failed after the cached report"
+    )
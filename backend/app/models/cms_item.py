@@ -48,3 +48,35 @@ class CMSItemResponse(BaseModel):
     items: list[CMSItem]
     total: int
     has_more: bool
+
+
+class ItemSearchResult(BaseModel):
+    """One item row from the search index."""
+
+    id: str = Field(..., description="Webflow item ID")
+    name: str
+    slug: str
+    last_updated: Optional[str] = None
+    image_count: int = 0
+    missing_alt_count: int = Field(0, description="Images with empty alt text")
+    short_alt_count: int = Field(0, description="Images with alt text below the short threshold")
+
+
+class ItemSearchResponse(BaseModel):
+    """Page of search results with an opaque cursor for the next page."""
+
+    items: list[ItemSearchResult]
+    total: int
+    next_cursor: Optional[str] = None
+    complete: bool = Field(
+        False, description="Whether the whole collection has been indexed (else only viewed pages are)"
+    )
+    indexed_at: Optional[str] = Field(None, description="When the last full re-index completed")
+
+
+class ReindexResponse(BaseModel):
+    """Result of a full collection re-index."""
+
+    collection_id: str
+    indexed: int
+    removed: int
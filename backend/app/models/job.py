@@ -54,3 +54,22 @@ class JobResponse(BaseModel):
     status: JobStatus
     progress: JobProgress
     estimated_duration_seconds: Optional[int] = None
+
+
+class JobSummary(BaseModel):
+    """One job in a job listing."""
+
+    job_id: str
+    status: JobStatus
+    collection_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    created_by: Optional[str] = None
+    progress: JobProgress
+    error_message: Optional[str] = None
+
+
+class JobListResponse(BaseModel):
+    """A page of jobs, newest first."""
+
+    jobs: list[JobSummary]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
+from app.config import settings
+
 
 class Proposal(BaseModel):
     """AI-generated alt text proposal."""
@@ -57,8 +59,12 @@ class ApplyProposalRequest(BaseModel):
 class ApplyProposalResponse(BaseModel):
     """Response after applying proposals."""
 
-    success_count: int
-    failure_count: int
+    success_count: int = Field(..., description="Fields written to Webflow")
+    failure_count: int = Field(..., description="Fields that failed to write")
+    published_count: int = Field(0, description="Items published (each item may have several fields)")
+    publish_mode: Literal["immediate", "batch", "staged"] = Field(
+        default_factory=lambda: settings.webflow_publish_mode
+    )
     results: list[dict] = Field(
         default_factory=list,
         description="Detailed results for each update attempt",
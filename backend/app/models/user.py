@@ -40,6 +40,11 @@ class UserResponse(BaseModel):
     created_at: str
 
 
+class ThumbnailTokenResponse(BaseModel):
+    token: str = Field(..., description="Pass as ?t= on /api/v1/thumbnails URLs")
+    expires_at: int = Field(..., description="Expiry (Unix seconds); fetch a new token before then")
+
+
 class UserUpdate(BaseModel):
     role: Optional[UserRole] = None
     is_active: Optional[bool] = None
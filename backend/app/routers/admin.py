@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 import logging
 from datetime import datetime
@@ -6,9 +7,14 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.models import UserResponse, UserUpdate, UserRole, InviteUserRequest, ApiKeysUpdate, ApiKeysResponse
-from app.storage import users_db, settings_db
+from app.async_storage import users_db, settings_db
 from app.auth import hash_password, require_admin
 from app.key_manager import get_masked_keys, save_keys
+from app.user_directory import create_user, find_user_by_email, save_user
+from app.services.response_cache import get_response_cache
+from app.services.retention import get_retention_manager
+from app.storage import storage_cache
+from app.services.single_flight import get_single_flight
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
@@ -22,7 +28,7 @@ INVITE_CODE_KEY = "invite_code"
 @router.get("/users", response_model=list[UserResponse])
 async def list_users(current_user: dict = Depends(require_admin)):
     """List all users (admin only)."""
-    all_users = users_db.list_all()
+    all_users = await users_db.list_all()
     return [
         UserResponse(
             user_id=u["user_id"],
@@ -40,9 +46,8 @@ async def list_users(current_user: dict = Depends(require_admin)):
 async def invite_user(body: InviteUserRequest, current_user: dict = Depends(require_admin)):
     """Create a new user with specified role (admin only)."""
     # Check for duplicate email
-    for u in users_db.list_all():
-        if u.get("email") == body.email:
-            raise HTTPException(status_code=409, detail="Email already registered")
+    if await find_user_by_email(body.email):
+        raise HTTPException(status_code=409, detail="Email already registered")
 
     user_id = f"user_{uuid.uuid4().hex[:12]}"
     now = datetime.now().isoformat()
@@ -56,7 +61,8 @@ async def invite_user(body: InviteUserRequest, current_user: dict = Depends(requ
         "is_active": True,
         "created_at": now,
     }
-    users_db.set(user_id, user_data)
+    if not await create_user(user_data):
+        raise HTTPException(status_code=409, detail="Email already registered")
 
     logger.info(
         "Admin invited user",
@@ -81,22 +87,20 @@ async def invite_user(body: InviteUserRequest, current_user: dict = Depends(requ
 @router.patch("/users/{user_id}", response_model=UserResponse)
 async def update_user(user_id: str, body: UserUpdate, current_user: dict = Depends(require_admin)):
     """Update a user's role or active status (admin only)."""
-    user = users_db.get(user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = await users_db.get_or_404(user_id, "User not found")
 
     # Prevent demoting the last admin
     if body.role and body.role != UserRole.ADMIN and user["role"] == UserRole.ADMIN.value:
-        admin_count = sum(1 for u in users_db.list_all() if u.get("role") == UserRole.ADMIN.value)
+        admin_count = sum([1 async for u in users_db.iter_all() if u.get("role") == UserRole.ADMIN.value])
         if admin_count <= 1:
             raise HTTPException(status_code=400, detail="Cannot remove the last admin")
 
     # Prevent deactivating the last admin
     if body.is_active is False and user["role"] == UserRole.ADMIN.value:
-        active_admins = sum(
-            1 for u in users_db.list_all()
+        active_admins = sum([
+            1 async for u in users_db.iter_all()
             if u.get("role") == UserRole.ADMIN.value and u.get("is_active", True)
-        )
+        ])
         if active_admins <= 1:
             raise HTTPException(status_code=400, detail="Cannot deactivate the last admin")
 
@@ -108,7 +112,7 @@ async def update_user(user_id: str, body: UserUpdate, current_user: dict = Depen
     if body.display_name is not None:
         user["display_name"] = body.display_name
 
-    users_db.set(user_id, user)
+    await save_user(user)
 
     logger.info(
         "Admin updated user",
@@ -130,7 +134,7 @@ async def update_user(user_id: str, body: UserUpdate, current_user: dict = Depen
 @router.get("/settings")
 async def get_settings(current_user: dict = Depends(require_admin)):
     """Get app settings (admin only)."""
-    notif = settings_db.get(NOTIFICATION_SETTINGS_KEY)
+    notif = await settings_db.get(NOTIFICATION_SETTINGS_KEY)
     return {
         "notifications": notif or {
             "email_enabled": False,
@@ -144,7 +148,7 @@ async def get_settings(current_user: dict = Depends(require_admin)):
 @router.put("/settings/notifications")
 async def update_notification_settings(body: dict, current_user: dict = Depends(require_admin)):
     """Update notification settings (admin only)."""
-    settings_db.set(NOTIFICATION_SETTINGS_KEY, body)
+    await settings_db.set(NOTIFICATION_SETTINGS_KEY, body)
     logger.info("Admin updated notification settings", extra={"admin_id": current_user["user_id"]})
     return {"message": "Settings updated", "notifications": body}
 
@@ -154,7 +158,7 @@ async def update_notification_settings(body: dict, current_user: dict = Depends(
 @router.get("/settings/invite-code")
 async def get_invite_code(current_user: dict = Depends(require_admin)):
     """Get current invite code (admin only)."""
-    stored = settings_db.get(INVITE_CODE_KEY)
+    stored = await settings_db.get(INVITE_CODE_KEY)
     return {
         "code": stored.get("code", "") if stored else "",
         "enabled": bool(stored and stored.get("code")),
@@ -169,7 +173,7 @@ async def update_invite_code(body: dict, current_user: dict = Depends(require_ad
     - ``{"code": ""}`` → disable (open registration)
     """
     code = body.get("code", "").strip()
-    settings_db.set(INVITE_CODE_KEY, {"code": code})
+    await settings_db.set(INVITE_CODE_KEY, {"code": code})
     logger.info(
         "Admin updated invite code",
         extra={"admin_id": current_user["user_id"], "enabled": bool(code)},
@@ -185,7 +189,7 @@ async def update_invite_code(body: dict, current_user: dict = Depends(require_ad
 @router.get("/settings/api-keys", response_model=ApiKeysResponse)
 async def get_api_keys(current_user: dict = Depends(require_admin)):
     """Get masked API key values and their sources (admin only)."""
-    return get_masked_keys()
+    return await asyncio.to_thread(get_masked_keys)
 
 
 @router.put("/settings/api-keys", response_model=ApiKeysResponse)
@@ -196,6 +200,26 @@ async def update_api_keys(body: ApiKeysUpdate, current_user: dict = Depends(requ
     - empty string ``""`` → remove stored key (revert to env var)
     - non-empty string → encrypt and store
     """
-    save_keys(body.model_dump())
+    await asyncio.to_thread(save_keys, body.model_dump())
     logger.info("Admin updated API keys", extra={"admin_id": current_user["user_id"]})
-    return get_masked_keys()
+    return await asyncio.to_thread(get_masked_keys)
+
+
+# --- Metrics ---
+
+@router.get("/metrics")
+async def get_metrics(current_user: dict = Depends(require_admin)):
+    """Get cache hit/miss and request coalescing metrics (admin only)."""
+    cache = get_response_cache()
+    single_flight = get_single_flight()
+    return {
+        "webflow_cache": await cache.stats() if cache else None,
+        "webflow_single_flight": single_flight.stats() if single_flight else None,
+        "storage_cache": storage_cache.stats(),
+    }
+
+
+@router.get("/retention")
+async def get_retention_stats(current_user: dict = Depends(require_admin)):
+    """Get job/proposal retention settings, job counts by age and archive stats (admin only)."""
+    return await asyncio.to_thread(get_retention_manager().stats)
@@ -1,11 +1,12 @@
 import uuid
 import logging
+from contextlib import aclosing
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, Response
 
-from app.models import UserCreate, UserLogin, UserResponse, UserRole
-from app.storage import users_db, settings_db
+from app.models import ThumbnailTokenResponse, UserCreate, UserLogin, UserResponse, UserRole
+from app.async_storage import users_db, settings_db
 from app.auth import (
     hash_password,
     verify_password,
@@ -13,38 +14,40 @@ from app.auth import (
     delete_session,
     set_session_cookie,
     clear_session_cookie,
+    create_thumbnail_token,
     get_current_user,
 )
+from app.user_directory import create_user, find_user_by_email
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
 
-def _find_user_by_email(email: str) -> dict | None:
-    """Search users_db for a user with the given email."""
-    for user in users_db.list_all():
-        if user.get("email") == email:
-            return user
-    return None
+async def _has_users() -> bool:
+    """True once any user exists (stops at the first one found)."""
+    async with aclosing(users_db.iter_all()) as users:
+        async for _ in users:
+            return True
+    return False
 
 
 @router.post("/register")
 async def register(body: UserCreate, response: Response):
     """Register a new user. First user becomes admin."""
-    # Check for duplicate email
-    if _find_user_by_email(body.email):
+    # Check for duplicate email (create_user re-checks atomically)
+    if await find_user_by_email(body.email):
         raise HTTPException(status_code=409, detail="Email already registered")
 
     # First user = admin (skip invite code check for first user)
-    all_users = users_db.list_all()
+    is_first_user = not await _has_users()
 
     # Validate invite code (skip for first user — they become admin)
-    if len(all_users) > 0:
-        stored_code = settings_db.get("invite_code")
+    if not is_first_user:
+        stored_code = await settings_db.get("invite_code")
         if stored_code and stored_code.get("code"):
             if not body.invite_code or body.invite_code != stored_code["code"]:
                 raise HTTPException(status_code=403, detail="Invalid invite code")
-    role = UserRole.ADMIN if len(all_users) == 0 else UserRole.USER
+    role = UserRole.ADMIN if is_first_user else UserRole.USER
 
     user_id = f"user_{uuid.uuid4().hex[:12]}"
     now = datetime.now().isoformat()
@@ -58,10 +61,11 @@ async def register(body: UserCreate, response: Response):
         "is_active": True,
         "created_at": now,
     }
-    users_db.set(user_id, user_data)
+    if not await create_user(user_data):
+        raise HTTPException(status_code=409, detail="Email already registered")
 
     # Create session + set cookie (cookie for desktop, token for mobile)
-    signed_id = create_session(user_id, role.value, body.email)
+    signed_id = await create_session(user_id, role.value, body.email)
     set_session_cookie(response, signed_id)
 
     logger.info(
@@ -83,7 +87,7 @@ async def register(body: UserCreate, response: Response):
 @router.post("/login")
 async def login(body: UserLogin, response: Response):
     """Login with email and password."""
-    user = _find_user_by_email(body.email)
+    user = await find_user_by_email(body.email)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
@@ -94,7 +98,7 @@ async def login(body: UserLogin, response: Response):
         raise HTTPException(status_code=403, detail="Account is deactivated")
 
     # Create session + set cookie (cookie for desktop, token for mobile)
-    signed_id = create_session(user["user_id"], user["role"], user["email"])
+    signed_id = await create_session(user["user_id"], user["role"], user["email"])
     set_session_cookie(response, signed_id)
 
     logger.info("User logged in", extra={"user_id": user["user_id"], "email": user["email"]})
@@ -123,9 +127,7 @@ async def logout(response: Response, current_user: dict = Depends(get_current_us
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: dict = Depends(get_current_user)):
     """Get current user's profile."""
-    user = users_db.get(current_user["user_id"])
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = await users_db.get_or_404(current_user["user_id"], "User not found")
 
     return UserResponse(
         user_id=user["user_id"],
@@ -135,3 +137,10 @@ async def get_me(current_user: dict = Depends(get_current_user)):
         is_active=user["is_active"],
         created_at=user["created_at"],
     )
+
+
+@router.get("/thumbnail-token", response_model=ThumbnailTokenResponse)
+async def get_thumbnail_token(current_user: dict = Depends(get_current_user)):
+    """Get a short-lived token authorizing thumbnail URLs (``<img src>`` sends no auth header)."""
+    token, expires_at = create_thumbnail_token(current_user["user_id"])
+    return ThumbnailTokenResponse(token=token, expires_at=expires_at)
@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, Response
+from typing import Optional
+from app.models import AltTextAuditReport, AuditError, CollectionAuditResponse
+from app.services.audit import get_collection_auditor
+from app.tasks import audit_collection_task
+from app.auth import get_current_user
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/collections", tags=["collections"])
+
+# The auditor keeps its state in Redis through the sync client it shares with
+# the Celery task, and queueing a task talks to the broker: the helpers
+# below block, so the endpoints run them in a worker thread.
+
+
+def _enqueue_audit(collection_id: str) -> None:
+    """Queue an audit unless one is already queued or running."""
+    auditor = get_collection_auditor()
+    if auditor.try_acquire(collection_id):
+        try:
+            audit_collection_task.delay(collection_id)
+        except Exception:
+            # Nothing will run to release it, so don't block retries until the TTL
+            auditor.release(collection_id)
+            raise
+        logger.info("Collection audit queued", extra={"collection_id": collection_id})
+
+
+def _last_error(auditor, collection_id: str) -> Optional[AuditError]:
+    error = auditor.get_error(collection_id)
+    return AuditError(**error) if error else None
+
+
+def _load_audit(collection_id: str) -> CollectionAuditResponse:
+    """The cached report and its state, queueing a refresh if it is missing or stale.
+
+    No refresh is queued while the last failure is within the retry cooldown.
+    """
+    auditor = get_collection_auditor()
+    report = auditor.get_report(collection_id)
+    error = auditor.get_error(collection_id)
+    stale = report is not None and auditor.is_stale(collection_id, report)
+    refreshing = auditor.is_running(collection_id)
+    if (report is None or stale) and not auditor.in_cooldown(error):
+        _enqueue_audit(collection_id)
+        refreshing = True
+
+    return CollectionAuditResponse(
+        collection_id=collection_id,
+        status="ready" if report else "pending",
+        stale=stale,
+        refreshing=refreshing,
+        report=AltTextAuditReport(**report) if report else None,
+        last_error=AuditError(**error) if error else None,
+    )
+
+
+def _refresh_audit(collection_id: str) -> CollectionAuditResponse:
+    """Queue an audit now and return the current report (if any)."""
+    _enqueue_audit(collection_id)
+    auditor = get_collection_auditor()
+    report = auditor.get_report(collection_id)
+    return CollectionAuditResponse(
+        collection_id=collection_id,
+        status="ready" if report else "pending",
+        refreshing=True,
+        report=AltTextAuditReport(**report) if report else None,
+        last_error=_last_error(auditor, collection_id),
+    )
+
+
+@router.get("/{collection_id}/audit", response_model=CollectionAuditResponse)
+async def get_collection_audit(
+    collection_id: str,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get the cached alt-text audit report for a collection.
+
+    If no report exists yet an audit is queued and ``202 pending`` is
+    returned; poll again later. A report made outdated by applied alt text, or
+    older than the configured max age, is still returned (``stale: true``)
+    while a refresh runs in the background. ``last_error`` carries the failure
+    of the latest run, if any; for a short cooldown after a failure no new run
+    is queued (``POST`` still forces one).
+    """
+    audit = await asyncio.to_thread(_load_audit, collection_id)
+    if audit.report is None:
+        response.status_code = 202
+    return audit
+
+
+@router.post("/{collection_id}/audit", response_model=CollectionAuditResponse, status_code=202)
+async def refresh_collection_audit(collection_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Queue an audit run now. Only items changed since the last run are re-extracted.
+    """
+    return await asyncio.to_thread(_refresh_audit, collection_id)
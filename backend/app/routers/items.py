@@ -1,22 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional
-from app.models import CMSItemResponse, CMSItem, ImageWithAltText
-from app.services.webflow_client import WebflowClient, MockWebflowClient
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Literal, Optional
+import asyncio
+import time
+from app.models import CMSItemResponse, ItemSearchResponse, ItemSearchResult, ReindexResponse
+from app.services.webflow_client import WebflowClient
+from app.services.projection_cache import get_projection_cache
+from app.services.image_fields import schema_registry
+from app.services.search_index import get_search_index
 from app.auth import get_current_user
-from app.key_manager import get_webflow_api_token, get_webflow_collection_id
+from app.dependencies import get_webflow_client
+from app.key_manager import get_webflow_collection_id
+from app.utils.etag import cache_headers, etag_matches, not_modified, payload_etag
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/v1/items", tags=["items"])
+router = APIRouter(prefix="/api/v1/items", tags=["items"], default_response_class=ORJSONResponse)
 
 
-def get_webflow_client():
-    """Dependency to get Webflow client (real if token available, otherwise mock)."""
-    token = get_webflow_api_token()
-    if token:
-        return WebflowClient(api_token=token)
-    logger.warning("No Webflow API token found, using mock client")
-    return MockWebflowClient()
+async def _resolve_collection_id(collection_id: Optional[str]) -> str:
+    """Fall back to the stored/env collection ID, or raise 400."""
+    collection_id = collection_id or await asyncio.to_thread(get_webflow_collection_id)
+    if not collection_id:
+        raise HTTPException(
+            status_code=400,
+            detail="collection_id required (either in query param or WEBFLOW_COLLECTION_ID env var)",
+        )
+    return collection_id
+
+
+def _index_page(collection_id: str, raw_items: list[dict], extractor) -> None:
+    """Feed a fetched page into the search index; never fails the request."""
+    try:
+        get_search_index().upsert_items(collection_id, raw_items, extractor)
+    except Exception as e:
+        logger.warning(
+            "Failed to update search index",
+            extra={"collection_id": collection_id, "error": str(e)},
+        )
+
+
+def _page_response(payload: str, if_none_match: Optional[str], cache_status: str) -> Response:
+    """Serialized item page, or a 304 if the client already has it."""
+    etag = payload_etag(payload)
+    headers = {"X-Cache": cache_status}
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, headers)
+    return Response(content=payload, media_type="application/json", headers={**cache_headers(etag), **headers})
 
 
 @router.get("", response_model=CMSItemResponse)
@@ -26,21 +56,26 @@ async def list_items(
     ),
     limit: int = Query(50, ge=1, le=100, description="Number of items to return"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    if_none_match: Optional[str] = Header(None),
     client: WebflowClient = Depends(get_webflow_client),
     current_user: dict = Depends(get_current_user),
 ):
     """
     List CMS items from a Webflow collection.
 
-    Returns items with all images and their current alt text.
+    Returns items with all images and their current alt text. Pages are
+    served from the projection cache when possible, skipping the Webflow
+    fetch and the transform/validate step entirely. Responses carry a strong
+    ETag of the page; a matching ``If-None-Match`` gets an empty 304.
     """
     # Use collection_id from stored/env if not provided
-    collection_id = collection_id or get_webflow_collection_id()
-    if not collection_id:
-        raise HTTPException(
-            status_code=400,
-            detail="collection_id required (either in query param or WEBFLOW_COLLECTION_ID env var)",
-        )
+    collection_id = await _resolve_collection_id(collection_id)
+
+    projection_cache = get_projection_cache()
+    if projection_cache:
+        cached = await projection_cache.get(collection_id, limit, offset)
+        if cached is not None:
+            return _page_response(cached, if_none_match, "HIT")
 
     try:
         # Fetch from Webflow
@@ -51,47 +86,22 @@ async def list_items(
         )
 
         # Transform Webflow response to our model
-        items = []
-        for raw_item in result.get("items", []):
-            field_data = raw_item.get("fieldData", {})
-
-            # Extract all 4 image pairs (1-after through 4-after)
-            images = []
-            for i in range(1, 5):
-                image_field = f"{i}-after"
-                alt_field = f"{i}-after-alt-text"
-
-                image_data = field_data.get(image_field)
-                alt_text = field_data.get(alt_field)
-
-                # Only add if image exists
-                if image_data and isinstance(image_data, dict):
-                    images.append(
-                        ImageWithAltText(
-                            field_name=image_field,
-                            image_url=image_data.get("url"),
-                            current_alt_text=alt_text,
-                            file_id=image_data.get("fileId"),
-                        )
-                    )
-
-            item = CMSItem(
-                id=raw_item["id"],
-                name=field_data.get("name", "Untitled"),
-                slug=field_data.get("slug", ""),
-                images=images,
-            )
-            items.append(item)
+        extractor = await schema_registry.get_extractor(client, collection_id)
+        items = [extractor.to_cms_item(raw_item) for raw_item in result.get("items", [])]
+        await asyncio.to_thread(_index_page, collection_id, result.get("items", []), extractor)
 
         total = result.get("pagination", {}).get("total") or result.get(
             "total", len(items)
         )
 
-        return CMSItemResponse(
+        payload = CMSItemResponse(
             items=items,
             total=total,
             has_more=(offset + len(items)) < total,
-        )
+        ).model_dump_json()
+        if projection_cache:
+            await projection_cache.store(collection_id, limit, offset, payload)
+        return _page_response(payload, if_none_match, "MISS")
 
     except Exception as e:
         logger.error(
@@ -103,5 +113,150 @@ async def list_items(
             status_code=500,
             detail=f"Failed to fetch items from Webflow: {str(e)}",
         )
-    finally:
-        await client.close()
+
+
+@router.get("/export")
+async def export_items(
+    request: Request,
+    collection_id: Optional[str] = Query(
+        None, description="Webflow collection ID (uses env default if not provided)"
+    ),
+    client: WebflowClient = Depends(get_webflow_client),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Stream every item of a collection as NDJSON (one ``CMSItem`` per line).
+
+    Pages are fetched and written one at a time, so server memory stays
+    constant and the first lines arrive as soon as the first page does.
+    If a page fails after the headers are sent, the connection is aborted
+    (no terminating chunk), so clients see an incomplete response rather
+    than a short export that looks complete.
+    """
+    collection_id = await _resolve_collection_id(collection_id)
+    # The body streams after the dependency has released the client: hold it
+    # until the stream ends so a token change can't close it mid-export
+    webflow_clients = getattr(request.app.state, "webflow_clients", None)
+    if webflow_clients:
+        webflow_clients.retain(client)
+
+    async def _stream():
+        exported = 0
+        try:
+            extractor = await schema_registry.get_extractor(client, collection_id)
+            async for page in client.iter_collection_items(collection_id):
+                yield "".join(extractor.to_cms_item(raw_item).model_dump_json() + "\n" for raw_item in page)
+                exported += len(page)
+        except Exception as e:
+            # Headers are already sent: re-raise so the server aborts the
+            # connection instead of ending the body as if it were complete
+            logger.error(
+                "Item export aborted",
+                extra={"collection_id": collection_id, "exported": exported, "error": str(e)},
+                exc_info=True,
+            )
+            raise
+        finally:
+            if webflow_clients:
+                await webflow_clients.release(client)
+        logger.info("Item export completed", extra={"collection_id": collection_id, "exported": exported})
+
+    return StreamingResponse(
+        _stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{collection_id}-items.ndjson"'},
+    )
+
+
+@router.get("/search", response_model=ItemSearchResponse)
+async def search_items(
+    collection_id: Optional[str] = Query(
+        None, description="Webflow collection ID (uses env default if not provided)"
+    ),
+    q: Optional[str] = Query(None, description="Search text matched against name and slug"),
+    missing_alt: Optional[bool] = Query(None, description="Only items with (true) / without (false) missing alt text"),
+    short_alt: Optional[bool] = Query(None, description="Only items with (true) / without (false) short alt text"),
+    sort: Literal["name", "last_updated", "missing_alt"] = Query("name"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Search and filter indexed items server-side.
+
+    The index is filled as item pages are viewed; run
+    ``POST /api/v1/items/search/reindex`` to index a whole collection.
+    ``complete`` is false until a re-index has finished, so an empty result
+    may only mean the matching items have not been seen yet.
+    """
+    collection_id = await _resolve_collection_id(collection_id)
+    index = get_search_index()
+    try:
+        rows, next_cursor, total = await asyncio.to_thread(
+            index.search,
+            collection_id,
+            q=q,
+            missing_alt=missing_alt,
+            short_alt=short_alt,
+            sort=sort,
+            descending=order == "desc",
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    indexed_at = await asyncio.to_thread(index.indexed_at, collection_id)
+
+    return ItemSearchResponse(
+        items=[ItemSearchResult(id=row.pop("item_id"), **row) for row in rows],
+        total=total,
+        next_cursor=next_cursor,
+        complete=indexed_at is not None,
+        indexed_at=indexed_at,
+    )
+
+
+@router.post("/search/reindex", response_model=ReindexResponse)
+async def reindex_items(
+    collection_id: Optional[str] = Query(
+        None, description="Webflow collection ID (uses env default if not provided)"
+    ),
+    client: WebflowClient = Depends(get_webflow_client),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Re-index a whole collection from Webflow.
+
+    Pages are indexed as they stream in; items no longer in the collection
+    are dropped, the collection is marked completely indexed, and cached
+    item pages are invalidated.
+    """
+    collection_id = await _resolve_collection_id(collection_id)
+    index = get_search_index()
+    generation = time.time_ns()
+    indexed = 0
+
+    try:
+        extractor = await schema_registry.get_extractor(client, collection_id)
+        async for page in client.iter_collection_items(collection_id):
+            await asyncio.to_thread(index.upsert_items, collection_id, page, extractor, generation=generation)
+            indexed += len(page)
+    except Exception as e:
+        logger.error(
+            "Failed to re-index collection",
+            extra={"collection_id": collection_id, "error": str(e)},
+            exc_info=True,
+        )
+        raise HTTPException(status_code=500, detail=f"Failed to re-index collection: {str(e)}")
+
+    removed = await asyncio.to_thread(index.remove_stale, collection_id, generation)
+    projection_cache = get_projection_cache()
+    if projection_cache:
+        await projection_cache.invalidate(collection_id)
+
+    logger.info(
+        "Collection re-indexed",
+        extra={"collection_id": collection_id, "indexed": indexed, "removed": removed},
+    )
+    return ReindexResponse(collection_id=collection_id, indexed=indexed, removed=removed)
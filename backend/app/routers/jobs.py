@@ -1,32 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from app.models import (
     CreateJobRequest,
     JobResponse,
     JobStatus,
     JobProgress,
+    JobSummary,
+    JobListResponse,
     ApplyProposalRequest,
     ApplyProposalResponse,
 )
-from app.services.webflow_client import WebflowClient, MockWebflowClient
+from app.services.webflow_client import WebflowClient
+from app.services.audit import get_collection_auditor
+from app.services.image_fields import schema_registry
+from app.services.job_events import TERMINAL_EVENTS, get_job_events
+from app.services.job_index import get_async_job_index
+from app.services.projection_cache import get_projection_cache
+from app.services.retention import is_archived
+from app.services.search_index import get_search_index
 from app.tasks import generate_alt_text_task
-from app.storage import jobs_db, proposals_db
+from app.async_storage import jobs_db, proposals_db
 from app.auth import get_current_user
-from app.key_manager import get_webflow_api_token, get_webflow_collection_id
+from app.config import settings
+from app.dependencies import get_webflow_client
+from app.key_manager import get_webflow_collection_id
+from app.utils.etag import cache_headers, etag_matches, not_modified, payload_etag, version_etag
+import asyncio
+import time
 import uuid
 from datetime import datetime
+from typing import Optional
 import logging
+import orjson
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/v1", tags=["jobs"])
-
-
-def get_webflow_client():
-    """Get Webflow client (real if token available, otherwise mock)."""
-    token = get_webflow_api_token()
-    if token:
-        return WebflowClient(api_token=token)
-    return MockWebflowClient()
+router = APIRouter(prefix="/api/v1", tags=["jobs"], default_response_class=ORJSONResponse)
 
 
 @router.post("/generate", response_model=JobResponse)
@@ -38,7 +47,7 @@ async def create_generation_job(request: CreateJobRequest, current_user: dict =
     Use GET /jobs/{job_id} to poll for completion.
     """
     # Use collection_id from request, stored, or env
-    collection_id = request.collection_id or get_webflow_collection_id()
+    collection_id = request.collection_id or await asyncio.to_thread(get_webflow_collection_id)
     if not collection_id:
         raise HTTPException(
             status_code=400,
@@ -60,6 +69,7 @@ async def create_generation_job(request: CreateJobRequest, current_user: dict =
         "item_ids": request.item_ids,
         "created_at": datetime.now().isoformat(),
         "created_by": current_user["user_id"],
+        "version": 1,
         "progress": {
             "processed": 0,
             "total": len(request.item_ids),
@@ -68,10 +78,11 @@ async def create_generation_job(request: CreateJobRequest, current_user: dict =
     }
 
     # Store in Redis
-    jobs_db[job_id] = job
+    await jobs_db.set(job_id, job)
+    await get_async_job_index().upsert(job)
 
-    # Dispatch Celery task for background processing
-    generate_alt_text_task.delay(job_id, collection_id, request.item_ids, request.image_keys)
+    # Dispatch Celery task for background processing (a blocking broker write)
+    await asyncio.to_thread(generate_alt_text_task.delay, job_id, collection_id, request.item_ids, request.image_keys)
 
     logger.info(
         "Generation job created",
@@ -91,81 +102,242 @@ async def create_generation_job(request: CreateJobRequest, current_user: dict =
     )
 
 
+MAX_BATCH_IDS = 100
+
+
+@router.get("/jobs", response_model=JobListResponse)
+async def list_jobs(
+    ids: Optional[str] = Query(None, description="Comma-separated job IDs for a batch status lookup"),
+    created_by: Optional[str] = Query(None, description="Only jobs created by this user ID"),
+    status: Optional[JobStatus] = None,
+    since: Optional[datetime] = Query(None, description="Created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Created at or before this time"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    List jobs newest first, or look up several jobs at once.
+
+    Filters are served from a time-sorted Redis index, never a scan of all
+    jobs. With ``ids`` the other filters are ignored and the jobs found are
+    returned in the order given.
+    """
+    if ids is not None:
+        job_ids = [job_id for job_id in dict.fromkeys(ids.split(",")) if job_id]
+        if len(job_ids) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+        next_cursor = None
+    else:
+        try:
+            job_ids, next_cursor = await get_async_job_index().query(
+                created_by=created_by,
+                status=status,
+                since=since,
+                until=until,
+                cursor=cursor,
+                limit=limit,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    found = await jobs_db.get_many(job_ids)
+    return JobListResponse(
+        jobs=[JobSummary(**found[job_id]) for job_id in job_ids if job_id in found],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/jobs/{job_id}", response_model=JobResponse)
-async def get_job_status(job_id: str, current_user: dict = Depends(get_current_user)):
+async def get_job_status(
+    job_id: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+):
     """
     Get the status of a generation job.
 
-    Poll this endpoint to check if generation is complete.
+    Poll this endpoint to check if generation is complete. The ETag follows
+    the job record's version, so an unchanged poll gets an empty 304.
     """
-    if job_id not in jobs_db:
-        raise HTTPException(status_code=404, detail="Job not found")
+    job = await jobs_db.get_or_404(job_id, "Job not found")
 
-    job = jobs_db[job_id]
+    etag = version_etag(job_id, job["version"]) if "version" in job else None
+    if etag and etag_matches(if_none_match, etag):
+        return not_modified(etag)
 
-    return JobResponse(
+    payload = JobResponse(
         job_id=job_id,
         status=job["status"],
         progress=JobProgress(**job["progress"]),
         estimated_duration_seconds=None,
+    ).model_dump_json()
+    # Jobs created before version counters existed get a body hash instead
+    etag = etag or payload_etag(payload)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return Response(content=payload, media_type="application/json", headers=cache_headers(etag))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Stream job progress as Server-Sent Events.
+
+    Sends a ``status`` snapshot first, then ``progress``, ``proposal`` and a
+    final ``completed`` or ``failed`` event as the worker publishes them.
+    Idle connections get a keep-alive comment every few seconds.
+    """
+    await jobs_db.get_or_404(job_id, "Job not found")
+
+    return StreamingResponse(
+        _job_event_stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def _terminal_frame(job: dict) -> Optional[bytes]:
+    """The ``completed``/``failed`` frame for a finished job, or None while it runs."""
+    if job["status"] not in (JobStatus.COMPLETED, JobStatus.FAILED):
+        return None
+    terminal_event = "completed" if job["status"] == JobStatus.COMPLETED else "failed"
+    return _sse(terminal_event, {"status": job["status"], "error_message": job.get("error_message")})
+
+
+async def _job_event_stream(job_id: str):
+    """Yield SSE frames for a job until it completes or fails.
+
+    Each idle heartbeat re-reads the job, so a finish whose event was lost
+    (or a job deleted meanwhile) still ends the stream. After
+    ``JOB_EVENTS_MAX_STREAM_SECONDS`` the stream closes regardless and the
+    client falls back to polling.
+    """
+    deadline = time.monotonic() + settings.job_events_max_stream_seconds
+    async with get_job_events().subscribe(job_id) as subscription:
+        # Subscribed before reading the snapshot, so no event falls in between;
+        # re-read rather than reuse the copy the route loaded before subscribing
+        job = await jobs_db.refresh(job_id)
+        if job is None:
+            return
+        yield _sse("status", {"job_id": job_id, "status": job["status"], "progress": job["progress"]})
+        frame = _terminal_frame(job)
+        if frame is not None:
+            yield frame
+            return
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.info("Job event stream reached its maximum duration", extra={"job_id": job_id})
+                return
+            message = await subscription.next_event(timeout=min(settings.job_events_heartbeat_seconds, remaining))
+            if message is None:
+                job = await jobs_db.refresh(job_id)
+                if job is None:
+                    return
+                frame = _terminal_frame(job)
+                if frame is not None:
+                    yield frame
+                    return
+                yield b": keep-alive\n\n"
+                continue
+            yield _sse(message["event"], message["data"])
+            if message["event"] in TERMINAL_EVENTS:
+                return
+
+
 @router.get("/jobs/{job_id}/proposals")
-async def get_job_proposals(job_id: str, current_user: dict = Depends(get_current_user)):
+async def get_job_proposals(
+    job_id: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+):
     """
     Get generated alt text proposals for a completed job.
 
     Returns list of proposals with generated alt text for each image.
+    Proposals never change once a job completes, so a client holding the
+    current ETag gets a 304 without the proposals being loaded at all.
+    Once archived to cold storage (see ``app.services.retention``) they are
+    gone from the hot store and the response is 410.
     """
-    if job_id not in jobs_db:
-        raise HTTPException(status_code=404, detail="Job not found")
+    job = await jobs_db.get_or_404(job_id, "Job not found")
 
-    job = jobs_db[job_id]
     if job["status"] != JobStatus.COMPLETED:
         raise HTTPException(
             status_code=400,
             detail=f"Job not complete. Current status: {job['status']}",
         )
 
-    # Get proposals from Redis (already serialized as dicts)
-    proposals = proposals_db.get(job_id) or []
+    etag = version_etag(job_id, job["version"], "proposals") if "version" in job else None
+    if etag and etag_matches(if_none_match, etag):
+        return not_modified(etag)
 
-    return {
+    # Get proposals from Redis (already serialized as dicts), so skip
+    # re-encoding through jsonable_encoder and serialize directly with orjson
+    proposals = await proposals_db.get(job_id) or []
+    if is_archived(proposals):
+        raise HTTPException(
+            status_code=410,
+            detail=f"Proposals were archived on {proposals['archived_at']}",
+        )
+
+    response = ORJSONResponse({
         "job_id": job_id,
         "proposals": proposals,
         "total": len(proposals),
-    }
+    })
+    etag = etag or payload_etag(response.body)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers.update(cache_headers(etag))
+    return response
 
 
 @router.post("/apply", response_model=ApplyProposalResponse)
-async def apply_proposals(request: ApplyProposalRequest, current_user: dict = Depends(get_current_user)):
+async def apply_proposals(
+    request: ApplyProposalRequest,
+    webflow_client: WebflowClient = Depends(get_webflow_client),
+    current_user: dict = Depends(get_current_user),
+):
     """
     Apply approved alt text proposals to Webflow CMS.
 
     Groups updates by item_id and applies all field changes per item in a single request.
+    ``field_name`` may be an image key or its alt key; alt text stored on the
+    image itself (native ``alt``, MultiImage) is written back onto the
+    item's current image value.
+    Depending on ``WEBFLOW_PUBLISH_MODE`` the writes go live immediately, are
+    staged and then published with one call per chunk of items, or are left staged.
     Returns success/failure counts and detailed results.
     """
-    collection_id = get_webflow_collection_id()
+    publish_mode = settings.webflow_publish_mode
+    collection_id = await asyncio.to_thread(get_webflow_collection_id)
     if not collection_id:
         raise HTTPException(
             status_code=400,
             detail="WEBFLOW_COLLECTION_ID not configured",
         )
 
-    webflow_client = get_webflow_client()
+    extractor = await schema_registry.get_extractor(webflow_client, collection_id)
 
-    # Group updates by item_id
+    # Group updates by item_id, keyed by where each alt text is written
     updates_by_item = defaultdict(dict)
     for update in request.updates:
         item_id = update["item_id"]
-        field_name = update["field_name"]
+        field_name = extractor.alt_key_for(update["field_name"])
         alt_text = update["alt_text"]
         updates_by_item[item_id][field_name] = alt_text
 
     results = []
     success_count = 0
     failure_count = 0
+    applied: dict[str, dict] = {}
 
     # Apply updates item by item
     for item_id, field_data in updates_by_item.items():
@@ -174,18 +346,24 @@ async def apply_proposals(request: ApplyProposalRequest, current_user: dict = De
                 "Applying alt text to Webflow item",
                 extra={"item_id": item_id, "field_count": len(field_data), "user_id": current_user["user_id"]},
             )
-            response = await webflow_client.update_item(
+            current = None
+            if extractor.needs_current_item(field_data):
+                current = (await webflow_client.get_item(collection_id, item_id)).get("fieldData", {})
+            await webflow_client.update_item(
                 collection_id=collection_id,
                 item_id=item_id,
-                field_data=field_data,
+                field_data=extractor.build_update(field_data, current),
+                publish=publish_mode == "immediate",
             )
 
             success_count += len(field_data)
+            applied[item_id] = field_data
             results.append({
                 "item_id": item_id,
                 "success": True,
                 "fields_updated": list(field_data.keys()),
                 "message": f"Successfully updated {len(field_data)} field(s)",
+                "published": publish_mode == "immediate",
             })
 
         except Exception as e:
@@ -202,10 +380,63 @@ async def apply_proposals(request: ApplyProposalRequest, current_user: dict = De
                 "error": str(e),
             })
 
-    await webflow_client.close()
+    if publish_mode == "batch":
+        await _publish_in_batches(webflow_client, collection_id, results)
+
+    if applied:
+        # SQLite and sync Redis writes: kept off the event loop
+        await asyncio.to_thread(_record_applied_alt_texts, collection_id, applied)
+        await asyncio.to_thread(get_collection_auditor().mark_stale, collection_id)
+        projection_cache = get_projection_cache()
+        if projection_cache:
+            await projection_cache.invalidate(collection_id)
 
     return ApplyProposalResponse(
         success_count=success_count,
         failure_count=failure_count,
+        published_count=sum(1 for r in results if r.get("published")),
+        publish_mode=publish_mode,
         results=results,
     )
+
+
+def _record_applied_alt_texts(collection_id: str, applied: dict[str, dict]) -> None:
+    """Reflect applied alt text (item ID -> field data) in the search index; never fails the apply."""
+    search_index = get_search_index()
+    for item_id, field_data in applied.items():
+        try:
+            search_index.update_alt_texts(collection_id, item_id, field_data)
+        except Exception as e:
+            logger.warning(
+                "Failed to update search index after apply",
+                extra={"item_id": item_id, "error": str(e)},
+            )
+
+
+async def _publish_in_batches(webflow_client: WebflowClient, collection_id: str, results: list[dict]) -> None:
+    """Publish every successfully staged item, one Webflow call per chunk.
+
+    Marks each result's ``published`` flag in place; a failed chunk leaves its
+    items staged and records the error on each of them.
+    """
+    staged = [r for r in results if r["success"]]
+    batch_size = settings.webflow_publish_batch_size
+    for start in range(0, len(staged), batch_size):
+        chunk = staged[start:start + batch_size]
+        item_ids = [r["item_id"] for r in chunk]
+        try:
+            await webflow_client.publish_items(collection_id=collection_id, item_ids=item_ids)
+            for r in chunk:
+                r["published"] = True
+            logger.info(
+                "Published staged items",
+                extra={"collection_id": collection_id, "item_count": len(item_ids)},
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to publish staged items",
+                extra={"collection_id": collection_id, "item_count": len(item_ids), "error": str(e)},
+                exc_info=True,
+            )
+            for r in chunk:
+                r["publish_error"] = str(e)
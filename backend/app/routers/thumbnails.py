@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from typing import Optional
+from app.auth import get_thumbnail_user
+from app.services.thumbnails import ThumbnailError, ThumbnailService, etag_for, get_thumbnail_service
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/thumbnails", tags=["thumbnails"])
+
+# A thumbnail URL (file ID + source URL + width) always maps to the same
+# image, so browsers may keep it; "private" keeps it out of shared caches
+THUMBNAIL_CACHE_CONTROL = "private, max-age=31536000"
+
+
+@router.get("/{file_id}")
+async def get_thumbnail(
+    file_id: str,
+    w: int = Query(..., description="Thumbnail width in pixels (one of THUMBNAIL_WIDTHS)"),
+    src: str = Query(..., description="Original Webflow CDN URL of the image"),
+    if_none_match: Optional[str] = Header(None),
+    thumbnails: ThumbnailService = Depends(get_thumbnail_service),
+    current_user: dict = Depends(get_thumbnail_user),
+):
+    """
+    Serve a resized WebP copy of a Webflow CDN image.
+
+    The original is fetched once and resized to every configured width; the
+    results are kept in an LRU disk cache keyed by the file ID and source
+    URL. Requires a thumbnail token (``t``, from
+    ``GET /api/v1/auth/thumbnail-token``) or a session; only images on
+    allowlisted Webflow CDN hosts whose path names the file ID are proxied.
+    """
+    etag = etag_for(file_id, w, src)
+    headers = {"Cache-Control": THUMBNAIL_CACHE_CONTROL, "ETag": etag}
+    try:
+        thumbnails.validate(file_id, w, src)
+        if if_none_match == etag:
+            return Response(status_code=304, headers=headers)
+        data = await thumbnails.get(file_id, w, src)
+    except ThumbnailError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    return Response(content=data, media_type="image/webp", headers=headers)
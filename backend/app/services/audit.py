@@ -0,0 +1,267 @@
+"""Collection-wide alt-text audit, computed incrementally in the background.
+
+An audit streams every item of a collection through the paginated Webflow
+client and folds each item into one accumulator: coverage, alt-text length
+histogram and exact-duplicate groups. Each item's extracted image/alt-text
+data ("contribution") is kept in a Redis hash together with the item's
+``lastUpdated``; on the next run only items whose ``lastUpdated`` changed
+are re-extracted, removed items are dropped, and the report is rebuilt from
+the stored contributions.
+
+A cached report counts as stale once alt text was applied through this app
+or once it is older than the configured max age (edits made directly in
+Webflow are only picked up by a re-run). The last failed run is recorded so
+the endpoint can surface it instead of silently serving an old report, and
+so reads don't queue another run until a cooldown has passed.
+"""
+
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+import redis
+
+from app.config import settings
+from app.services.image_fields import ImageFieldExtractor, schema_registry
+from app.storage import redis_client
+
+logger = logging.getLogger(__name__)
+
+AUDIT_PREFIX = "audit"
+
+# Longest alt text considered SEO-friendly (same limit the generator uses)
+ALT_TEXT_LIMIT = 125
+
+# (upper bound inclusive, label) of the length histogram buckets
+LENGTH_BUCKETS = ((0, "missing"), (25, "1-25"), (50, "26-50"), (100, "51-100"), (ALT_TEXT_LIMIT, "101-125"))
+OVER_LIMIT_BUCKET = f"{ALT_TEXT_LIMIT + 1}+"
+
+# Duplicate groups included in a report, largest first
+MAX_DUPLICATE_GROUPS = 100
+
+# Contributions written to Redis per HSET
+_WRITE_CHUNK = 500
+
+
+def _length_bucket(length: int) -> str:
+    for upper, label in LENGTH_BUCKETS:
+        if length <= upper:
+            return label
+    return OVER_LIMIT_BUCKET
+
+
+def item_contribution(raw_item: dict, extractor: ImageFieldExtractor) -> dict:
+    """Extract what the audit needs from one raw Webflow item."""
+    field_data = raw_item.get("fieldData", {})
+    return {
+        "last_updated": raw_item.get("lastUpdated"),
+        "name": field_data.get("name", "Untitled"),
+        "images": [
+            [image_field, (alt_text or "").strip()]
+            for image_field, _, _, alt_text in extractor.iter_images(field_data)
+        ],
+    }
+
+
+class AuditAccumulator:
+    """Single-pass fold of item contributions into report figures."""
+
+    def __init__(self):
+        self.items = 0
+        self.images = 0
+        self.with_alt = 0
+        self.over_limit = 0
+        self.histogram = {label: 0 for _, label in LENGTH_BUCKETS}
+        self.histogram[OVER_LIMIT_BUCKET] = 0
+        self.by_alt_text: dict[str, list[tuple[str, str, str]]] = defaultdict(list)
+
+    def add(self, item_id: str, contribution: dict) -> None:
+        self.items += 1
+        for image_field, alt_text in contribution["images"]:
+            self.images += 1
+            length = len(alt_text)
+            self.histogram[_length_bucket(length)] += 1
+            if length:
+                self.with_alt += 1
+                self.by_alt_text[alt_text].append((item_id, contribution["name"], image_field))
+            if length > ALT_TEXT_LIMIT:
+                self.over_limit += 1
+
+    def report(self, collection_id: str) -> dict:
+        groups = sorted(
+            ((alt_text, refs) for alt_text, refs in self.by_alt_text.items() if len(refs) > 1),
+            key=lambda group: (-len(group[1]), group[0]),
+        )
+        return {
+            "collection_id": collection_id,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "items": self.items,
+            "images": self.images,
+            "with_alt": self.with_alt,
+            "missing_alt": self.images - self.with_alt,
+            "over_limit": self.over_limit,
+            "coverage_percentage": round(self.with_alt / self.images * 100, 2) if self.images else 100.0,
+            "length_histogram": self.histogram,
+            "duplicate_group_count": len(groups),
+            "duplicate_groups": [
+                {
+                    "alt_text": alt_text,
+                    "count": len(refs),
+                    "images": [
+                        {"item_id": item_id, "item_name": name, "field_name": field}
+                        for item_id, name, field in refs
+                    ],
+                }
+                for alt_text, refs in groups[:MAX_DUPLICATE_GROUPS]
+            ],
+        }
+
+
+class CollectionAuditor:
+    """Runs audits and stores contributions, reports and run locks in Redis."""
+
+    def __init__(
+        self,
+        redis_client,
+        lock_ttl_seconds: int = 1800,
+        report_max_age_seconds: int = 0,
+        retry_cooldown_seconds: int = 0,
+    ):
+        self._redis = redis_client
+        self.lock_ttl_seconds = lock_ttl_seconds
+        self.report_max_age_seconds = report_max_age_seconds
+        self.retry_cooldown_seconds = retry_cooldown_seconds
+
+    @staticmethod
+    def _key(collection_id: str, part: str) -> str:
+        return f"{AUDIT_PREFIX}:{collection_id}:{part}"
+
+    # --- Report cache ---
+
+    def get_report(self, collection_id: str) -> Optional[dict]:
+        raw = self._redis.get(self._key(collection_id, "report"))
+        return json.loads(raw) if raw else None
+
+    def is_stale(self, collection_id: str, report: Optional[dict] = None) -> bool:
+        """Whether the report was flagged outdated or (if given) is past its max age."""
+        if self._redis.exists(self._key(collection_id, "stale")):
+            return True
+        if report is None or not self.report_max_age_seconds:
+            return False
+        generated_at = datetime.fromisoformat(report["generated_at"])
+        age = (datetime.now(timezone.utc) - generated_at).total_seconds()
+        return age > self.report_max_age_seconds
+
+    def mark_stale(self, collection_id: str) -> None:
+        """Flag the cached report as outdated (e.g. after alt text was applied)."""
+        try:
+            self._redis.set(self._key(collection_id, "stale"), "1")
+        except redis.RedisError as e:
+            logger.warning("Failed to mark audit stale", extra={"collection_id": collection_id, "error": str(e)})
+
+    # --- Last failure ---
+
+    def get_error(self, collection_id: str) -> Optional[dict]:
+        raw = self._redis.get(self._key(collection_id, "error"))
+        return json.loads(raw) if raw else None
+
+    def record_error(self, collection_id: str, error: str) -> None:
+        """Remember why the last run failed; cleared by the next successful run."""
+        payload = {"error": error, "failed_at": datetime.now(timezone.utc).isoformat()}
+        try:
+            self._redis.set(self._key(collection_id, "error"), json.dumps(payload))
+        except redis.RedisError as e:
+            logger.warning("Failed to record audit error", extra={"collection_id": collection_id, "error": str(e)})
+
+    def in_cooldown(self, error: Optional[dict]) -> bool:
+        """Whether a failure (from ``get_error``) is too recent to queue another run."""
+        if error is None or not self.retry_cooldown_seconds:
+            return False
+        failed_at = datetime.fromisoformat(error["failed_at"])
+        return (datetime.now(timezone.utc) - failed_at).total_seconds() < self.retry_cooldown_seconds
+
+    # --- Run lock (one audit per collection at a time) ---
+
+    def try_acquire(self, collection_id: str) -> bool:
+        return bool(self._redis.set(self._key(collection_id, "running"), "1", nx=True, ex=self.lock_ttl_seconds))
+
+    def is_running(self, collection_id: str) -> bool:
+        return bool(self._redis.exists(self._key(collection_id, "running")))
+
+    def release(self, collection_id: str) -> None:
+        self._redis.delete(self._key(collection_id, "running"))
+
+    # --- Audit ---
+
+    async def run(self, client, collection_id: str) -> dict:
+        """Audit a collection, re-extracting only items changed since the last run."""
+        extractor = await schema_registry.get_extractor(client, collection_id)
+        items_key = self._key(collection_id, "items")
+        fields_key = self._key(collection_id, "fields")
+
+        # Cleared up front so an apply during the run marks the new report stale
+        self._redis.delete(self._key(collection_id, "stale"))
+
+        # A schema change (different image fields) invalidates every contribution
+        fields = json.dumps([extractor.pairs, extractor.native_alt_fields, extractor.multi_image_fields])
+        stored = {}
+        if self._redis.get(fields_key) == fields:
+            stored = {item_id: json.loads(raw) for item_id, raw in self._redis.hgetall(items_key).items()}
+
+        accumulator = AuditAccumulator()
+        changed: dict[str, str] = {}
+        seen: set[str] = set()
+        async for page in client.iter_collection_items(collection_id):
+            for raw_item in page:
+                item_id = raw_item["id"]
+                seen.add(item_id)
+                contribution = stored.get(item_id)
+                if contribution is None or contribution.get("last_updated") != raw_item.get("lastUpdated"):
+                    contribution = item_contribution(raw_item, extractor)
+                    changed[item_id] = json.dumps(contribution)
+                accumulator.add(item_id, contribution)
+
+        removed = [item_id for item_id in stored if item_id not in seen]
+        if not stored:
+            self._redis.delete(items_key)
+        elif removed:
+            self._redis.hdel(items_key, *removed)
+        changed_ids = list(changed)
+        for start in range(0, len(changed_ids), _WRITE_CHUNK):
+            chunk = changed_ids[start:start + _WRITE_CHUNK]
+            self._redis.hset(items_key, mapping={item_id: changed[item_id] for item_id in chunk})
+        self._redis.set(fields_key, fields)
+
+        report = accumulator.report(collection_id)
+        report["items_recomputed"] = len(changed)
+        report["items_removed"] = len(removed)
+        self._redis.set(self._key(collection_id, "report"), json.dumps(report))
+        self._redis.delete(self._key(collection_id, "error"))
+        logger.info(
+            "Collection audit completed",
+            extra={
+                "collection_id": collection_id,
+                "items": report["items"],
+                "items_recomputed": report["items_recomputed"],
+                "items_removed": report["items_removed"],
+            },
+        )
+        return report
+
+
+_auditor: Optional[CollectionAuditor] = None
+
+
+def get_collection_auditor() -> CollectionAuditor:
+    """Return the process-wide collection auditor."""
+    global _auditor
+    if _auditor is None:
+        _auditor = CollectionAuditor(
+            redis_client,
+            lock_ttl_seconds=settings.audit_lock_seconds,
+            report_max_age_seconds=settings.audit_report_max_age_seconds,
+            retry_cooldown_seconds=settings.audit_retry_cooldown_seconds,
+        )
+    return _auditor
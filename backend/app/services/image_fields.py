@@ -0,0 +1,197 @@
+"""Collection schema discovery and image/alt-text field extraction.
+
+Webflow collections describe their fields in a schema. Every ``Image`` field
+that has a companion ``<slug>-alt-text`` field becomes an image/alt-text pair.
+Other ``Image`` fields, and each image of a ``MultiImage`` field, use the
+native ``alt`` stored on the image value itself. The fields are resolved once
+per collection (cached with a TTL) into an ``ImageFieldExtractor`` that the
+items endpoint and the job planner share, so no per-item field-name building
+happens in the hot loop.
+
+Every image has an image key (``CMSItem`` field name) and an alt key (where
+its alt text is written):
+
+- companion pair: ``hero`` / ``hero-alt-text``
+- native alt: ``logo`` / ``logo``
+- MultiImage: ``gallery[0]`` / ``gallery[0]`` (position in the list)
+"""
+
+import copy
+import logging
+import re
+import time
+from typing import Iterator, Optional
+
+from app.config import settings
+from app.models import CMSItem, ImageWithAltText
+
+logger = logging.getLogger(__name__)
+
+ALT_TEXT_SUFFIX = "-alt-text"
+IMAGE_FIELD_TYPES = frozenset({"Image"})
+MULTI_IMAGE_FIELD_TYPES = frozenset({"MultiImage"})
+_MULTI_IMAGE_KEY = re.compile(r"^(?P<field>.+)\[(?P<index>\d+)\]$")
+
+# Field pairs of the original collection, used when the schema can't be fetched
+LEGACY_FIELD_PAIRS = tuple((f"{i}-after", f"{i}-after{ALT_TEXT_SUFFIX}") for i in range(1, 5))
+
+
+class ImageFieldExtractor:
+    """Precompiled image fields of one collection.
+
+    ``pairs`` are (image_field, alt_field) companions; ``native_alt_fields``
+    are Image fields and ``multi_image_fields`` MultiImage fields whose alt
+    text lives on the image values.
+    """
+
+    def __init__(
+        self,
+        pairs: tuple[tuple[str, str], ...],
+        native_alt_fields: tuple[str, ...] = (),
+        multi_image_fields: tuple[str, ...] = (),
+    ):
+        self.pairs = pairs
+        self.native_alt_fields = native_alt_fields
+        self.multi_image_fields = multi_image_fields
+        self.alt_field_for = dict(pairs)
+
+    @classmethod
+    def from_schema(cls, schema: dict) -> "ImageFieldExtractor":
+        """Build an extractor from a Webflow collection schema (``GET /collections/{id}``)."""
+        fields = schema.get("fields", [])
+        slugs = {f.get("slug") for f in fields}
+        images = [f["slug"] for f in fields if f.get("type") in IMAGE_FIELD_TYPES]
+        pairs = tuple((slug, f"{slug}{ALT_TEXT_SUFFIX}") for slug in images if f"{slug}{ALT_TEXT_SUFFIX}" in slugs)
+        return cls(
+            pairs,
+            native_alt_fields=tuple(slug for slug in images if f"{slug}{ALT_TEXT_SUFFIX}" not in slugs),
+            multi_image_fields=tuple(f["slug"] for f in fields if f.get("type") in MULTI_IMAGE_FIELD_TYPES),
+        )
+
+    @property
+    def image_fields(self) -> list[str]:
+        """Slugs of every image field, companion-paired or not."""
+        return [p[0] for p in self.pairs] + list(self.native_alt_fields) + list(self.multi_image_fields)
+
+    def iter_images(self, field_data: dict) -> Iterator[tuple[str, str, dict, Optional[str]]]:
+        """Yield ``(image_key, alt_key, image_data, current_alt)`` for images present on an item."""
+        for image_field, alt_field in self.pairs:
+            image_data = field_data.get(image_field)
+            if image_data and isinstance(image_data, dict):
+                yield image_field, alt_field, image_data, field_data.get(alt_field)
+        for image_field in self.native_alt_fields:
+            image_data = field_data.get(image_field)
+            if image_data and isinstance(image_data, dict):
+                yield image_field, image_field, image_data, image_data.get("alt")
+        for image_field in self.multi_image_fields:
+            for index, image_data in enumerate(field_data.get(image_field) or []):
+                if image_data and isinstance(image_data, dict):
+                    key = f"{image_field}[{index}]"
+                    yield key, key, image_data, image_data.get("alt")
+
+    def alt_key_for(self, key: str) -> str:
+        """Map an image key to its alt key; alt keys (and unknown fields) pass through."""
+        return self.alt_field_for.get(key, key)
+
+    def _native_target(self, alt_key: str) -> Optional[tuple[str, Optional[int]]]:
+        """``(field, index)`` for an alt key stored on an image value, else None."""
+        if alt_key in self.native_alt_fields:
+            return alt_key, None
+        match = _MULTI_IMAGE_KEY.match(alt_key)
+        if match and match["field"] in self.multi_image_fields:
+            return match["field"], int(match["index"])
+        return None
+
+    def needs_current_item(self, alt_keys) -> bool:
+        """Whether writing these alt keys requires the item's current image values."""
+        return any(self._native_target(key) for key in alt_keys)
+
+    def build_update(self, alt_texts: dict[str, str], field_data: Optional[dict] = None) -> dict:
+        """Turn ``{alt_key: text}`` into a Webflow ``fieldData`` patch.
+
+        Companion alt fields are written as plain text. Native alts are set on
+        a copy of the image value from ``field_data`` (the item's current
+        ``fieldData``); a MultiImage field is rewritten as a whole list.
+        Raises ValueError if a native alt key has no image on the item.
+        """
+        patch: dict = {}
+        for alt_key, text in alt_texts.items():
+            target = self._native_target(alt_key)
+            if target is None:
+                patch[alt_key] = text
+                continue
+            field, index = target
+            if field not in patch:
+                patch[field] = copy.deepcopy((field_data or {}).get(field))
+            image_data = patch[field] if index is None else _list_get(patch[field], index)
+            if not isinstance(image_data, dict):
+                raise ValueError(f"No image at {alt_key}")
+            image_data["alt"] = text
+        return patch
+
+    def to_cms_item(self, raw_item: dict) -> CMSItem:
+        """Project a raw Webflow item into a ``CMSItem``."""
+        field_data = raw_item.get("fieldData", {})
+        return CMSItem(
+            id=raw_item["id"],
+            name=field_data.get("name", "Untitled"),
+            slug=field_data.get("slug", ""),
+            images=[
+                ImageWithAltText(
+                    field_name=image_field,
+                    image_url=image_data.get("url"),
+                    current_alt_text=alt_text,
+                    file_id=image_data.get("fileId"),
+                )
+                for image_field, _, image_data, alt_text in self.iter_images(field_data)
+            ],
+        )
+
+
+def _list_get(values, index: int):
+    """``values[index]`` if ``values`` is a list long enough, else None."""
+    return values[index] if isinstance(values, list) and index < len(values) else None
+
+
+LEGACY_EXTRACTOR = ImageFieldExtractor(LEGACY_FIELD_PAIRS)
+
+
+class SchemaRegistry:
+    """In-process TTL cache of collection schemas compiled into extractors."""
+
+    def __init__(self, ttl_seconds: int = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, ImageFieldExtractor]] = {}
+
+    async def get_extractor(self, client, collection_id: str) -> ImageFieldExtractor:
+        """Return the extractor for a collection, fetching its schema when stale.
+
+        Falls back to the legacy ``N-after`` pairs if the schema can't be fetched.
+        """
+        entry = self._entries.get(collection_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        try:
+            schema = await client.get_collection(collection_id)
+            extractor = ImageFieldExtractor.from_schema(schema)
+            logger.info(
+                "Collection schema loaded",
+                extra={"collection_id": collection_id, "image_fields": extractor.image_fields},
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to fetch collection schema, using default image fields",
+                extra={"collection_id": collection_id, "error": str(e)},
+            )
+            return LEGACY_EXTRACTOR
+
+        self._entries[collection_id] = (time.monotonic() + self.ttl_seconds, extractor)
+        return extractor
+
+    def invalidate(self, collection_id: str) -> None:
+        """Forget a collection's cached schema."""
+        self._entries.pop(collection_id, None)
+
+
+schema_registry = SchemaRegistry(ttl_seconds=settings.collection_schema_ttl_seconds)
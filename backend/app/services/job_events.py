@@ -0,0 +1,84 @@
+"""Job progress events over Redis pub/sub.
+
+The Celery worker publishes an event on each progress step, each new
+proposal and on completion/failure. ``GET /api/v1/jobs/{id}/events``
+subscribes to the job's channel and relays the events to the browser as
+Server-Sent Events, so clients no longer poll the job status endpoint.
+"""
+
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import orjson
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+from app.storage import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "job_events"
+
+# Events after which no more events are published for a job
+TERMINAL_EVENTS = frozenset({"completed", "failed"})
+
+
+def channel_for(job_id: str) -> str:
+    return f"{CHANNEL_PREFIX}:{job_id}"
+
+
+class JobEvents:
+    """Publishes job events (sync, from the worker) and subscribes to them (async, in the API)."""
+
+    def __init__(self, redis_client, async_redis_client):
+        self._redis = redis_client
+        self._async_redis = async_redis_client
+
+    def publish(self, job_id: str, event: str, data: dict) -> None:
+        """Publish one event; failures are logged, never raised into the job."""
+        message = orjson.dumps({"event": event, "data": data})
+        try:
+            self._redis.publish(channel_for(job_id), message)
+        except redis.RedisError as e:
+            logger.warning("Job event publish failed", extra={"job_id": job_id, "event": event, "error": str(e)})
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str) -> AsyncIterator["JobEventSubscription"]:
+        """Subscribe to a job's channel for the duration of the ``async with`` block."""
+        channel = channel_for(job_id)
+        pubsub = self._async_redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield JobEventSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+
+
+class JobEventSubscription:
+    """An open subscription to one job's events."""
+
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    async def next_event(self, timeout: float) -> Optional[dict]:
+        """Wait up to ``timeout`` seconds for the next ``{"event", "data"}`` message."""
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return orjson.loads(message["data"])
+
+
+_job_events: Optional[JobEvents] = None
+
+
+def get_job_events() -> JobEvents:
+    """Return the process-wide job event bus, connecting on first use."""
+    global _job_events
+    if _job_events is None:
+        _job_events = JobEvents(
+            redis_client, aioredis.from_url(settings.redis_url, decode_responses=True)
+        )
+    return _job_events
@@ -0,0 +1,231 @@
+"""Time-sorted secondary index of jobs in Redis sorted sets.
+
+Job documents live in ``jobs_db`` (Cosmos DB or Redis) keyed by job ID only.
+To list them without scanning, every job is also recorded in sorted sets
+scored by its creation time:
+
+- ``idx:jobs:all``
+- ``idx:jobs:user:{user_id}``
+- ``idx:jobs:status:{status}``
+- ``idx:jobs:user:{user_id}:status:{status}``
+
+so any combination of the created_by/status filters maps to exactly one
+set, read newest-first with a score range and keyset cursor.
+
+``JobIndex`` uses the sync Redis client (Celery tasks, retention);
+``AsyncJobIndex`` maintains the same sets through ``redis.asyncio`` for the
+API's request handlers.
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+
+import redis
+
+from app.async_storage import async_redis_client
+from app.models import JobStatus
+from app.storage import redis_client
+
+logger = logging.getLogger(__name__)
+
+INDEX_PREFIX = "idx:jobs"
+
+
+def encode_cursor(score: float, job_id: str) -> str:
+    """Encode a (score, job_id) position as an opaque cursor string."""
+    return base64.urlsafe_b64encode(json.dumps([score, job_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    """Decode a cursor produced by ``encode_cursor``. Raises ValueError if malformed."""
+    try:
+        score, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), str(job_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, JobStatus) else str(status)
+
+
+class JobIndex:
+    """Maintains and queries the job sorted sets."""
+
+    def __init__(self, redis_client):
+        self._redis = redis_client
+
+    @staticmethod
+    def index_key(created_by: Optional[str] = None, status: Optional[str] = None) -> str:
+        key = INDEX_PREFIX
+        if created_by:
+            key += f":user:{created_by}"
+        if status:
+            key += f":status:{_status_value(status)}"
+        return key if key != INDEX_PREFIX else f"{INDEX_PREFIX}:all"
+
+    def _upsert_plan(self, job: dict) -> tuple[float, list[str], list[str]]:
+        """The job's score, the sets it belongs in and the sets it must leave."""
+        created_by = job.get("created_by")
+        status = _status_value(job["status"])
+        score = datetime.fromisoformat(str(job["created_at"])).timestamp()
+
+        current = [self.index_key(), self.index_key(status=status)]
+        stale = [self.index_key(status=s) for s in JobStatus if s.value != status]
+        if created_by:
+            current += [self.index_key(created_by), self.index_key(created_by, status)]
+            stale += [self.index_key(created_by, s) for s in JobStatus if s.value != status]
+        return score, current, stale
+
+    @staticmethod
+    def _queue_upsert(pipe, job_id: str, score: float, current: list[str], stale: list[str]) -> None:
+        for key in stale:
+            pipe.zrem(key, job_id)
+        for key in current:
+            pipe.zadd(key, {job_id: score})
+
+    def upsert(self, job: dict) -> None:
+        """Record a job's current status in the index (idempotent).
+
+        Call after every status change: the job is removed from the sets of
+        its other statuses and added to the current one, in one MULTI/EXEC
+        round trip, so it is never left in two status sets.
+        """
+        job_id = job["job_id"]
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_upsert(pipe, job_id, *self._upsert_plan(job))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Job index update failed", extra={"job_id": job_id, "error": str(e)})
+
+    def _query_range(
+        self,
+        created_by: Optional[str],
+        status: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        cursor: Optional[str],
+    ) -> tuple[str, float | str, float | str, Optional[tuple[float, str]]]:
+        """The set to read, its score bounds and the decoded cursor position."""
+        key = self.index_key(created_by, status)
+        max_score: float | str = until.timestamp() if until else "+inf"
+        min_score: float | str = since.timestamp() if since else "-inf"
+        after: Optional[tuple[float, str]] = None
+        if cursor:
+            after = decode_cursor(cursor)
+            max_score = after[0] if max_score == "+inf" else min(max_score, after[0])
+        return key, max_score, min_score, after
+
+    @staticmethod
+    def _collect(page: list[tuple[str, float]], chunk, after: Optional[tuple[float, str]]) -> None:
+        # Members sharing the cursor's score are returned in reverse lexical
+        # order, so skip those at or before the cursor's job ID
+        for job_id, score in chunk:
+            if after and score == after[0] and job_id >= after[1]:
+                continue
+            page.append((job_id, score))
+
+    @staticmethod
+    def _finish(page: list[tuple[str, float]], limit: int) -> tuple[list[str], Optional[str]]:
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1][1], page[-1][0])
+        return [job_id for job_id, _ in page], next_cursor
+
+    def query(
+        self,
+        created_by: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> tuple[list[str], Optional[str]]:
+        """Return ``(job_ids, next_cursor)``, newest first.
+
+        ``since``/``until`` bound the creation time (inclusive).
+        """
+        key, max_score, min_score, after = self._query_range(created_by, status, since, until, cursor)
+        page: list[tuple[str, float]] = []
+        offset = 0
+        chunk_size = limit + 1
+        while len(page) <= limit:
+            chunk = self._redis.zrevrangebyscore(
+                key, max_score, min_score, start=offset, num=chunk_size, withscores=True
+            )
+            self._collect(page, chunk, after)
+            if len(chunk) < chunk_size:
+                break
+            offset += chunk_size
+        return self._finish(page, limit)
+
+    def prune(self, before: datetime) -> int:
+        """Drop jobs created before ``before`` from every index set (expired jobs). Returns the count."""
+        removed = 0
+        for key in self._redis.scan_iter(match=f"{INDEX_PREFIX}:*", count=1000):
+            removed += self._redis.zremrangebyscore(key, "-inf", f"({before.timestamp()}")
+        return removed
+
+
+class AsyncJobIndex(JobIndex):
+    """``JobIndex`` over a ``redis.asyncio`` client, for the API's request handlers."""
+
+    async def upsert(self, job: dict) -> None:
+        job_id = job["job_id"]
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            self._queue_upsert(pipe, job_id, *self._upsert_plan(job))
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Job index update failed", extra={"job_id": job_id, "error": str(e)})
+
+    async def query(
+        self,
+        created_by: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> tuple[list[str], Optional[str]]:
+        key, max_score, min_score, after = self._query_range(created_by, status, since, until, cursor)
+        page: list[tuple[str, float]] = []
+        offset = 0
+        chunk_size = limit + 1
+        while len(page) <= limit:
+            chunk = await self._redis.zrevrangebyscore(
+                key, max_score, min_score, start=offset, num=chunk_size, withscores=True
+            )
+            self._collect(page, chunk, after)
+            if len(chunk) < chunk_size:
+                break
+            offset += chunk_size
+        return self._finish(page, limit)
+
+    def prune(self, before: datetime) -> int:
+        raise NotImplementedError("Pruning runs in the retention task (JobIndex)")
+
+
+_job_index: Optional[JobIndex] = None
+_async_job_index: Optional[AsyncJobIndex] = None
+
+
+def get_job_index() -> JobIndex:
+    """Return the process-wide job index."""
+    global _job_index
+    if _job_index is None:
+        _job_index = JobIndex(redis_client)
+    return _job_index
+
+
+def get_async_job_index() -> AsyncJobIndex:
+    """Return the process-wide job index for async request handlers."""
+    global _async_job_index
+    if _async_job_index is None:
+        _async_job_index = AsyncJobIndex(async_redis_client)
+    return _async_job_index
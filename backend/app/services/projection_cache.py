@@ -0,0 +1,90 @@
+"""Cache of already-serialized ``CMSItemResponse`` pages for the items endpoint.
+
+Building a page means transforming raw Webflow JSON into Pydantic models and
+serializing them again. This cache stores the final JSON per
+``(collection_id, limit, offset)`` so repeat views return the bytes directly.
+Entries expire after a TTL and are dropped whenever the collection changes
+through this app (apply, search re-index). Only the API uses it, so it talks
+to Redis through the ``redis.asyncio`` client.
+"""
+
+import logging
+from typing import Optional
+
+import redis
+
+from app.async_storage import async_redis_client
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "items_proj"
+
+
+class ProjectionCache:
+    """Redis-backed store of serialized item pages, invalidated per collection."""
+
+    def __init__(self, redis_client, ttl_seconds: int = 300):
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _page_key(collection_id: str, limit: int, offset: int) -> str:
+        return f"{CACHE_PREFIX}:{collection_id}:{limit}:{offset}"
+
+    @staticmethod
+    def _members_key(collection_id: str) -> str:
+        return f"{CACHE_PREFIX}:{collection_id}:pages"
+
+    async def get(self, collection_id: str, limit: int, offset: int) -> Optional[str]:
+        """Return the cached JSON for a page, or None."""
+        try:
+            return await self._redis.get(self._page_key(collection_id, limit, offset))
+        except redis.RedisError as e:
+            logger.warning("Projection cache read failed", extra={"error": str(e)})
+            return None
+
+    async def store(self, collection_id: str, limit: int, offset: int, payload: str) -> None:
+        """Cache a page's serialized JSON.
+
+        The page and its entry in the collection's key set are written in one
+        MULTI/EXEC, so a cached page can't be missing from the set (and
+        survive ``invalidate``).
+        """
+        key = self._page_key(collection_id, limit, offset)
+        members = self._members_key(collection_id)
+        try:
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.setex(key, self.ttl_seconds, payload)
+            pipe.sadd(members, key)
+            pipe.expire(members, self.ttl_seconds)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Projection cache write failed", extra={"error": str(e)})
+
+    async def invalidate(self, collection_id: str) -> None:
+        """Drop every cached page of a collection."""
+        members = self._members_key(collection_id)
+        try:
+            keys = await self._redis.smembers(members)
+            await self._redis.delete(members, *keys)
+        except redis.RedisError as e:
+            logger.warning("Projection cache invalidation failed", extra={"error": str(e)})
+            return
+        logger.info(
+            "Invalidated item projections",
+            extra={"collection_id": collection_id, "pages": len(keys)},
+        )
+
+
+_projection_cache: Optional[ProjectionCache] = None
+
+
+def get_projection_cache() -> Optional[ProjectionCache]:
+    """Return the shared projection cache, or None when disabled."""
+    global _projection_cache
+    if not settings.items_projection_cache_enabled:
+        return None
+    if _projection_cache is None:
+        _projection_cache = ProjectionCache(async_redis_client, ttl_seconds=settings.items_projection_ttl_seconds)
+    return _projection_cache
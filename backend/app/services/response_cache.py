@@ -0,0 +1,146 @@
+"""Redis-backed HTTP response cache for conditional GETs against Webflow.
+
+Each entry stores the JSON body of a successful response together with the
+validators (``ETag`` / ``Last-Modified``) the server sent.  On the next
+request the client sends ``If-None-Match`` / ``If-Modified-Since`` and, on a
+``304 Not Modified``, serves the cached body instead of re-downloading it.
+
+Entries are keyed by a fingerprint of the API token as well as the URL, so
+a response fetched with one token is never served to a client using another.
+
+The cache talks to Redis through ``redis.asyncio`` so lookups don't block
+the event loop. Cache failures never break a request: if Redis is
+unavailable the cache behaves as a permanent miss.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.async_storage import async_redis_client
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "webflow_cache"
+STATS_KEY = f"{CACHE_PREFIX}:stats"
+
+
+class ResponseCache:
+    """Stores validated Webflow responses keyed by token + URL + query params."""
+
+    def __init__(self, redis_client, ttl_seconds: int = 3600):
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def make_key(url: str, params: Optional[dict] = None, api_token: Optional[str] = None) -> str:
+        """Build a stable cache key from the API token, a URL and its query params.
+
+        Only a hash of the token goes into the key.
+        """
+        token_fingerprint = hashlib.sha256(api_token.encode()).hexdigest() if api_token else None
+        canonical = json.dumps(
+            {"token": token_fingerprint, "url": url, "params": sorted((params or {}).items())},
+            default=str,
+        )
+        digest = hashlib.sha256(canonical.encode()).hexdigest()[:32]
+        return f"{CACHE_PREFIX}:{digest}"
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Return the cached entry (``etag``, ``last_modified``, ``body``) or None."""
+        try:
+            raw = await self._redis.get(key)
+        except redis.RedisError as e:
+            logger.warning("Response cache read failed", extra={"error": str(e)})
+            return None
+        return json.loads(raw) if raw else None
+
+    async def store(self, key: str, body: dict, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store a response body with its validators. No-op without validators."""
+        if not etag and not last_modified:
+            return
+        entry = {"etag": etag, "last_modified": last_modified, "body": body}
+        try:
+            await self._redis.setex(key, self.ttl_seconds, json.dumps(entry))
+        except redis.RedisError as e:
+            logger.warning("Response cache write failed", extra={"error": str(e)})
+
+    async def touch(self, key: str) -> None:
+        """Extend the TTL of an entry that was just revalidated."""
+        try:
+            await self._redis.expire(key, self.ttl_seconds)
+        except redis.RedisError:
+            pass
+
+    @staticmethod
+    def conditional_headers(entry: Optional[dict]) -> dict:
+        """Return the conditional request headers for a cached entry."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    # --- Metrics ---
+
+    async def record(self, outcome: str) -> None:
+        """Increment a counter: ``hit`` (304 served from cache) or ``miss``."""
+        try:
+            await self._redis.hincrby(STATS_KEY, outcome, 1)
+        except redis.RedisError:
+            pass
+
+    async def stats(self) -> dict:
+        """Return aggregated hit/miss counters across all processes."""
+        try:
+            raw = await self._redis.hgetall(STATS_KEY) or {}
+        except redis.RedisError as e:
+            logger.warning("Response cache stats read failed", extra={"error": str(e)})
+            raw = {}
+        hits = int(raw.get("hit", 0))
+        misses = int(raw.get("miss", 0))
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        """Close the Redis connections of a cache built by ``create_response_cache``."""
+        await self._redis.aclose()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache, or None when caching is disabled."""
+    global _response_cache
+    if not settings.webflow_cache_enabled:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(async_redis_client, ttl_seconds=settings.webflow_cache_ttl_seconds)
+    return _response_cache
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Build a response cache on its own Redis connections, or None when disabled.
+
+    For Celery tasks, which run each job in a fresh event loop: ``redis.asyncio``
+    connections can't move between loops, so the task closes the cache with
+    ``aclose()`` before its loop ends.
+    """
+    if not settings.webflow_cache_enabled:
+        return None
+    return ResponseCache(
+        aioredis.Redis.from_url(settings.redis_url, decode_responses=True),
+        ttl_seconds=settings.webflow_cache_ttl_seconds,
+    )
@@ -0,0 +1,248 @@
+"""Retention and archival of jobs and proposals.
+
+Jobs and their proposals used to be kept forever, so Redis (which also
+holds the Celery broker and sessions) grew without bound. With
+``JOB_RETENTION_DAYS`` set:
+
+- every write to ``jobs_db``/``proposals_db`` sets a Redis key TTL of that
+  many days (``RedisStorage.ttl_seconds``); on Cosmos DB the containers'
+  ``defaultTtl`` does the same (``scripts.apply_retention`` sets it, and
+  adds a TTL to Redis keys written before retention was enabled);
+- the periodic ``enforce_retention`` task drops expired jobs from the job
+  index, whose sorted sets don't expire with the documents.
+
+With ``RETENTION_ARCHIVE`` set, that task also moves the proposals of jobs
+older than ``RETENTION_ARCHIVE_AFTER_DAYS`` into cold storage: each job's
+proposals are gzip-compressed into a file or the archive container, and
+the hot copy is replaced by a small stub (``archived_proposals``) so the
+proposals endpoint can answer 410 instead of an empty list. Jobs are found
+through the job index and only those created since the previous run are
+visited (``retention:archived_until``).
+"""
+
+import base64
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.cached_storage import uncached
+from app.config import settings
+from app.services.job_index import JobIndex
+from app.storage import jobs_db, proposals_db, redis_client
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_KEY = "retention:archived_until"
+LAST_RUN_KEY = "retention:last_run"
+
+# Jobs read per batch while archiving
+_ARCHIVE_BATCH = 100
+
+
+def is_archived(proposals) -> bool:
+    """True for the stub left in ``proposals_db`` once a job's proposals are archived."""
+    return isinstance(proposals, dict) and "archived_at" in proposals
+
+
+def archived_proposals(archived_at: datetime, total: int) -> dict:
+    return {"archived_at": archived_at.isoformat(), "archive": settings.retention_archive, "total": total}
+
+
+class FileProposalArchive:
+    """Appends archived jobs as gzip-compressed JSON lines, one file per archive day."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def write(self, records: list[dict], now: datetime) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"proposals-{now:%Y-%m-%d}.jsonl.gz")
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in records)
+        # Each append is its own gzip member; gzip readers concatenate them
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.write(lines)
+
+    def stats(self) -> dict:
+        files = []
+        if os.path.isdir(self.directory):
+            files = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".jsonl.gz")]
+        return {
+            "type": "file",
+            "directory": self.directory,
+            "files": len(files),
+            "bytes": sum(entry.stat().st_size for entry in files),
+        }
+
+
+class CosmosProposalArchive:
+    """Stores each archived job as one document with its proposals gzip-compressed."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def write(self, records: list[dict], now: datetime) -> None:
+        documents = {}
+        for record in records:
+            document = {key: value for key, value in record.items() if key != "proposals"}
+            document["proposals_gzip"] = base64.b64encode(
+                gzip.compress(json.dumps(record["proposals"], default=str).encode())
+            ).decode()
+            documents[record["job_id"]] = document
+        self.storage.set_many(documents)
+
+    def stats(self) -> dict:
+        return {"type": "cosmos", "container": self.storage.container_name}
+
+
+def _create_archive():
+    if settings.retention_archive == "file":
+        return FileProposalArchive(settings.retention_archive_dir)
+    if settings.retention_archive == "cosmos":
+        from azure.cosmos import CosmosClient
+        from app.cosmos_storage import CosmosStorage
+
+        client = CosmosClient(settings.cosmos_db_url, settings.cosmos_db_key)
+        return CosmosProposalArchive(
+            CosmosStorage(client, settings.cosmos_db_database, settings.cosmos_db_archive_container)
+        )
+    return None
+
+
+class RetentionManager:
+    """Archives old proposals, prunes the job index and reports retention stats."""
+
+    def __init__(
+        self,
+        redis_client,
+        jobs,
+        proposals,
+        archive=None,
+        retention_days: int = 0,
+        archive_after_days: int = 7,
+    ):
+        self._redis = redis_client
+        self._jobs = jobs
+        self._proposals = proposals
+        self._index = JobIndex(redis_client)
+        self.archive = archive
+        self.retention_days = retention_days
+        self.archive_after_days = archive_after_days
+
+    def run(self, now: Optional[datetime] = None) -> dict:
+        """One retention pass: archive, then prune the index. The result is kept for ``stats``."""
+        now = now or datetime.now()
+        result = {
+            "ran_at": now.isoformat(),
+            "archived_jobs": self.archive_proposals(now) if self.archive else 0,
+            "index_entries_pruned": self._index.prune(now - timedelta(days=self.retention_days))
+            if self.retention_days else 0,
+        }
+        self._redis.set(LAST_RUN_KEY, json.dumps(result))
+        logger.info("Retention pass completed", extra=result)
+        return result
+
+    def archive_proposals(self, now: datetime) -> int:
+        """Archive the proposals of jobs created before the archive cutoff. Returns the job count."""
+        if self.retention_days and self.archive_after_days >= self.retention_days:
+            logger.warning(
+                "RETENTION_ARCHIVE_AFTER_DAYS is not below JOB_RETENTION_DAYS; "
+                "proposals may expire before they are archived"
+            )
+        cutoff = (now - timedelta(days=self.archive_after_days)).timestamp()
+        watermark = self._redis.get(WATERMARK_KEY)
+        min_score = f"({watermark}" if watermark else "-inf"
+
+        archived = 0
+        offset = 0
+        while True:
+            page = self._redis.zrangebyscore(
+                self._index.index_key(), min_score, cutoff, start=offset, num=_ARCHIVE_BATCH
+            )
+            if not page:
+                break
+            archived += self._archive_batch(page, now)
+            offset += len(page)
+        # Re-running a batch after a crash is harmless: archived jobs hold a stub
+        self._redis.set(WATERMARK_KEY, cutoff)
+        return archived
+
+    def _archive_batch(self, job_ids: list[str], now: datetime) -> int:
+        proposals = self._proposals.get_many(job_ids)
+        jobs = self._jobs.get_many([job_id for job_id in job_ids if job_id in proposals])
+        records = []
+        for job_id, job in jobs.items():
+            if is_archived(proposals[job_id]):
+                continue
+            records.append({
+                "job_id": job_id,
+                "collection_id": job.get("collection_id"),
+                "created_by": job.get("created_by"),
+                "created_at": job.get("created_at"),
+                "archived_at": now.isoformat(),
+                "proposals": proposals[job_id],
+            })
+        if not records:
+            return 0
+        self.archive.write(records, now)
+        self._proposals.set_many({
+            record["job_id"]: archived_proposals(now, len(record["proposals"])) for record in records
+        })
+        return len(records)
+
+    def stats(self, now: Optional[datetime] = None) -> dict:
+        """Retention settings, job counts by age, the last run and the archive's size."""
+        now = now or datetime.now()
+        index_key = self._index.index_key()
+
+        def created_before(days: int) -> int:
+            return self._redis.zcount(index_key, "-inf", f"({(now - timedelta(days=days)).timestamp()}")
+
+        last_run = self._redis.get(LAST_RUN_KEY)
+        watermark = self._redis.get(WATERMARK_KEY)
+        return {
+            "retention_days": self.retention_days or None,
+            "storage_ttl_seconds": {
+                "jobs": _ttl_of(self._jobs),
+                "proposals": _ttl_of(self._proposals),
+            },
+            "jobs": {
+                "indexed": self._redis.zcard(index_key),
+                "past_archive_cutoff": created_before(self.archive_after_days) if self.archive else None,
+                "past_retention": created_before(self.retention_days) if self.retention_days else None,
+            },
+            "archive": {
+                **(self.archive.stats() if self.archive else {"type": "off"}),
+                "after_days": self.archive_after_days if self.archive else None,
+                "archived_until": datetime.fromtimestamp(float(watermark)).isoformat() if watermark else None,
+            },
+            "last_run": json.loads(last_run) if last_run else None,
+        }
+
+
+def _ttl_of(storage) -> Optional[int]:
+    """TTL the backend gives new writes: RedisStorage's, or a Cosmos container's defaultTtl."""
+    storage = uncached(storage)
+    if hasattr(storage, "default_ttl"):
+        return storage.default_ttl()
+    return getattr(storage, "ttl_seconds", None)
+
+
+_manager: Optional[RetentionManager] = None
+
+
+def get_retention_manager() -> RetentionManager:
+    """Return the process-wide retention manager."""
+    global _manager
+    if _manager is None:
+        _manager = RetentionManager(
+            redis_client,
+            jobs_db,
+            proposals_db,
+            archive=_create_archive(),
+            retention_days=settings.job_retention_days,
+            archive_after_days=settings.retention_archive_after_days,
+        )
+    return _manager
@@ -0,0 +1,312 @@
+"""SQLite FTS5 search/filter index over collection items.
+
+Editors need to find items with missing or short alt text, or search by
+project name, without paging through the whole collection in the browser.
+This index keeps one row per item (name, slug, last-updated, alt-text flags)
+plus per-image alt lengths, with an FTS5 table over name and slug. It is
+fed from item data the API already sees (item pages, re-index, apply) and
+queried with keyset (cursor) pagination.
+
+Page views only index the pages they fetch, so each collection also records
+when a full re-index pass last completed; until then search results cover
+only part of the collection.
+"""
+
+import base64
+import json
+import logging
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SORT_COLUMNS = {
+    "name": "name COLLATE NOCASE",
+    "last_updated": "last_updated",
+    "missing_alt": "missing_alt_count",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    collection_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    last_updated TEXT NOT NULL DEFAULT '',
+    image_count INTEGER NOT NULL DEFAULT 0,
+    missing_alt_count INTEGER NOT NULL DEFAULT 0,
+    short_alt_count INTEGER NOT NULL DEFAULT 0,
+    indexed_generation INTEGER NOT NULL DEFAULT -1,
+    UNIQUE (collection_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS items_by_name ON items (collection_id, name COLLATE NOCASE, item_id);
+CREATE INDEX IF NOT EXISTS items_by_updated ON items (collection_id, last_updated, item_id);
+CREATE INDEX IF NOT EXISTS items_by_missing ON items (collection_id, missing_alt_count, item_id);
+
+CREATE TABLE IF NOT EXISTS item_images (
+    collection_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    alt_field TEXT NOT NULL,
+    alt_length INTEGER NOT NULL,
+    PRIMARY KEY (collection_id, item_id, alt_field)
+);
+
+CREATE TABLE IF NOT EXISTS collections (
+    collection_id TEXT PRIMARY KEY,
+    indexed_at TEXT NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    name, slug, content='items', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, name, slug) VALUES (new.id, new.name, new.slug);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name, slug) VALUES ('delete', old.id, old.name, old.slug);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF name, slug ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, name, slug) VALUES ('delete', old.id, old.name, old.slug);
+    INSERT INTO items_fts (rowid, name, slug) VALUES (new.id, new.name, new.slug);
+END;
+"""
+
+
+def encode_cursor(sort_value, item_id: str) -> str:
+    """Encode a keyset position as an opaque cursor string."""
+    return base64.urlsafe_b64encode(json.dumps([sort_value, item_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by ``encode_cursor``. Raises ValueError if malformed."""
+    try:
+        sort_value, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    return sort_value, item_id
+
+
+def _fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 prefix query (all tokens must match)."""
+    tokens = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{t}"*' for t in tokens) or None
+
+
+class ItemSearchIndex:
+    """Item index stored in a single SQLite database (file or ``:memory:``)."""
+
+    def __init__(self, path: str, short_alt_chars: int = 25):
+        self.short_alt_chars = short_alt_chars
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    # --- Writes ---
+
+    def upsert_items(self, collection_id: str, raw_items: list[dict], extractor, generation: int = -1) -> None:
+        """Index (or re-index) a batch of raw Webflow items.
+
+        ``generation`` tags rows seen by a full re-index pass (see
+        ``remove_stale``); the default leaves existing tags untouched.
+        """
+        item_rows = []
+        image_rows = []
+        for raw_item in raw_items:
+            field_data = raw_item.get("fieldData", {})
+            images = [
+                (alt_field, len((alt_text or "").strip()))
+                for _, alt_field, _, alt_text in extractor.iter_images(field_data)
+            ]
+            item_rows.append((
+                collection_id,
+                raw_item["id"],
+                field_data.get("name", "Untitled"),
+                field_data.get("slug", ""),
+                raw_item.get("lastUpdated") or "",
+                generation,
+            ))
+            image_rows.extend((collection_id, raw_item["id"], alt_field, length) for alt_field, length in images)
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO items (collection_id, item_id, name, slug, last_updated, indexed_generation)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (collection_id, item_id) DO UPDATE SET
+                    name = excluded.name,
+                    slug = excluded.slug,
+                    last_updated = excluded.last_updated,
+                    indexed_generation = CASE WHEN excluded.indexed_generation < 0
+                        THEN items.indexed_generation ELSE excluded.indexed_generation END
+                """,
+                item_rows,
+            )
+            self._conn.executemany(
+                "DELETE FROM item_images WHERE collection_id = ? AND item_id = ?",
+                [(collection_id, row[1]) for row in item_rows],
+            )
+            self._conn.executemany(
+                "INSERT INTO item_images (collection_id, item_id, alt_field, alt_length) VALUES (?, ?, ?, ?)",
+                image_rows,
+            )
+            self._refresh_counts(collection_id, [row[1] for row in item_rows])
+
+    def update_alt_texts(self, collection_id: str, item_id: str, alt_texts: dict[str, str]) -> None:
+        """Record alt text written to an item (``{alt_field: text}``)."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                UPDATE item_images SET alt_length = ?
+                WHERE collection_id = ? AND item_id = ? AND alt_field = ?
+                """,
+                [(len(text.strip()), collection_id, item_id, field) for field, text in alt_texts.items()],
+            )
+            self._refresh_counts(collection_id, [item_id])
+
+    def remove_stale(self, collection_id: str, generation: int) -> int:
+        """Drop items not seen in the re-index pass ``generation``. Returns rows removed.
+
+        Called once a full pass has finished, so it also marks the
+        collection as completely indexed (see ``indexed_at``).
+        """
+        with self._lock, self._conn:
+            stale = [
+                row["item_id"]
+                for row in self._conn.execute(
+                    "SELECT item_id FROM items WHERE collection_id = ? AND indexed_generation != ?",
+                    (collection_id, generation),
+                )
+            ]
+            self._conn.executemany(
+                "DELETE FROM item_images WHERE collection_id = ? AND item_id = ?",
+                [(collection_id, item_id) for item_id in stale],
+            )
+            self._conn.executemany(
+                "DELETE FROM items WHERE collection_id = ? AND item_id = ?",
+                [(collection_id, item_id) for item_id in stale],
+            )
+            self._conn.execute(
+                """
+                INSERT INTO collections (collection_id, indexed_at) VALUES (?, ?)
+                ON CONFLICT (collection_id) DO UPDATE SET indexed_at = excluded.indexed_at
+                """,
+                (collection_id, datetime.now(timezone.utc).isoformat()),
+            )
+        return len(stale)
+
+    def _refresh_counts(self, collection_id: str, item_ids: list[str]) -> None:
+        """Recompute per-item image/alt counters. Caller holds the lock."""
+        self._conn.executemany(
+            """
+            UPDATE items SET
+                image_count = (SELECT COUNT(*) FROM item_images g
+                               WHERE g.collection_id = items.collection_id AND g.item_id = items.item_id),
+                missing_alt_count = (SELECT COUNT(*) FROM item_images g
+                                     WHERE g.collection_id = items.collection_id AND g.item_id = items.item_id
+                                       AND g.alt_length = 0),
+                short_alt_count = (SELECT COUNT(*) FROM item_images g
+                                   WHERE g.collection_id = items.collection_id AND g.item_id = items.item_id
+                                     AND g.alt_length > 0 AND g.alt_length < ?)
+            WHERE collection_id = ? AND item_id = ?
+            """,
+            [(self.short_alt_chars, collection_id, item_id) for item_id in item_ids],
+        )
+
+    # --- Reads ---
+
+    def indexed_at(self, collection_id: str) -> Optional[str]:
+        """When a full re-index of the collection last completed, or None if never."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT indexed_at FROM collections WHERE collection_id = ?", (collection_id,)
+            ).fetchone()
+        return row["indexed_at"] if row else None
+
+    def search(
+        self,
+        collection_id: str,
+        q: Optional[str] = None,
+        missing_alt: Optional[bool] = None,
+        short_alt: Optional[bool] = None,
+        sort: str = "name",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> tuple[list[dict], Optional[str], int]:
+        """Filter, sort and page the index.
+
+        Returns ``(rows, next_cursor, total_matches)``.
+        """
+        sort_expr = SORT_COLUMNS[sort]
+        sort_column = sort_expr.split()[0]
+        joins = ""
+        where = ["i.collection_id = ?"]
+        params: list = [collection_id]
+
+        match = _fts_query(q) if q else None
+        if match:
+            joins = "JOIN items_fts f ON f.rowid = i.id"
+            where.append("items_fts MATCH ?")
+            params.append(match)
+        if missing_alt is not None:
+            where.append("i.missing_alt_count > 0" if missing_alt else "i.missing_alt_count = 0")
+        if short_alt is not None:
+            where.append("i.short_alt_count > 0" if short_alt else "i.short_alt_count = 0")
+
+        filters_sql = " AND ".join(where)
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM items i {joins} WHERE {filters_sql}", params
+            ).fetchone()[0]
+
+            page_where = list(where)
+            page_params = list(params)
+            if cursor:
+                after_value, after_id = decode_cursor(cursor)
+                op = "<" if descending else ">"
+                collate = " COLLATE NOCASE" if sort == "name" else ""
+                page_where.append(
+                    f"(i.{sort_column}{collate} {op} ? OR (i.{sort_column}{collate} = ? AND i.item_id {op} ?))"
+                )
+                page_params.extend([after_value, after_value, after_id])
+
+            direction = "DESC" if descending else "ASC"
+            rows = self._conn.execute(
+                f"""
+                SELECT i.item_id, i.name, i.slug, i.last_updated, i.image_count,
+                       i.missing_alt_count, i.short_alt_count
+                FROM items i {joins}
+                WHERE {" AND ".join(page_where)}
+                ORDER BY i.{sort_expr} {direction}, i.item_id {direction}
+                LIMIT ?
+                """,
+                [*page_params, limit + 1],
+            ).fetchall()
+
+        results = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = results[-1]
+            next_cursor = encode_cursor(last[sort_column], last["item_id"])
+        return results, next_cursor, total
+
+
+_search_index: Optional[ItemSearchIndex] = None
+
+
+def get_search_index() -> ItemSearchIndex:
+    """Return the process-wide search index, opening it on first use."""
+    global _search_index
+    if _search_index is None:
+        _search_index = ItemSearchIndex(
+            settings.search_index_path, short_alt_chars=settings.search_short_alt_chars
+        )
+    return _search_index
@@ -0,0 +1,150 @@
+"""Request coalescing ("single-flight") for identical concurrent reads.
+
+When several callers ask for the same key at the same time, only the first
+one performs the call; the others await the in-flight result.
+``SingleFlight`` coalesces within one process, ``RedisSingleFlight`` adds a
+Redis lock so API replicas share a single upstream request as well (through
+the async Redis client, so waiting never blocks the event loop).
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+import redis
+
+from app.async_storage import async_redis_client
+from app.config import settings
+from app.storage import COMPARE_AND_DELETE
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "singleflight:lock"
+RESULT_PREFIX = "singleflight:result"
+
+
+class SingleFlight:
+    """Coalesces concurrent identical async calls within one process."""
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` once per key at a time and share its result with concurrent callers.
+
+        The call runs in its own task, so a cancelled caller does not cancel
+        the request for everyone else waiting on it.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        """Return this process's leader/coalesced call counters."""
+        return {"leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class RedisSingleFlight(SingleFlight):
+    """Single-flight across processes using a Redis lock.
+
+    Calls are first coalesced in-process. The local leader then tries to take
+    a Redis lock: the winner performs the call and publishes the JSON result
+    under a key tied to its lock token; other processes poll for that result.
+    If the lock holder fails or the wait times out, followers fall back to
+    making the call themselves. Results must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        lock_ttl_ms: int = 30000,
+        result_ttl_ms: int = 5000,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+    ):
+        super().__init__()
+        self._redis = redis_client
+        self.lock_ttl_ms = lock_ttl_ms
+        self.result_ttl_ms = result_ttl_ms
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await super().do(key, lambda: self._do_distributed(key, fn))
+
+    async def _do_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key = f"{LOCK_PREFIX}:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self._redis.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+        except redis.RedisError as e:
+            logger.warning("Single-flight lock unavailable, calling directly", extra={"error": str(e)})
+            return await fn()
+
+        if acquired:
+            return await self._lead(lock_key, token, fn)
+        return await self._follow(lock_key, fn)
+
+    async def _lead(self, lock_key: str, token: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await fn()
+            try:
+                await self._redis.set(f"{RESULT_PREFIX}:{token}", json.dumps(result), px=self.result_ttl_ms)
+            except redis.RedisError as e:
+                logger.warning("Single-flight result publish failed", extra={"error": str(e)})
+            return result
+        finally:
+            # Only our own lock: once it expired, another leader may hold the key
+            try:
+                await self._redis.eval(COMPARE_AND_DELETE, 1, lock_key, token)
+            except redis.RedisError:
+                pass
+
+    async def _follow(self, lock_key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        deadline = time.monotonic() + self.wait_timeout
+        token = None
+        try:
+            while time.monotonic() < deadline:
+                # Remember the leader's token: its result outlives the lock
+                token = await self._redis.get(lock_key) or token
+                raw = await self._redis.get(f"{RESULT_PREFIX}:{token}") if token else None
+                if raw is not None:
+                    self.coalesced += 1
+                    return json.loads(raw)
+                if not await self._redis.exists(lock_key):
+                    break  # Leader finished without a result we can use
+                await asyncio.sleep(self.poll_interval)
+        except redis.RedisError as e:
+            logger.warning("Single-flight wait failed, calling directly", extra={"error": str(e)})
+        return await fn()
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Return the process-wide single-flight coalescer, or None when disabled."""
+    global _single_flight
+    if settings.webflow_single_flight == "off":
+        return None
+    if _single_flight is None:
+        if settings.webflow_single_flight == "redis":
+            _single_flight = RedisSingleFlight(async_redis_client)
+        else:
+            _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,247 @@
+"""Resized thumbnails of Webflow CDN images with an LRU disk cache.
+
+The review UI shows images as small cards, but Webflow serves full-size
+originals. ``ThumbnailService`` downloads an original once, resizes it to
+each of a few fixed widths and stores the WebP results on disk keyed by
+file ID, a hash of the normalized source URL and width (the CDN is shared
+by every Webflow site, so a file ID alone doesn't pin down the image).
+The cache is bounded by total size and evicts least recently used files
+first.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+from PIL import Image, ImageOps
+
+from app.config import settings
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_SAFE_FILE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ThumbnailError(Exception):
+    """A thumbnail could not be produced. ``status_code`` is the HTTP status to report."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ThumbnailDiskCache:
+    """Size-bounded directory of thumbnails, evicted least-recently-used first.
+
+    Recency is tracked with file modification times, so it survives restarts.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = sum(p.stat().st_size for p in self.directory.glob("*.webp"))
+
+    def _path(self, key: str, width: int) -> Path:
+        return self.directory / f"{key}_{width}.webp"
+
+    def get(self, key: str, width: int) -> Optional[bytes]:
+        """Return a cached thumbnail and mark it as recently used, or None."""
+        path = self._path(key, width)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, width: int, data: bytes) -> None:
+        """Store a thumbnail, evicting old ones if the cache is over its size limit."""
+        path = self._path(key, width)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._total_bytes += len(data) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used files until under the limit. Caller holds the lock."""
+        entries = []
+        for p in self.directory.glob("*.webp"):
+            try:
+                stat = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort()
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            self._total_bytes -= size
+
+
+def _resize(original: bytes, widths: list[int]) -> dict[int, bytes]:
+    """Resize an image to each width (never upscaling) and encode each as WebP."""
+    thumbnails = {}
+    with Image.open(io.BytesIO(original)) as source:
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for width in widths:
+            resized = image
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            out = io.BytesIO()
+            resized.save(out, format="WEBP", quality=80, method=4)
+            thumbnails[width] = out.getvalue()
+    return thumbnails
+
+
+def normalize_source(source_url: str) -> str:
+    """The source URL without fragment, port or host case (what identifies the image)."""
+    parsed = urlparse(source_url)
+    query = f"?{parsed.query}" if parsed.query else ""
+    return f"{parsed.scheme}://{(parsed.hostname or '').lower()}{parsed.path}{query}"
+
+
+def cache_key(file_id: str, source_url: str) -> str:
+    """Disk cache key of a file's thumbnails made from ``source_url``."""
+    return f"{file_id}_{hashlib.sha256(normalize_source(source_url).encode()).hexdigest()[:16]}"
+
+
+def etag_for(file_id: str, width: int, source_url: str) -> str:
+    key = f"{cache_key(file_id, source_url)}:{width}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:16] + '"'
+
+
+def _names_file(path: str, file_id: str) -> bool:
+    """True if a path segment is the file ID, or starts with it as Webflow
+    names uploads (``{file_id}_{original name}``, ``{file_id}.{ext}``)."""
+    return any(
+        segment == file_id or segment.startswith((f"{file_id}_", f"{file_id}."))
+        for segment in path.split("/")
+    )
+
+
+class ThumbnailService:
+    """Fetches, resizes and caches thumbnails of allowlisted CDN images."""
+
+    def __init__(
+        self,
+        cache: ThumbnailDiskCache,
+        widths: list[int],
+        allowed_hosts: list[str],
+        max_source_bytes: int,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.cache = cache
+        self.widths = sorted(widths)
+        self.allowed_hosts = set(allowed_hosts)
+        self.max_source_bytes = max_source_bytes
+        self._http = http_client or httpx.AsyncClient(timeout=30.0, follow_redirects=False)
+        self._single_flight = SingleFlight()
+
+    def validate(self, file_id: str, width: int, source_url: str) -> None:
+        """Reject unknown widths, odd file IDs and sources outside the allowlist.
+
+        A path segment of the source URL must name the file ID (a substring
+        match would accept any image whose name merely contains it).
+        """
+        if width not in self.widths:
+            raise ThumbnailError(400, f"Width must be one of {self.widths}")
+        if not _SAFE_FILE_ID.match(file_id):
+            raise ThumbnailError(400, "Invalid file ID")
+        parsed = urlparse(source_url)
+        if parsed.scheme != "https" or parsed.hostname not in self.allowed_hosts:
+            raise ThumbnailError(400, "Image host not allowed")
+        if not _names_file(parsed.path, file_id):
+            raise ThumbnailError(400, "Source URL does not match file ID")
+
+    async def get(self, file_id: str, width: int, source_url: str) -> bytes:
+        """Return the WebP thumbnail, producing and caching every width on a miss."""
+        self.validate(file_id, width, source_url)
+        key = cache_key(file_id, source_url)
+        cached = await asyncio.to_thread(self.cache.get, key, width)
+        if cached is not None:
+            return cached
+        thumbnails = await self._single_flight.do(key, lambda: self._produce(key, file_id, source_url))
+        return thumbnails[width]
+
+    async def _produce(self, key: str, file_id: str, source_url: str) -> dict[int, bytes]:
+        original = await self._download(source_url)
+        try:
+            thumbnails = await asyncio.to_thread(_resize, original, self.widths)
+        except Exception as e:
+            logger.warning("Thumbnail resize failed", extra={"file_id": file_id, "error": str(e)})
+            raise ThumbnailError(422, "Source is not a supported image")
+        for width, data in thumbnails.items():
+            await asyncio.to_thread(self.cache.put, key, width, data)
+        logger.info(
+            "Thumbnails generated",
+            extra={
+                "file_id": file_id,
+                "source_bytes": len(original),
+                "bytes": {width: len(data) for width, data in thumbnails.items()},
+            },
+        )
+        return thumbnails
+
+    async def _download(self, source_url: str) -> bytes:
+        try:
+            async with self._http.stream("GET", source_url) as response:
+                if response.status_code != 200:
+                    raise ThumbnailError(502, f"Image fetch failed with status {response.status_code}")
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > self.max_source_bytes:
+                        raise ThumbnailError(413, "Source image too large")
+                    chunks.append(chunk)
+        except httpx.HTTPError as e:
+            raise ThumbnailError(502, f"Image fetch failed: {e}")
+        return b"".join(chunks)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+_thumbnail_service: Optional[ThumbnailService] = None
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    """Return the process-wide thumbnail service, creating the cache directory on first use."""
+    global _thumbnail_service
+    if _thumbnail_service is None:
+        _thumbnail_service = ThumbnailService(
+            cache=ThumbnailDiskCache(settings.thumbnail_cache_dir, settings.thumbnail_cache_max_bytes),
+            widths=settings.thumbnail_widths,
+            allowed_hosts=settings.thumbnail_allowed_hosts,
+            max_source_bytes=settings.thumbnail_max_source_bytes,
+        )
+    return _thumbnail_service
+
+
+async def close_thumbnail_service() -> None:
+    """Close the shared service's HTTP client (application shutdown)."""
+    global _thumbnail_service
+    if _thumbnail_service is not None:
+        await _thumbnail_service.aclose()
+        _thumbnail_service = None
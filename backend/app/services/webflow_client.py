@@ -1,6 +1,6 @@
 import httpx
 import logging
-from typing import Optional
+from typing import AsyncIterator, Optional
 from tenacity import (
     before_sleep_log,
     retry,
@@ -9,6 +9,9 @@ from tenacity import (
     retry_if_exception_type,
 )
 
+from app.services.response_cache import ResponseCache
+from app.services.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,10 +25,18 @@ class WebflowClient:
     """Client for Webflow CMS API with retry logic."""
 
     def __init__(
-        self, api_token: str, base_url: str = "https://api.webflow.com/v2"
+        self,
+        api_token: str,
+        base_url: str = "https://api.webflow.com/v2",
+        cache: Optional[ResponseCache] = None,
+        http2: bool = False,
+        limits: Optional[httpx.Limits] = None,
+        single_flight: Optional[SingleFlight] = None,
     ):
         self.api_token = api_token
         self.base_url = base_url
+        self.cache = cache
+        self.single_flight = single_flight
         self.client = httpx.AsyncClient(
             base_url=base_url,
             headers={
@@ -33,6 +44,8 @@ class WebflowClient:
                 "accept": "application/json",
             },
             timeout=30.0,
+            http2=http2,
+            limits=limits or httpx.Limits(),
         )
 
     @retry(
@@ -42,6 +55,26 @@ class WebflowClient:
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
     )
+    async def get_collection(self, collection_id: str) -> dict:
+        """Fetch a collection's schema (including its ``fields`` list)."""
+        try:
+            response = await self.client.get(f"/collections/{collection_id}")
+
+            if response.status_code == 429:
+                retry_after = int(response.headers.get("Retry-After", 60))
+                logger.warning(f"Rate limit hit. Retrying after {retry_after}s")
+                raise RateLimitError("Webflow rate limit exceeded")
+
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching collection schema: {e.response.status_code}")
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {str(e)}")
+            raise
+
     async def get_collection_items(
         self,
         collection_id: str,
@@ -51,12 +84,46 @@ class WebflowClient:
         """
         Fetch items from a Webflow collection.
 
+        With a single-flight coalescer configured, concurrent identical reads
+        share one upstream request.
+        """
+        if self.single_flight is None:
+            return await self._fetch_collection_items(collection_id, limit, offset)
+        key = f"{self.base_url}/collections/{collection_id}/items?limit={limit}&offset={offset}"
+        return await self.single_flight.do(
+            key, lambda: self._fetch_collection_items(collection_id, limit, offset)
+        )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=60),
+        retry=retry_if_exception_type(RateLimitError),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    async def _fetch_collection_items(
+        self,
+        collection_id: str,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> dict:
+        """
+        Fetch one page of items from Webflow.
+
         Retries automatically on rate limit (429) with exponential backoff.
+        When a response cache is configured, sends conditional headers and
+        serves the cached body on 304 Not Modified.
         """
+        url = f"/collections/{collection_id}/items"
+        params = {"limit": limit, "offset": offset}
+        cache_key = self.cache.make_key(f"{self.base_url}{url}", params, self.api_token) if self.cache else None
+        cached = await self.cache.get(cache_key) if self.cache else None
+
         try:
             response = await self.client.get(
-                f"/collections/{collection_id}/items",
-                params={"limit": limit, "offset": offset},
+                url,
+                params=params,
+                headers=ResponseCache.conditional_headers(cached),
             )
 
             if response.status_code == 429:
@@ -64,8 +131,22 @@ class WebflowClient:
                 logger.warning(f"Rate limit hit. Retrying after {retry_after}s")
                 raise RateLimitError("Webflow rate limit exceeded")
 
+            if response.status_code == 304 and cached:
+                await self.cache.record("hit")
+                await self.cache.touch(cache_key)
+                return cached["body"]
+
             response.raise_for_status()
-            return response.json()
+            body = response.json()
+            if self.cache:
+                await self.cache.record("miss")
+                await self.cache.store(
+                    cache_key,
+                    body,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+            return body
 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error: {e.response.status_code}")
@@ -74,6 +155,33 @@ class WebflowClient:
             logger.error(f"Request error: {str(e)}")
             raise
 
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=60),
+        retry=retry_if_exception_type(RateLimitError),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    async def get_item(self, collection_id: str, item_id: str) -> dict:
+        """Fetch one CMS item (its current ``fieldData``), bypassing the response cache."""
+        try:
+            response = await self.client.get(f"/collections/{collection_id}/items/{item_id}")
+
+            if response.status_code == 429:
+                retry_after = int(response.headers.get("Retry-After", 60))
+                logger.warning(f"Rate limit hit fetching item. Retrying after {retry_after}s")
+                raise RateLimitError("Webflow rate limit exceeded")
+
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching item {item_id}: {e.response.status_code}")
+            raise
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {str(e)}")
+            raise
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=60),
@@ -86,6 +194,7 @@ class WebflowClient:
         collection_id: str,
         item_id: str,
         field_data: dict,
+        publish: bool = True,
     ) -> dict:
         """
         Update CMS item fields (e.g., alt text fields).
@@ -94,14 +203,15 @@ class WebflowClient:
             collection_id: Webflow collection ID
             item_id: Item ID to update
             field_data: Dict of field names to values (e.g., {"1-after-alt-text": "New text"})
+            publish: Mark the item live with this update. Pass False to write a
+                staged change and publish later via ``publish_items``.
 
         This is idempotent - safe to retry.
         """
         try:
-            payload = {
-                "fieldData": field_data,
-                "isDraft": False,  # Publish the item after updating
-            }
+            payload = {"fieldData": field_data}
+            if publish:
+                payload["isDraft"] = False  # Publish the item after updating
             logger.info(f"Updating item {item_id} with payload: {payload}")
 
             response = await self.client.patch(
@@ -131,22 +241,54 @@ class WebflowClient:
             logger.error(f"Request error updating item: {str(e)}")
             raise
 
-    async def get_all_collection_items(
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=60),
+        retry=retry_if_exception_type(RateLimitError),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    async def publish_items(self, collection_id: str, item_ids: list[str]) -> dict:
+        """
+        Publish staged items in one call.
+
+        Webflow accepts up to 100 item IDs per publish request; callers are
+        responsible for chunking.
+        """
+        try:
+            response = await self.client.post(
+                f"/collections/{collection_id}/items/publish",
+                json={"itemIds": item_ids},
+            )
+
+            if response.status_code == 429:
+                retry_after = int(response.headers.get("Retry-After", 60))
+                logger.warning(f"Rate limit hit publishing items. Retrying after {retry_after}s")
+                raise RateLimitError("Webflow rate limit exceeded")
+
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Failed to publish {len(item_ids)} items: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"Webflow API error: {e.response.status_code} - {e.response.text}")
+        except httpx.RequestError as e:
+            logger.error(f"Request error publishing items: {str(e)}")
+            raise
+
+    async def iter_collection_items(
         self,
         collection_id: str,
-        target_ids: list[str] | None = None,
-    ) -> list[dict]:
+        limit: int = 100,
+    ) -> AsyncIterator[list[dict]]:
         """
-        Fetch all items from a collection, paginating automatically.
+        Yield a collection's items one page at a time.
 
-        If target_ids is provided, stops early once all targets are found.
+        Only the current page is held in memory; callers that stop iterating
+        early (e.g. once all targets are found) stop pagination too.
         """
-        all_items = []
         offset = 0
-        limit = 100
-        target_set = set(target_ids) if target_ids else None
-        found_ids: set[str] = set()
-
+        pages = 0
         while True:
             logger.info(
                 "Fetching Webflow items page",
@@ -158,13 +300,8 @@ class WebflowClient:
                 offset=offset,
             )
             items = result.get("items", [])
-            all_items.extend(items)
-
-            if target_set:
-                found_ids.update(item["id"] for item in items if item["id"] in target_set)
-                if found_ids >= target_set:
-                    logger.info("All target items found, stopping pagination early")
-                    break
+            pages += 1
+            yield items
 
             total = result.get("pagination", {}).get("total") or result.get("total", 0)
             offset += len(items)
@@ -172,9 +309,33 @@ class WebflowClient:
                 break
 
         logger.info(
-            "Fetched all Webflow items",
-            extra={"total_fetched": len(all_items), "pages": (offset // limit) + 1},
+            "Finished paging Webflow items",
+            extra={"collection_id": collection_id, "total_fetched": offset, "pages": pages},
         )
+
+    async def get_all_collection_items(
+        self,
+        collection_id: str,
+        target_ids: list[str] | None = None,
+    ) -> list[dict]:
+        """
+        Fetch all items from a collection, paginating automatically.
+
+        If target_ids is provided, stops early once all targets are found.
+        """
+        all_items = []
+        target_set = set(target_ids) if target_ids else None
+        found_ids: set[str] = set()
+
+        async for items in self.iter_collection_items(collection_id):
+            all_items.extend(items)
+
+            if target_set:
+                found_ids.update(item["id"] for item in items if item["id"] in target_set)
+                if found_ids >= target_set:
+                    logger.info("All target items found, stopping pagination early")
+                    break
+
         return all_items
 
     async def close(self):
@@ -182,11 +343,105 @@ class WebflowClient:
         await self.client.aclose()
 
 
+class WebflowClientPool:
+    """Process-wide holder for one long-lived, connection-pooled WebflowClient.
+
+    The API creates a single pool in its lifespan handler so every request
+    reuses the same keep-alive connections instead of paying a fresh TLS
+    handshake. The client is rebuilt only when the Webflow token changes.
+    Requests hold a client between ``acquire`` and ``release``; a replaced
+    client is closed once the last request holding it releases it.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        http2: bool = False,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        single_flight: Optional[SingleFlight] = None,
+    ):
+        self.cache = cache
+        self.single_flight = single_flight
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._client: Optional[WebflowClient] = None
+        self._retired: list[WebflowClient] = []
+        self._in_flight: dict[WebflowClient, int] = {}
+
+    def get(self, api_token: str) -> WebflowClient:
+        """Return the shared client for ``api_token``, rebuilding it if the token changed."""
+        if self._client is None or self._client.api_token != api_token:
+            if self._client is not None:
+                logger.info("Webflow token changed, rebuilding shared client")
+                self._retired.append(self._client)
+            self._client = WebflowClient(
+                api_token=api_token,
+                cache=self.cache,
+                http2=self.http2,
+                limits=self.limits,
+                single_flight=self.single_flight,
+            )
+        return self._client
+
+    async def acquire(self, api_token: str) -> WebflowClient:
+        """Return the shared client for ``api_token``, held until ``release``."""
+        client = self.get(api_token)
+        self.retain(client)
+        await self._close_drained()
+        return client
+
+    def retain(self, client: WebflowClient) -> None:
+        """Hold ``client`` once more (e.g. for a response streamed after its request). Ignores unpooled clients."""
+        if client is self._client or client in self._retired:
+            self._in_flight[client] = self._in_flight.get(client, 0) + 1
+
+    async def release(self, client: WebflowClient) -> None:
+        """Drop one hold on ``client``, closing it if it was retired and is no longer used."""
+        count = self._in_flight.pop(client, 0) - 1
+        if count > 0:
+            self._in_flight[client] = count
+        await self._close_drained()
+
+    async def _close_drained(self) -> None:
+        """Close retired clients that no request holds any more."""
+        drained = [client for client in self._retired if client not in self._in_flight]
+        self._retired = [client for client in self._retired if client in self._in_flight]
+        for client in drained:
+            await client.close()
+
+    async def aclose(self):
+        """Close the shared client and any clients retired by token changes."""
+        clients = self._retired + ([self._client] if self._client else [])
+        for client in clients:
+            await client.close()
+        self._client = None
+        self._retired = []
+        self._in_flight = {}
+
+
 class MockWebflowClient(WebflowClient):
     """Mock client that returns fake data for testing."""
 
     def __init__(self):
         self.api_token = "mock_token"
+        self.cache = None
+        self.single_flight = None
+
+    async def get_collection(self, collection_id: str) -> dict:
+        """Return a mock collection schema with the standard image fields."""
+        fields = [
+            {"slug": "name", "type": "PlainText"},
+            {"slug": "slug", "type": "PlainText"},
+            {"slug": "image", "type": "Image"},
+        ]
+        for i in range(1, 5):
+            fields.append({"slug": f"{i}-after", "type": "Image"})
+            fields.append({"slug": f"{i}-after-alt-text", "type": "PlainText"})
+        return {"id": collection_id, "fields": fields}
 
     async def get_collection_items(
         self, collection_id: str, limit: int = 100, offset: int = 0
@@ -223,11 +478,20 @@ class MockWebflowClient(WebflowClient):
             "total": 2,
         }
 
+    async def get_item(self, collection_id: str, item_id: str) -> dict:
+        """Return the mock item with ``item_id``."""
+        result = await self.get_collection_items(collection_id)
+        for item in result["items"]:
+            if item["id"] == item_id:
+                return item
+        raise Exception(f"Webflow API error: 404 - item {item_id} not found")
+
     async def update_item(
         self,
         collection_id: str,
         item_id: str,
         field_data: dict,
+        publish: bool = True,
     ) -> dict:
         """Mock update - always succeeds."""
         logger.info(f"Mock update item {item_id} in collection {collection_id}: {field_data}")
@@ -236,6 +500,20 @@ class MockWebflowClient(WebflowClient):
             "fieldData": field_data,
         }
 
+    async def publish_items(self, collection_id: str, item_ids: list[str]) -> dict:
+        """Mock publish - always succeeds."""
+        logger.info(f"Mock publish {len(item_ids)} items in collection {collection_id}")
+        return {"publishedItemIds": item_ids}
+
+    async def iter_collection_items(
+        self,
+        collection_id: str,
+        limit: int = 100,
+    ) -> AsyncIterator[list[dict]]:
+        """Mock page iterator - yields the single mock page."""
+        result = await self.get_collection_items(collection_id=collection_id, limit=limit)
+        yield result.get("items", [])
+
     async def get_all_collection_items(
         self,
         collection_id: str,
@@ -1,35 +1,226 @@
 import json
 import logging
+import time
 import redis
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import orjson
+
+from app.cached_storage import CachedStorage, StorageCache
 from app.config import settings
 
+try:
+    import msgpack
+except ImportError:  # Optional: the msgpack codec falls back to orjson
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: values are stored uncompressed
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
 # Redis client -- always needed (Celery broker uses it, and fallback storage)
 redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+# Storage values may be binary (see StorageCodec), so they are read and
+# written through a client that doesn't decode responses
+redis_binary_client = redis.from_url(settings.redis_url)
+
+# Process-wide cache of the stores listed in STORAGE_CACHE_TTL_SECONDS
+storage_cache = StorageCache(redis_client, max_entries=settings.storage_cache_max_entries)
+
+
+# --- Value codecs ---
+#
+# Encoded values start with a one-byte tag: the low bits name the format,
+# TAG_ZSTD is set when the payload is zstd-compressed. Values written before
+# codecs existed (and by the "json" codec) are untagged JSON text, which
+# never starts with a tag byte, so every format stays readable.
+
+FORMAT_ORJSON = 0x01
+FORMAT_MSGPACK = 0x02
+TAG_ZSTD = 0x80
+_TAGS = frozenset(fmt | zstd for fmt in (FORMAT_ORJSON, FORMAT_MSGPACK) for zstd in (0, TAG_ZSTD))
+
+
+# Types JSON can't represent (datetimes included) are stored as str(value),
+# as json.dumps(value, default=str) always did
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class StorageCodec:
+    """Encodes stored values as tagged bytes and decodes every supported format.
+
+    ``format`` is "orjson", "msgpack" or "json" (untagged text, the original
+    format). Tagged values of at least ``compression_min_bytes`` are
+    zstd-compressed when ``zstandard`` is installed (0 disables compression).
+    """
+
+    def __init__(self, format: str = "json", compression_min_bytes: int = 4096, zstd_level: int = 3):
+        if format == "msgpack" and msgpack is None:
+            logger.warning("msgpack is not installed; storing values with orjson")
+            format = "orjson"
+        self.format = format
+        self.compression_min_bytes = compression_min_bytes if zstandard is not None else 0
+        self.zstd_level = zstd_level
+
+    def encode(self, value: Any) -> Union[bytes, str]:
+        if self.format == "json":
+            return json.dumps(value, default=str)
+        if self.format == "msgpack":
+            tag, payload = FORMAT_MSGPACK, msgpack.packb(value, default=str)
+        else:
+            tag, payload = FORMAT_ORJSON, orjson.dumps(value, default=str, option=ORJSON_OPTIONS)
+        if self.compresses(len(payload)):
+            tag, payload = tag | TAG_ZSTD, zstandard.compress(payload, self.zstd_level)
+        return bytes((tag,)) + payload
+
+    def compresses(self, size: int) -> bool:
+        """Whether a value encoding to ``size`` bytes is stored compressed."""
+        return self.format != "json" and bool(self.compression_min_bytes) and size >= self.compression_min_bytes
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        tag = data[0]
+        if tag not in _TAGS:
+            return orjson.loads(data)
+        payload = data[1:]
+        if tag & TAG_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Stored value is zstd-compressed but zstandard is not installed")
+            payload = zstandard.decompress(payload)
+        if tag & ~TAG_ZSTD == FORMAT_MSGPACK:
+            if msgpack is None:
+                raise RuntimeError("Stored value is msgpack-encoded but msgpack is not installed")
+            return msgpack.unpackb(payload, strict_map_key=False)
+        return orjson.loads(payload)
+
+
+default_codec = StorageCodec(settings.storage_codec, settings.storage_compression_min_bytes)
+
+# Compare-and-delete, run with EVAL so nothing can change the value between
+# the check and the delete: KEYS[1] if it holds ARGV[1] (lock release)
+COMPARE_AND_DELETE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+
+# Unique-index claim and release. KEYS[1] maps value -> key and KEYS[2]
+# value -> claim time, both written and removed in one script. Claim
+# (ARGV: value, key, now) succeeds if the value is free or already held by
+# key. Release (ARGV: value, key, now, min age) removes the mapping only if
+# key still holds it and has for at least min age seconds (claims without a
+# recorded time count as old).
+UNIQUE_CLAIM = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 1 then
+  redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+  return 1
+end
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then return 1 end
+return 0
+"""
+UNIQUE_RELEASE = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then return 0 end
+local claimed_at = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+if tonumber(ARGV[3]) - claimed_at < tonumber(ARGV[4]) then return 0 end
+redis.call('HDEL', KEYS[2], ARGV[1])
+return redis.call('HDEL', KEYS[1], ARGV[1])
+"""
+
+# Membership sets live outside every storage prefix so SCAN MATCH never sees them
+MEMBERS_PREFIX = "idx:members"
 
 
-class RedisStorage:
-    """Redis-backed storage for jobs and proposals (shared across containers)."""
+class RedisKeyspace:
+    """Key layout shared by the sync and async Redis storage."""
 
-    def __init__(self, prefix: str):
+    prefix: str
+
+    @property
+    def members_key(self) -> str:
+        return f"{MEMBERS_PREFIX}:{self.prefix}"
+
+    def _unique_key(self, index: str) -> str:
+        return f"idx:{self.prefix}:{index}"
+
+    def _unique_claimed_key(self, index: str) -> str:
+        return f"idx:{self.prefix}:{index}:claimed_at"
+
+
+class RedisStorage(RedisKeyspace):
+    """Redis-backed storage for jobs and proposals (shared across containers).
+
+    Listing never uses KEYS (which blocks the server, including the Celery
+    broker on the same instance). Keys are walked incrementally with SCAN,
+    or, with ``track_members``, read from a set of the prefix's keys that is
+    maintained on every write; values are then fetched in MGET batches.
+
+    With ``ttl_seconds`` every write sets the key to expire that long after
+    it (retention; see ``app.services.retention``). Values are encoded with
+    ``codec`` (``default_codec``, as configured, unless given).
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        track_members: bool = False,
+        scan_count: int = 1000,
+        ttl_seconds: Optional[int] = None,
+        codec: Optional[StorageCodec] = None,
+    ):
         self.prefix = prefix
+        self.track_members = track_members
+        self.scan_count = scan_count
+        self.ttl_seconds = ttl_seconds
+        self.codec = codec or default_codec
 
     def get(self, key: str) -> Optional[dict]:
         """Get value from Redis."""
-        data = redis_client.get(f"{self.prefix}:{key}")
+        data = redis_binary_client.get(f"{self.prefix}:{key}")
         if data:
-            return json.loads(data)
+            return self.codec.decode(data)
         return None
 
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Get several values in one round trip. Missing keys are omitted."""
+        if not keys:
+            return {}
+        values = redis_binary_client.mget([f"{self.prefix}:{key}" for key in keys])
+        return {key: self.codec.decode(data) for key, data in zip(keys, values) if data}
+
     def set(self, key: str, value: Any) -> None:
         """Set value in Redis."""
-        redis_client.set(f"{self.prefix}:{key}", json.dumps(value, default=str))
+        data = self.codec.encode(value)
+        if not self.track_members:
+            redis_binary_client.set(f"{self.prefix}:{key}", data, ex=self.ttl_seconds)
+            return
+        pipe = redis_binary_client.pipeline()
+        pipe.set(f"{self.prefix}:{key}", data, ex=self.ttl_seconds)
+        pipe.sadd(self.members_key, key)
+        pipe.execute()
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Set several values in one round trip (a pipeline)."""
+        if not items:
+            return
+        pipe = redis_binary_client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(f"{self.prefix}:{key}", self.codec.encode(value), ex=self.ttl_seconds)
+        if self.track_members:
+            pipe.sadd(self.members_key, *items)
+        pipe.execute()
 
     def delete(self, key: str) -> None:
         """Delete key from Redis."""
-        redis_client.delete(f"{self.prefix}:{key}")
+        if not self.track_members:
+            redis_client.delete(f"{self.prefix}:{key}")
+            return
+        pipe = redis_client.pipeline()
+        pipe.delete(f"{self.prefix}:{key}")
+        pipe.srem(self.members_key, key)
+        pipe.execute()
 
     def exists(self, key: str) -> bool:
         """Check if key exists in Redis."""
@@ -37,13 +228,105 @@ class RedisStorage:
 
     def list_all(self) -> list[dict]:
         """Return all values with this prefix."""
-        keys = redis_client.keys(f"{self.prefix}:*")
-        results = []
+        return list(self.iter_all())
+
+    def iter_all(self, batch_size: Optional[int] = None) -> Iterator[dict]:
+        """Yield all values with this prefix, fetched ``batch_size`` keys at a time."""
+        batch_size = batch_size or self.scan_count
+        batch: list[str] = []
+        for key in self._iter_keys(batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                yield from self._load(batch)
+                batch = []
+        if batch:
+            yield from self._load(batch)
+
+    def _iter_keys(self, count: int) -> Iterator[str]:
+        """Yield each key once (SCAN/SSCAN may repeat keys across calls)."""
+        if self.track_members:
+            keys: Iterable[str] = redis_client.sscan_iter(self.members_key, count=count)
+        else:
+            start = len(self.prefix) + 1
+            keys = (name[start:] for name in redis_client.scan_iter(match=f"{self.prefix}:*", count=count))
+        seen: set[str] = set()
         for key in keys:
-            data = redis_client.get(key)
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    def _load(self, keys: list[str]) -> Iterator[dict]:
+        values = redis_binary_client.mget([f"{self.prefix}:{key}" for key in keys])
+        missing = []
+        for key, data in zip(keys, values):
             if data:
-                results.append(json.loads(data))
-        return results
+                yield self.codec.decode(data)
+            else:
+                missing.append(key)
+        if missing and self.track_members:
+            # Deleted outside this class (or expired): drop from the set
+            redis_client.srem(self.members_key, *missing)
+
+    def apply_ttl(self) -> int:
+        """Set ``ttl_seconds`` on existing keys that have no expiry (found via SCAN). Returns the count."""
+        if not self.ttl_seconds:
+            return 0
+        updated = 0
+        batch: list[str] = []
+        for name in redis_client.scan_iter(match=f"{self.prefix}:*", count=self.scan_count):
+            batch.append(name)
+            if len(batch) >= self.scan_count:
+                updated += self._expire_persistent(batch)
+                batch = []
+        if batch:
+            updated += self._expire_persistent(batch)
+        return updated
+
+    def _expire_persistent(self, names: list[str]) -> int:
+        pipe = redis_client.pipeline(transaction=False)
+        for name in names:
+            pipe.ttl(name)
+        ttls = pipe.execute()
+        pipe = redis_client.pipeline(transaction=False)
+        persistent = [name for name, ttl in zip(names, ttls) if ttl == -1]
+        for name in persistent:
+            pipe.expire(name, self.ttl_seconds)
+        pipe.execute()
+        return len(persistent)
+
+    def rebuild_members(self) -> int:
+        """Add every existing key to the membership set (found via SCAN). Returns the count."""
+        added = 0
+        batch: list[str] = []
+        start = len(self.prefix) + 1
+        for name in redis_client.scan_iter(match=f"{self.prefix}:*", count=self.scan_count):
+            batch.append(name[start:])
+            if len(batch) >= self.scan_count:
+                added += redis_client.sadd(self.members_key, *batch)
+                batch = []
+        if batch:
+            added += redis_client.sadd(self.members_key, *batch)
+        return added
+
+    # --- Unique secondary indexes (value -> key), one Redis hash per index ---
+
+    def claim_unique(self, index: str, value: str, key: str) -> bool:
+        """Map ``value`` to ``key`` unless another key holds it. Returns False if taken."""
+        return bool(redis_client.eval(
+            UNIQUE_CLAIM, 2, self._unique_key(index), self._unique_claimed_key(index), value, key, time.time(),
+        ))
+
+    def lookup_unique(self, index: str, value: str) -> Optional[str]:
+        """Return the key ``value`` maps to, or None."""
+        return redis_client.hget(self._unique_key(index), value)
+
+    def release_unique(self, index: str, value: str, key: str, min_age_seconds: float = 0) -> bool:
+        """Remove the mapping for ``value`` if it still points at ``key`` and was
+        claimed at least ``min_age_seconds`` ago. Returns True if removed."""
+        return bool(redis_client.eval(
+            UNIQUE_RELEASE, 2, self._unique_key(index), self._unique_claimed_key(index),
+            value, key, time.time(), min_age_seconds,
+        ))
 
     def __contains__(self, key: str) -> bool:
         """Support 'in' operator."""
@@ -100,8 +383,27 @@ def _create_storage():
             logger.error(f"Failed to initialize Cosmos DB: {e}. Falling back to Redis.")
 
     logger.info("Using Redis storage (Cosmos DB not configured)")
-    return RedisStorage("job"), RedisStorage("proposals"), RedisStorage("users"), RedisStorage("settings")
+    options = {
+        "track_members": settings.redis_storage_member_sets,
+        "scan_count": settings.redis_scan_count,
+    }
+    # Jobs and proposals expire after the retention period; users and settings never do
+    retention_ttl = settings.job_retention_days * 86400 or None
+    return (
+        RedisStorage("job", ttl_seconds=retention_ttl, **options),
+        RedisStorage("proposals", ttl_seconds=retention_ttl, **options),
+        RedisStorage("users", **options),
+        RedisStorage("settings", **options),
+    )
+
+
+def _cached(name: str, backend):
+    """Wrap a store in the in-process cache if STORAGE_CACHE_TTL_SECONDS lists it."""
+    ttl_seconds = settings.storage_cache_ttl_seconds.get(name)
+    return CachedStorage(backend, name, ttl_seconds, storage_cache) if ttl_seconds else backend
 
 
 # Shared storage instances
-jobs_db, proposals_db, users_db, settings_db = _create_storage()
+jobs_db, proposals_db, users_db, settings_db = (
+    _cached(name, backend) for name, backend in zip(("jobs", "proposals", "users", "settings"), _create_storage())
+)
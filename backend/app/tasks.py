@@ -2,11 +2,19 @@ import asyncio
 import logging
 import time
 import uuid
+from collections import defaultdict
 from datetime import datetime
 from app.celery_app import celery_app
+from app.config import settings
 from app.models import JobStatus, JobProgress, Proposal
 from app.services.openai_client import AltTextGenerator, MockAltTextGenerator
 from app.services.webflow_client import WebflowClient, MockWebflowClient
+from app.services.audit import get_collection_auditor
+from app.services.image_fields import ImageFieldExtractor, schema_registry
+from app.services.job_events import get_job_events
+from app.services.job_index import get_job_index
+from app.services.response_cache import create_response_cache
+from app.services.retention import get_retention_manager
 from app.storage import jobs_db, proposals_db
 from app.key_manager import get_webflow_api_token, get_openai_api_key
 
@@ -23,24 +31,165 @@ def get_alt_text_generator():
 
 
 def get_webflow_client():
-    """Get Webflow client (real if token available, otherwise mock)."""
+    """Get Webflow client (real if token available, otherwise mock).
+
+    The client gets its own response cache connections; release both with
+    ``close_webflow_client`` before the task's event loop ends.
+    """
     token = get_webflow_api_token()
     if token:
-        return WebflowClient(api_token=token)
+        return WebflowClient(api_token=token, cache=create_response_cache())
     return MockWebflowClient()
 
 
+async def close_webflow_client(webflow_client: WebflowClient) -> None:
+    """Close a client from ``get_webflow_client`` and its response cache."""
+    await webflow_client.close()
+    if webflow_client.cache:
+        await webflow_client.cache.aclose()
+
+
+# Sentinel pushed by the page producer once pagination is finished
+_PAGES_DONE = object()
+
+
+async def _produce_target_items(
+    webflow_client: WebflowClient,
+    collection_id: str,
+    target_ids: set[str],
+    queue: asyncio.Queue,
+) -> set[str]:
+    """
+    Stream collection pages into ``queue``, keeping only target items.
+
+    Non-target items are dropped as each page arrives, and the bounded queue
+    applies backpressure so pagination never runs far ahead of generation.
+    Returns the set of target IDs that were never found.
+    """
+    remaining = set(target_ids)
+    try:
+        async for page in webflow_client.iter_collection_items(collection_id):
+            for item in page:
+                if item["id"] in remaining:
+                    remaining.discard(item["id"])
+                    await queue.put(item)
+            if not remaining:
+                logger.info("All target items found, stopping pagination early")
+                break
+    finally:
+        await queue.put(_PAGES_DONE)
+    return remaining
+
+
+async def _generate_item_proposals(
+    job_id: str,
+    raw_item: dict,
+    allowed_fields: set[str] | None,
+    ai_generator,
+    extractor: ImageFieldExtractor,
+) -> tuple[list[Proposal], int]:
+    """
+    Generate proposals for every (opted-in) image on one Webflow item.
+
+    Returns ``(proposals, images_skipped)``.
+    """
+    item_id = raw_item["id"]
+    field_data = raw_item.get("fieldData", {})
+    project_name = field_data.get("name", "Project")
+    proposals = []
+    images_skipped = 0
+
+    for image_field, alt_field, image_data, existing_alt in extractor.iter_images(field_data):
+        # Skip if not in the opted-in set
+        if allowed_fields is not None and image_field not in allowed_fields:
+            images_skipped += 1
+            continue
+
+        image_url = image_data.get("url")
+        if not image_url:
+            continue
+
+        img_start = time.monotonic()
+        logger.info(
+            "Generating alt text for image",
+            extra={
+                "job_id": job_id,
+                "item_id": item_id,
+                "field": image_field,
+                "project": project_name,
+                "image_url": image_url[:80],
+            },
+        )
+        # Generate alt text using AI
+        generated_alt = await ai_generator.generate_alt_text(
+            image_url=image_url,
+            context={
+                "name": project_name,
+                "existing_alt": existing_alt,
+                "field_name": image_field,
+            },
+        )
+        img_ms = round((time.monotonic() - img_start) * 1000, 2)
+        logger.info(
+            "Alt text generated",
+            extra={
+                "job_id": job_id,
+                "item_id": item_id,
+                "field": image_field,
+                "duration_ms": img_ms,
+                "alt_text_length": len(generated_alt),
+            },
+        )
+
+        proposals.append(
+            Proposal(
+                proposal_id=str(uuid.uuid4()),
+                job_id=job_id,
+                item_id=item_id,
+                field_name=alt_field,  # Use alt text field name
+                proposed_alt_text=generated_alt,
+                confidence_score=0.9,
+                model_used=ai_generator.model,
+                generated_at=datetime.now(),
+            )
+        )
+
+    return proposals, images_skipped
+
+
+def _save_job(job_id: str, job_data: dict) -> None:
+    """Persist a job record, bumping the version its status ETag is derived from."""
+    job_data["version"] = job_data.get("version", 0) + 1
+    jobs_db[job_id] = job_data
+
+
+def _update_progress(job_id: str, processed: int, total: int) -> None:
+    """Persist job progress and publish it to event subscribers."""
+    job_data = jobs_db[job_id]
+    job_data["progress"] = {
+        "processed": processed,
+        "total": total,
+        "percentage": (processed / total) * 100 if total else 100.0,
+    }
+    _save_job(job_id, job_data)
+    get_job_events().publish(job_id, "progress", job_data["progress"])
+
+
 async def process_job_async(job_id: str, collection_id: str, item_ids: list[str], image_keys: list[str] | None = None):
     """
     Async logic for processing alt text generation.
 
-    This is the same logic as before, just extracted for Celery.
+    Pages are streamed from Webflow into a bounded queue by a producer task
+    while this coroutine consumes target items and generates alt text, so
+    generation starts after the first page and memory stays flat regardless
+    of collection size.
     """
     try:
         # Update job status to PROCESSING
         job_data = jobs_db[job_id]
         job_data["status"] = JobStatus.PROCESSING
-        jobs_db[job_id] = job_data
+        _save_job(job_id, job_data)
+        get_job_index().upsert(job_data)
         job_start = time.monotonic()
         logger.info(
             "Job started",
@@ -63,130 +212,63 @@ async def process_job_async(job_id: str, collection_id: str, item_ids: list[str]
                 "ai_model": ai_generator.model,
             },
         )
-        proposals = []
 
-        # Fetch all items from Webflow (paginated)
-        all_items = await webflow_client.get_all_collection_items(
-            collection_id=collection_id,
-            target_ids=item_ids,
-        )
+        # allowed_fields: item_id -> set of field names like "1-after" (None = all)
+        allowed_by_item: dict[str, set[str]] | None = None
+        if image_keys is not None:
+            allowed_by_item = defaultdict(set)
+            for key in image_keys:
+                key_item_id, _, field = key.partition(":")
+                allowed_by_item[key_item_id].add(field)
 
-        # Build a lookup map
-        items_map = {item["id"]: item for item in all_items}
-        logger.info(
-            "Webflow items fetched",
-            extra={
-                "job_id": job_id,
-                "total_fetched": len(all_items),
-                "requested": len(item_ids),
-                "matched": len(set(item_ids) & set(items_map.keys())),
-            },
-        )
+        # Resolve the collection's image/alt-text field pairs once for the whole job
+        extractor = await schema_registry.get_extractor(webflow_client, collection_id)
 
-        # Process each item
+        proposals = []
         total = len(item_ids)
-        images_processed = 0
+        processed = 0
         images_skipped = 0
-        for idx, item_id in enumerate(item_ids):
-            try:
-                raw_item = items_map.get(item_id)
-                if not raw_item:
-                    logger.warning("Item not found in Webflow, skipping", extra={"job_id": job_id, "item_id": item_id})
-                    continue
-
-                field_data = raw_item.get("fieldData", {})
-                project_name = field_data.get("name", "Project")
-
-                # Process image fields (filtered by image_keys if provided)
-                # allowed_fields: set of field names like "1-after" for this item
-                if image_keys is not None:
-                    allowed_fields = {
-                        key.split(":", 1)[1]
-                        for key in image_keys
-                        if key.split(":", 1)[0] == item_id
-                    }
-                else:
-                    allowed_fields = None  # None means process all
-
-                for i in range(1, 5):
-                    image_field = f"{i}-after"
-                    alt_field = f"{i}-after-alt-text"
-
-                    # Skip if not in the opted-in set
-                    if allowed_fields is not None and image_field not in allowed_fields:
-                        images_skipped += 1
-                        continue
-
-                    image_data = field_data.get(image_field)
-                    existing_alt = field_data.get(alt_field)
-
-                    # Only generate if image exists
-                    if image_data and isinstance(image_data, dict):
-                        image_url = image_data.get("url")
-                        if image_url:
-                            img_start = time.monotonic()
-                            logger.info(
-                                "Generating alt text for image",
-                                extra={
-                                    "job_id": job_id,
-                                    "item_id": item_id,
-                                    "field": image_field,
-                                    "project": project_name,
-                                    "image_url": image_url[:80],
-                                },
-                            )
-                            # Generate alt text using AI
-                            generated_alt = await ai_generator.generate_alt_text(
-                                image_url=image_url,
-                                context={
-                                    "name": project_name,
-                                    "existing_alt": existing_alt,
-                                    "field_name": image_field,
-                                },
-                            )
-                            img_ms = round((time.monotonic() - img_start) * 1000, 2)
-                            images_processed += 1
-                            logger.info(
-                                "Alt text generated",
-                                extra={
-                                    "job_id": job_id,
-                                    "item_id": item_id,
-                                    "field": image_field,
-                                    "duration_ms": img_ms,
-                                    "alt_text_length": len(generated_alt),
-                                    "images_done": images_processed,
-                                },
-                            )
-
-                            # Create proposal
-                            proposal = Proposal(
-                                proposal_id=str(uuid.uuid4()),
-                                job_id=job_id,
-                                item_id=item_id,
-                                field_name=alt_field,  # Use alt text field name
-                                proposed_alt_text=generated_alt,
-                                confidence_score=0.9,
-                                model_used=ai_generator.model,
-                                generated_at=datetime.now(),
-                            )
-                            proposals.append(proposal)
-
-                # Update progress
-                job_data = jobs_db[job_id]
-                job_data["progress"] = {
-                    "processed": idx + 1,
-                    "total": total,
-                    "percentage": ((idx + 1) / total) * 100,
-                }
-                jobs_db[job_id] = job_data
-
-            except Exception as e:
-                logger.error(
-                    "Error processing item",
-                    extra={"job_id": job_id, "item_id": item_id, "error": str(e)},
-                    exc_info=True,
-                )
-                continue
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.job_pipeline_queue_size)
+        producer = asyncio.create_task(
+            _produce_target_items(webflow_client, collection_id, set(item_ids), queue)
+        )
+
+        try:
+            while True:
+                raw_item = await queue.get()
+                if raw_item is _PAGES_DONE:
+                    break
+
+                item_id = raw_item["id"]
+                try:
+                    allowed_fields = allowed_by_item.get(item_id, set()) if allowed_by_item is not None else None
+                    item_proposals, skipped = await _generate_item_proposals(
+                        job_id, raw_item, allowed_fields, ai_generator, extractor
+                    )
+                    proposals.extend(item_proposals)
+                    images_skipped += skipped
+                    for proposal in item_proposals:
+                        get_job_events().publish(job_id, "proposal", proposal.model_dump(mode="json"))
+                except Exception as e:
+                    logger.error(
+                        "Error processing item",
+                        extra={"job_id": job_id, "item_id": item_id, "error": str(e)},
+                        exc_info=True,
+                    )
+
+                processed += 1
+                _update_progress(job_id, processed, total)
+
+            missing = await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+        for item_id in missing:
+            logger.warning("Item not found in Webflow, skipping", extra={"job_id": job_id, "item_id": item_id})
+        if processed < total:
+            _update_progress(job_id, total, total)
 
         # Store proposals (serialize Pydantic models to dicts)
         proposals_db[job_id] = [p.model_dump() for p in proposals]
@@ -194,20 +276,23 @@ async def process_job_async(job_id: str, collection_id: str, item_ids: list[str]
         # Mark job as complete
         job_data = jobs_db[job_id]
         job_data["status"] = JobStatus.COMPLETED
-        jobs_db[job_id] = job_data
+        _save_job(job_id, job_data)
+        get_job_index().upsert(job_data)
+        get_job_events().publish(job_id, "completed", {"status": JobStatus.COMPLETED, "proposal_count": len(proposals)})
         duration_ms = round((time.monotonic() - job_start) * 1000, 2)
         logger.info(
             "Job completed",
             extra={
                 "job_id": job_id,
                 "proposal_count": len(proposals),
-                "images_processed": images_processed,
+                "images_processed": len(proposals),
                 "images_skipped": images_skipped,
+                "items_missing": len(missing),
                 "duration_ms": duration_ms,
             },
         )
 
-        await webflow_client.close()
+        await close_webflow_client(webflow_client)
 
     except Exception as e:
         logger.error(
@@ -218,7 +303,9 @@ async def process_job_async(job_id: str, collection_id: str, item_ids: list[str]
         job_data = jobs_db[job_id]
         job_data["status"] = JobStatus.FAILED
         job_data["error_message"] = str(e)
-        jobs_db[job_id] = job_data
+        _save_job(job_id, job_data)
+        get_job_index().upsert(job_data)
+        get_job_events().publish(job_id, "failed", {"status": JobStatus.FAILED, "error_message": str(e)})
 
 
 @celery_app.task(name="app.tasks.generate_alt_text", bind=True)
@@ -244,3 +331,40 @@ def generate_alt_text_task(self, job_id: str, collection_id: str, item_ids: list
 
     logger.info("Celery task completed", extra={"job_id": job_id})
     return {"job_id": job_id, "status": "completed"}
+
+
+async def audit_collection_async(collection_id: str) -> dict:
+    """Run an incremental alt-text audit and release the collection's audit lock."""
+    auditor = get_collection_auditor()
+    webflow_client = get_webflow_client()
+    try:
+        return await auditor.run(webflow_client, collection_id)
+    except Exception as e:
+        logger.error(
+            "Collection audit failed",
+            extra={"collection_id": collection_id, "error": str(e)},
+            exc_info=True,
+        )
+        auditor.record_error(collection_id, str(e))
+        raise
+    finally:
+        auditor.release(collection_id)
+        await close_webflow_client(webflow_client)
+
+
+@celery_app.task(name="app.tasks.audit_collection")
+def audit_collection_task(collection_id: str):
+    """Celery task computing the alt-text audit report for a collection."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        report = loop.run_until_complete(audit_collection_async(collection_id))
+    finally:
+        loop.close()
+    return {"collection_id": collection_id, "items": report["items"]}
+
+
+@celery_app.task(name="app.tasks.enforce_retention")
+def enforce_retention_task():
+    """Celery beat task: archive old proposals and prune expired jobs from the job index."""
+    return get_retention_manager().run()
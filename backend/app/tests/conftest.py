@@ -1,10 +1,28 @@
+import asyncio
+import copy
+import fnmatch
+import time
+import uuid
 import pytest
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
+from app.async_storage import IdentityMappedStorage
 from app.main import app
 from app.routers.items import get_webflow_client as items_get_client
 from app.routers.jobs import get_webflow_client as jobs_get_client
+from app.services.audit import CollectionAuditor
+from app.services.job_events import JobEvents
+from app.services.job_index import AsyncJobIndex, JobIndex
+from app.services.retention import RetentionManager
+from app.services.search_index import ItemSearchIndex
 from app.services.webflow_client import MockWebflowClient
+from app.storage import COMPARE_AND_DELETE, UNIQUE_CLAIM, UNIQUE_RELEASE
 
 
 class InMemoryStorage:
@@ -15,13 +33,21 @@ class InMemoryStorage:
 
     def __init__(self):
         self._data = {}
+        self._unique = {}
+        self._claimed_at = {}
 
     def get(self, key):
         return self._data.get(key)
 
+    def get_many(self, keys):
+        return {key: self._data[key] for key in keys if key in self._data}
+
     def set(self, key, value):
         self._data[key] = value
 
+    def set_many(self, items):
+        self._data.update(items)
+
     def delete(self, key):
         self._data.pop(key, None)
 
@@ -31,6 +57,27 @@ class InMemoryStorage:
     def list_all(self):
         return list(self._data.values())
 
+    def iter_all(self, batch_size=None):
+        return iter(list(self._data.values()))
+
+    def claim_unique(self, index, value, key):
+        if (index, value) not in self._unique:
+            self._unique[(index, value)] = key
+            self._claimed_at[(index, value)] = time.time()
+        return self._unique[(index, value)] == key
+
+    def lookup_unique(self, index, value):
+        return self._unique.get((index, value))
+
+    def release_unique(self, index, value, key, min_age_seconds=0):
+        if self._unique.get((index, value)) != key:
+            return False
+        if time.time() - self._claimed_at.get((index, value), 0) < min_age_seconds:
+            return False
+        del self._unique[(index, value)]
+        self._claimed_at.pop((index, value), None)
+        return True
+
     def __contains__(self, key):
         return key in self._data
 
@@ -43,24 +90,460 @@ class InMemoryStorage:
         self._data[key] = value
 
 
+class AsyncInMemoryStorage:
+    """Async view of an ``InMemoryStorage``, matching the app.async_storage interface.
+
+    Shares the wrapped storage's data, so tests can set up and inspect state
+    through the sync fixture while the API awaits this one.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    async def get(self, key):
+        return self.storage.get(key)
+
+    async def get_many(self, keys):
+        return self.storage.get_many(keys)
+
+    async def set(self, key, value):
+        self.storage.set(key, value)
+
+    async def set_many(self, items):
+        self.storage.set_many(items)
+
+    async def delete(self, key):
+        self.storage.delete(key)
+
+    async def exists(self, key):
+        return self.storage.exists(key)
+
+    async def list_all(self):
+        return self.storage.list_all()
+
+    async def iter_all(self, batch_size=None):
+        for value in self.storage.iter_all(batch_size):
+            yield value
+
+    async def claim_unique(self, index, value, key):
+        return self.storage.claim_unique(index, value, key)
+
+    async def lookup_unique(self, index, value):
+        return self.storage.lookup_unique(index, value)
+
+    async def release_unique(self, index, value, key, min_age_seconds=0):
+        return self.storage.release_unique(index, value, key, min_age_seconds)
+
+
+class FakeCosmosContainer:
+    """In-process stand-in for an ``azure.cosmos.aio`` container.
+
+    Supports point operations and the queries the storage classes issue.
+    Documents are copied in and out, as they would be over the wire.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.queries = []
+
+    async def read_item(self, item, partition_key):
+        if item not in self.items:
+            raise CosmosResourceNotFoundError(message=f"{item} not found")
+        return copy.deepcopy(self.items[item])
+
+    def _store(self, body):
+        self.items[body["id"]] = {**copy.deepcopy(body), "_etag": uuid.uuid4().hex, "_ts": int(time.time())}
+        return body
+
+    async def create_item(self, body):
+        if body["id"] in self.items:
+            raise CosmosResourceExistsError(message=f"{body['id']} exists")
+        return self._store(body)
+
+    async def upsert_item(self, body):
+        return self._store(body)
+
+    async def delete_item(self, item, partition_key, etag=None, match_condition=None):
+        if item not in self.items:
+            raise CosmosResourceNotFoundError(message=f"{item} not found")
+        if match_condition == MatchConditions.IfNotModified and self.items[item]["_etag"] != etag:
+            raise CosmosAccessConditionFailedError(message=f"{item} was modified")
+        del self.items[item]
+
+    def query_items(self, query, parameters=None, max_item_count=None, **kwargs):
+        self.queries.append((query, parameters, max_item_count))
+        return self._run_query(query, parameters or [])
+
+    async def _run_query(self, query, parameters):
+        if query == "SELECT c.data, c.blob FROM c":
+            results = [
+                {field: doc[field] for field in ("data", "blob") if field in doc}
+                for doc in self.items.values()
+            ]
+        elif "ARRAY_CONTAINS(@ids, c.id)" in query:
+            ids = set(parameters[0]["value"])
+            results = [doc for doc in self.items.values() if doc["id"] in ids]
+        else:
+            raise NotImplementedError(query)
+        for doc in results:
+            yield copy.deepcopy(doc)
+
+
+class FakeCosmosClient:
+    """``azure.cosmos.aio.CosmosClient`` stand-in handing out ``FakeCosmosContainer``s by name."""
+
+    def __init__(self):
+        self.containers = {}
+        self.closed = False
+
+    def get_database_client(self, database_name):
+        return self
+
+    def get_container_client(self, container_name):
+        return self.containers.setdefault(container_name, FakeCosmosContainer())
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePubSub:
+    """Async pub/sub subscription over ``FakeRedis`` channels (single event loop only)."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._queue = asyncio.Queue()
+        self.channels = set()
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self._redis.subscribers.setdefault(channel, []).append(self._queue)
+            self.channels.add(channel)
+
+    async def unsubscribe(self, *channels):
+        for channel in channels:
+            self._redis.subscribers.get(channel, []).remove(self._queue)
+            self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    """Queues FakeRedis commands and runs them on ``execute()``."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [command(*args, **kwargs) for command, args, kwargs in self._commands]
+        self._commands = []
+        return results
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis client (strings, hashes, sets, sorted sets, pub/sub).
+
+    Only implements the commands the app uses; TTLs are recorded but not enforced.
+    Also serves as the async client for pub/sub subscriptions.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self.ttls = {}
+        self.subscribers = {}
+        self.published = []
+
+    def get(self, key):
+        return self._data.get(key)
+
+    def mget(self, keys):
+        return [self._data.get(key) for key in keys]
+
+    def scan_iter(self, match="*", count=None):
+        return iter([key for key in list(self._data) if fnmatch.fnmatchcase(key, match)])
+
+    def keys(self, pattern="*"):
+        raise AssertionError("KEYS blocks the Redis server; use scan_iter")
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def set(self, key, value, ex=None, nx=False, px=None):
+        if nx and key in self._data:
+            return None
+        self._data[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    def setex(self, key, ttl, value):
+        self._data[key] = value
+        self.ttls[key] = ttl
+        return True
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._data.pop(key, None) is not None:
+                removed += 1
+            self.ttls.pop(key, None)
+        return removed
+
+    def exists(self, key):
+        return int(key in self._data)
+
+    def expire(self, key, ttl):
+        if key in self._data:
+            self.ttls[key] = ttl
+            return True
+        return False
+
+    def ttl(self, key):
+        if key not in self._data:
+            return -2
+        return self.ttls.get(key, -1)
+
+    def incr(self, key, amount=1):
+        self._data[key] = int(self._data.get(key, 0)) + amount
+        return self._data[key]
+
+    def hincrby(self, key, field, amount=1):
+        bucket = self._data.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        bucket = self._data.setdefault(key, {})
+        updates = dict(mapping or {})
+        if field is not None:
+            updates[field] = value
+        added = sum(1 for f in updates if f not in bucket)
+        bucket.update(updates)
+        return added
+
+    def hdel(self, key, *fields):
+        bucket = self._data.get(key, {})
+        return sum(1 for f in fields if bucket.pop(f, None) is not None)
+
+    def hget(self, key, field):
+        return self._data.get(key, {}).get(field)
+
+    def hsetnx(self, key, field, value):
+        bucket = self._data.setdefault(key, {})
+        if field in bucket:
+            return 0
+        bucket[field] = value
+        return 1
+
+    def hgetall(self, key):
+        return {k: str(v) for k, v in self._data.get(key, {}).items()}
+
+    def sadd(self, key, *members):
+        bucket = self._data.setdefault(key, set())
+        before = len(bucket)
+        bucket.update(members)
+        return len(bucket) - before
+
+    def smembers(self, key):
+        return set(self._data.get(key, set()))
+
+    def srem(self, key, *members):
+        bucket = self._data.get(key, set())
+        removed = len(bucket & set(members))
+        bucket.difference_update(members)
+        return removed
+
+    def sscan_iter(self, key, match=None, count=None):
+        return iter(sorted(self._data.get(key, set())))
+
+    def zadd(self, key, mapping):
+        bucket = self._data.setdefault(key, {})
+        added = sum(1 for member in mapping if member not in bucket)
+        bucket.update({member: float(score) for member, score in mapping.items()})
+        return added
+
+    def zrem(self, key, *members):
+        bucket = self._data.get(key, {})
+        return sum(1 for member in members if bucket.pop(member, None) is not None)
+
+    def zscore(self, key, member):
+        return self._data.get(key, {}).get(member)
+
+    @staticmethod
+    def _within(score, min, max):
+        # Score bounds may be "-inf"/"+inf" or exclusive ("(1.5")
+        low, high = str(min), str(max)
+        above = score > float(low[1:]) if low.startswith("(") else score >= float(low)
+        below = score < float(high[1:]) if high.startswith("(") else score <= float(high)
+        return above and below
+
+    def _zrange(self, key, min, max):
+        return sorted(
+            ((member, score) for member, score in self._data.get(key, {}).items()
+             if self._within(score, min, max)),
+            key=lambda entry: (entry[1], entry[0]),
+        )
+
+    def zrangebyscore(self, key, min, max, start=None, num=None, withscores=False):
+        entries = self._zrange(key, min, max)
+        if start is not None:
+            entries = entries[start:start + num]
+        return entries if withscores else [member for member, _ in entries]
+
+    def zcount(self, key, min, max):
+        return len(self._zrange(key, min, max))
+
+    def zcard(self, key):
+        return len(self._data.get(key, {}))
+
+    def zremrangebyscore(self, key, min, max):
+        bucket = self._data.get(key, {})
+        doomed = [member for member, _ in self._zrange(key, min, max)]
+        for member in doomed:
+            del bucket[member]
+        return len(doomed)
+
+    def zrevrangebyscore(self, key, max, min, start=None, num=None, withscores=False):
+        max_score, min_score = float(max), float(min)
+        entries = sorted(
+            ((member, score) for member, score in self._data.get(key, {}).items()
+             if min_score <= score <= max_score),
+            key=lambda entry: (entry[1], entry[0]),
+            reverse=True,
+        )
+        if start is not None:
+            entries = entries[start:start + num]
+        return entries if withscores else [member for member, _ in entries]
+
+    def eval(self, script, numkeys, *keys_and_args):
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == COMPARE_AND_DELETE:
+            return self.delete(keys[0]) if self.get(keys[0]) == args[0] else 0
+        if script == UNIQUE_CLAIM:
+            value, key, now = args
+            if self.hsetnx(keys[0], value, key):
+                self.hset(keys[1], value, str(now))
+                return 1
+            return int(self.hget(keys[0], value) == key)
+        if script == UNIQUE_RELEASE:
+            value, key, now, min_age = args
+            if self.hget(keys[0], value) != key:
+                return 0
+            if float(now) - float(self.hget(keys[1], value) or 0) < float(min_age):
+                return 0
+            self.hdel(keys[1], value)
+            return self.hdel(keys[0], value)
+        raise NotImplementedError(script)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        queues = self.subscribers.get(channel, [])
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return len(queues)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class AsyncFakePipeline(FakePipeline):
+    async def execute(self):
+        return super().execute()
+
+
+class AsyncFakeRedis:
+    """``redis.asyncio``-style facade over a FakeRedis: every command is awaitable."""
+
+    def __init__(self, redis):
+        self._redis = redis
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        async def call(*args, **kwargs):
+            return command(*args, **kwargs)
+        return call
+
+    async def scan_iter(self, match="*", count=None):
+        for key in self._redis.scan_iter(match=match, count=count):
+            yield key
+
+    async def sscan_iter(self, key, match=None, count=None):
+        for member in self._redis.sscan_iter(key, match=match, count=count):
+            yield member
+
+    def pipeline(self, transaction=True):
+        return AsyncFakePipeline(self._redis)
+
+    async def aclose(self, close_connection_pool=None):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_redis():
+    """Point Redis-backed caches at an in-memory fake and reset their singletons."""
+    fake = FakeRedis()
+    with (
+        patch("app.services.response_cache.async_redis_client", AsyncFakeRedis(fake)),
+        patch("app.services.response_cache._response_cache", None),
+        patch("app.services.single_flight.async_redis_client", AsyncFakeRedis(fake)),
+        patch("app.services.single_flight._single_flight", None),
+        patch("app.services.projection_cache.async_redis_client", AsyncFakeRedis(fake)),
+        patch("app.services.projection_cache._projection_cache", None),
+        patch("app.services.job_events._job_events", JobEvents(fake, fake)),
+        patch("app.services.job_index._job_index", JobIndex(fake)),
+        patch("app.services.job_index._async_job_index", AsyncJobIndex(AsyncFakeRedis(fake))),
+        patch("app.services.audit._auditor", CollectionAuditor(fake)),
+        patch("app.services.retention._manager", RetentionManager(fake, InMemoryStorage(), InMemoryStorage())),
+        patch("app.async_storage.async_redis_client", AsyncFakeRedis(fake)),
+        patch("app.async_storage.async_redis_binary_client", AsyncFakeRedis(fake)),
+        patch("app.auth.async_redis_client", AsyncFakeRedis(fake)),
+    ):
+        yield fake
+
+
 @pytest.fixture(autouse=True)
 def mock_storage():
-    """Replace storage backends with in-memory dicts for all tests."""
+    """Replace storage backends with in-memory dicts for all tests.
+
+    The API's async storage wraps the same dicts the sync storage (used by
+    Celery tasks) sees; the fixture yields the sync ones.
+    """
     mem_jobs = InMemoryStorage()
     mem_proposals = InMemoryStorage()
     mem_users = InMemoryStorage()
     mem_settings = InMemoryStorage()
+    async_jobs, async_proposals, async_users, async_settings = (
+        IdentityMappedStorage(AsyncInMemoryStorage(mem))
+        for mem in (mem_jobs, mem_proposals, mem_users, mem_settings)
+    )
     with (
         patch("app.storage.jobs_db", mem_jobs),
         patch("app.storage.proposals_db", mem_proposals),
         patch("app.storage.users_db", mem_users),
         patch("app.storage.settings_db", mem_settings),
-        patch("app.routers.jobs.jobs_db", mem_jobs),
-        patch("app.routers.jobs.proposals_db", mem_proposals),
-        patch("app.routers.auth.users_db", mem_users),
-        patch("app.routers.auth.settings_db", mem_settings),
-        patch("app.routers.admin.users_db", mem_users),
-        patch("app.routers.admin.settings_db", mem_settings),
+        patch("app.routers.jobs.jobs_db", async_jobs),
+        patch("app.routers.jobs.proposals_db", async_proposals),
+        patch("app.routers.auth.users_db", async_users),
+        patch("app.routers.auth.settings_db", async_settings),
+        patch("app.routers.admin.users_db", async_users),
+        patch("app.routers.admin.settings_db", async_settings),
+        patch("app.user_directory.users_db", async_users),
         patch("app.tasks.jobs_db", mem_jobs),
         patch("app.tasks.proposals_db", mem_proposals),
         patch("app.key_manager.settings_db", mem_settings),
@@ -73,6 +556,14 @@ def mock_storage():
         }
 
 
+@pytest.fixture(autouse=True)
+def search_index():
+    """Use a fresh in-memory search index for each test."""
+    index = ItemSearchIndex(":memory:")
+    with patch("app.services.search_index._search_index", index):
+        yield index
+
+
 @pytest.fixture(autouse=True)
 def mock_celery_task():
     """Mock Celery task dispatch so tests don't need a Redis broker."""
@@ -7,16 +7,16 @@ from app.tests.conftest import register_user
 
 @pytest.fixture(autouse=True)
 def mock_redis_for_sessions():
-    """Mock Redis client used by auth module for sessions."""
+    """Mock async Redis client used by auth module for sessions."""
     data = {}
 
-    def mock_setex(key, ttl, value):
+    async def mock_setex(key, ttl, value):
         data[key] = value
 
-    def mock_get(key):
+    async def mock_get(key):
         return data.get(key)
 
-    def mock_delete(key):
+    async def mock_delete(key):
         data.pop(key, None)
 
     mock = MagicMock()
@@ -24,7 +24,7 @@ def mock_redis_for_sessions():
     mock.get = mock_get
     mock.delete = mock_delete
 
-    with patch("app.auth.redis_client", mock):
+    with patch("app.auth.async_redis_client", mock):
         yield
 
 
@@ -273,3 +273,35 @@ class TestApiKeyManagement:
         user_cookies = register_regular_user(client, None)
         resp = client.get("/api/v1/admin/settings/api-keys", cookies=user_cookies)
         assert resp.status_code == 403
+
+
+class TestMetrics:
+    def test_admin_can_read_cache_metrics(self, client):
+        admin_cookies = register_admin(client)
+        resp = client.get("/api/v1/admin/metrics", cookies=admin_cookies)
+        assert resp.status_code == 200
+        assert resp.json()["webflow_cache"] == {"hits": 0, "misses": 0, "hit_ratio": 0.0}
+        assert set(resp.json()["storage_cache"]) == {"listening", "entries", "stores"}
+
+    def test_regular_user_cannot_read_metrics(self, client):
+        register_admin(client)
+        user_cookies = register_regular_user(client, None)
+        resp = client.get("/api/v1/admin/metrics", cookies=user_cookies)
+        assert resp.status_code == 403
+
+
+class TestRetention:
+    def test_admin_can_read_retention_stats(self, client):
+        admin_cookies = register_admin(client)
+        resp = client.get("/api/v1/admin/retention", cookies=admin_cookies)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["retention_days"] is None
+        assert data["jobs"]["indexed"] == 0
+        assert data["archive"]["type"] == "off"
+
+    def test_regular_user_cannot_read_retention_stats(self, client):
+        register_admin(client)
+        user_cookies = register_regular_user(client, None)
+        resp = client.get("/api/v1/admin/retention", cookies=user_cookies)
+        assert resp.status_code == 403
@@ -2,21 +2,23 @@ import pytest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from app.main import app
-from app.tests.conftest import register_user, login_user
+from app.async_storage import IdentityMappedStorage
+from app.cosmos_storage import AsyncCosmosStorage
+from app.tests.conftest import FakeCosmosClient, register_user, login_user
 
 
 @pytest.fixture(autouse=True)
 def mock_redis_for_sessions():
-    """Mock Redis client used by auth module for sessions."""
+    """Mock async Redis client used by auth module for sessions."""
     data = {}
 
-    def mock_setex(key, ttl, value):
+    async def mock_setex(key, ttl, value):
         data[key] = value
 
-    def mock_get(key):
+    async def mock_get(key):
         return data.get(key)
 
-    def mock_delete(key):
+    async def mock_delete(key):
         data.pop(key, None)
 
     mock = MagicMock()
@@ -24,7 +26,7 @@ def mock_redis_for_sessions():
     mock.get = mock_get
     mock.delete = mock_delete
 
-    with patch("app.auth.redis_client", mock):
+    with patch("app.auth.async_redis_client", mock):
         yield
 
 
@@ -51,6 +53,11 @@ class TestRegister:
         resp = register_user(client, "dupe@test.com", "pass12345", "Dupe2")
         assert resp.status_code == 409
 
+    def test_register_duplicate_email_differing_in_case(self, client):
+        register_user(client, "dupe@test.com", "pass12345", "Dupe")
+        resp = register_user(client, "DUPE@test.com", "pass12345", "Dupe2")
+        assert resp.status_code == 409
+
     def test_register_short_password(self, client):
         resp = client.post("/api/v1/auth/register", json={
             "email": "test@test.com",
@@ -94,6 +101,24 @@ class TestLogin:
         resp = login_user(client, "inactive@test.com", "password123")
         assert resp.status_code == 403
 
+    def test_login_email_is_case_insensitive(self, client):
+        register_user(client, "Mixed@Test.com", "password123", "Mixed")
+        resp = login_user(client, "  mixed@test.COM", "password123")
+        assert resp.status_code == 200
+        assert resp.json()["email"] == "Mixed@Test.com"
+
+    def test_login_does_not_list_users(self, client, mock_storage):
+        register_user(client, "login@test.com", "password123", "Login User")
+        with patch.object(mock_storage["users"], "iter_all", side_effect=AssertionError("listed users")):
+            resp = login_user(client, "login@test.com", "password123")
+        assert resp.status_code == 200
+
+    def test_unknown_email_does_not_list_users(self, client, mock_storage):
+        register_user(client, "login@test.com", "password123", "Login User")
+        with patch.object(mock_storage["users"], "iter_all", side_effect=AssertionError("listed users")):
+            resp = login_user(client, "nobody@test.com", "password123")
+        assert resp.status_code == 401
+
 
 class TestLogout:
     def test_logout(self, client):
@@ -143,3 +168,28 @@ class TestProtectedEndpoints:
             "updates": [],
         })
         assert resp.status_code == 401
+
+
+class TestCosmosBackedAuth:
+    @pytest.fixture(autouse=True)
+    def cosmos_users(self):
+        """Serve users from AsyncCosmosStorage over the in-process Cosmos fake."""
+        backend = AsyncCosmosStorage("test-db", "users", partition_key_field="user_id")
+        backend.open(FakeCosmosClient())
+        users = IdentityMappedStorage(backend)
+        with (
+            patch("app.routers.auth.users_db", users),
+            patch("app.user_directory.users_db", users),
+        ):
+            yield users
+
+    def test_register_and_login(self, client, cosmos_users):
+        register_user(client, "Cosmos@Test.com", "password123", "Cosmos")
+        resp = login_user(client, "cosmos@test.com", "password123")
+        assert resp.status_code == 200
+        assert resp.json()["role"] == "admin"
+
+    def test_register_duplicate_email(self, client):
+        register_user(client, "dupe@test.com", "password123", "Dupe")
+        resp = register_user(client, "DUPE@test.com", "password123", "Dupe2")
+        assert resp.status_code == 409
@@ -0,0 +1,133 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.auth import get_current_user
+from app.main import app
+from app.services.audit import get_collection_auditor
+
+STUB_USER = {"user_id": "test_user", "role": "admin", "email": "test@test.com"}
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def override_auth():
+    app.dependency_overrides[get_current_user] = lambda: STUB_USER
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def audit_task():
+    task = MagicMock()
+    with patch("app.routers.collections.audit_collection_task", task):
+        yield task
+
+
+def _store_report(fake_redis, collection_id="coll"):
+    report = {
+        "collection_id": collection_id,
+        "generated_at": "2025-01-01T00:00:00+00:00",
+        "items": 1,
+        "images": 2,
+        "with_alt": 1,
+        "missing_alt": 1,
+        "over_limit": 0,
+        "coverage_percentage": 50.0,
+        "length_histogram": {"missing": 1, "1-25": 1},
+        "duplicate_group_count": 0,
+        "duplicate_groups": [],
+    }
+    fake_redis.set(f"audit:{collection_id}:report", json.dumps(report))
+
+
+def test_first_request_queues_audit_once(audit_task):
+    first = client.get("/api/v1/collections/coll/audit")
+    second = client.get("/api/v1/collections/coll/audit")
+
+    assert first.status_code == 202
+    assert first.json()["status"] == "pending"
+    assert second.status_code == 202
+    audit_task.delay.assert_called_once_with("coll")
+
+
+def test_cached_report_is_returned(audit_task, fake_redis):
+    _store_report(fake_redis)
+
+    response = client.get("/api/v1/collections/coll/audit")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["stale"] is False
+    assert data["report"]["coverage_percentage"] == 50.0
+    audit_task.delay.assert_not_called()
+
+
+def test_stale_report_is_served_while_refreshing(audit_task, fake_redis):
+    _store_report(fake_redis)
+    get_collection_auditor().mark_stale("coll")
+
+    data = client.get("/api/v1/collections/coll/audit").json()
+
+    assert data["status"] == "ready"
+    assert data["stale"] is True
+    assert data["refreshing"] is True
+    audit_task.delay.assert_called_once_with("coll")
+
+
+def test_post_forces_refresh(audit_task, fake_redis):
+    _store_report(fake_redis)
+
+    response = client.post("/api/v1/collections/coll/audit")
+
+    assert response.status_code == 202
+    assert response.json()["refreshing"] is True
+    audit_task.delay.assert_called_once_with("coll")
+
+
+def test_old_report_is_refreshed(audit_task, fake_redis):
+    _store_report(fake_redis)
+    get_collection_auditor().report_max_age_seconds = 3600
+
+    data = client.get("/api/v1/collections/coll/audit").json()
+
+    assert data["stale"] is True
+    audit_task.delay.assert_called_once_with("coll")
+
+
+def test_last_error_is_returned(audit_task, fake_redis):
+    _store_report(fake_redis)
+    get_collection_auditor().record_error("coll", "Webflow API error: 500")
+
+    data = client.get("/api/v1/collections/coll/audit").json()
+
+    assert data["status"] == "ready"
+    assert data["last_error"]["error"] == "Webflow API error: 500"
+
+
+def test_recent_failure_is_not_requeued_by_reads(audit_task):
+    auditor = get_collection_auditor()
+    auditor.retry_cooldown_seconds = 300
+    auditor.record_error("coll", "Webflow API error: 500")
+
+    response = client.get("/api/v1/collections/coll/audit")
+
+    assert response.status_code == 202
+    assert response.json()["refreshing"] is False
+    audit_task.delay.assert_not_called()
+
+    client.post("/api/v1/collections/coll/audit")
+    audit_task.delay.assert_called_once_with("coll")
+
+
+def test_failed_enqueue_releases_the_lock(audit_task):
+    audit_task.delay.side_effect = ConnectionError("broker down")
+
+    with pytest.raises(ConnectionError):
+        client.post("/api/v1/collections/coll/audit")
+
+    assert not get_collection_auditor().is_running("coll")
@@ -1,8 +1,10 @@
+import json
 import pytest
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from app.main import app
 from app.auth import get_current_user
+from app.services import projection_cache as projection_cache_module
 
 STUB_USER = {"user_id": "test_user", "role": "admin", "email": "test@test.com"}
 
@@ -53,3 +55,119 @@ def test_list_items_invalid_limit():
     response = client.get("/api/v1/items?collection_id=test&limit=200")
 
     assert response.status_code == 422  # Limit must be <= 100
+
+
+def test_list_items_served_from_projection_cache():
+    """Second identical request is served from the projection cache."""
+    first = client.get("/api/v1/items?collection_id=cached&limit=10&offset=0")
+    second = client.get("/api/v1/items?collection_id=cached&limit=10&offset=0")
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.json() == second.json()
+
+
+def test_cached_page_is_tracked_in_one_transaction(fake_redis):
+    """The page and its collection key set are written in one MULTI/EXEC."""
+    redis = projection_cache_module.async_redis_client
+    with patch.object(redis, "pipeline", wraps=redis.pipeline) as pipeline:
+        client.get("/api/v1/items?collection_id=tracked&limit=10&offset=0")
+
+    pipeline.assert_called_once_with(transaction=True)
+    assert fake_redis.smembers("items_proj:tracked:pages") == {"items_proj:tracked:10:0"}
+
+
+def test_list_items_revalidation_returns_304():
+    """A client holding the page's ETag gets an empty 304."""
+    first = client.get("/api/v1/items?collection_id=etag&limit=10")
+    etag = first.headers["ETag"]
+
+    second = client.get("/api/v1/items?collection_id=etag&limit=10", headers={"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_projection_cache_is_per_page():
+    """Different offsets are cached separately."""
+    client.get("/api/v1/items?collection_id=paged&limit=10&offset=0")
+    response = client.get("/api/v1/items?collection_id=paged&limit=10&offset=10")
+
+    assert response.headers["X-Cache"] == "MISS"
+
+
+def test_apply_invalidates_projection_cache():
+    """Applying alt text drops the collection's cached pages."""
+    client.get("/api/v1/items?collection_id=coll123")
+    with patch("app.routers.jobs.get_webflow_collection_id", return_value="coll123"):
+        client.post("/api/v1/apply", json={
+            "updates": [{"item_id": "item_001", "field_name": "1-after-alt-text", "alt_text": "New"}],
+        })
+    response = client.get("/api/v1/items?collection_id=coll123")
+
+    assert response.headers["X-Cache"] == "MISS"
+
+
+def test_search_indexes_viewed_pages():
+    """Items seen through the list endpoint become searchable."""
+    client.get("/api/v1/items?collection_id=coll123")
+    response = client.get("/api/v1/items/search?collection_id=coll123&q=product")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert {item["id"] for item in data["items"]} == {"item_001", "item_002"}
+    assert data["complete"] is False
+    assert data["indexed_at"] is None
+
+
+def test_reindex_then_search_with_cursor():
+    """Reindexing indexes the whole collection; cursors page through results."""
+    reindex = client.post("/api/v1/items/search/reindex?collection_id=coll123")
+    assert reindex.json() == {"collection_id": "coll123", "indexed": 2, "removed": 0}
+
+    first = client.get("/api/v1/items/search?collection_id=coll123&limit=1").json()
+    second = client.get(
+        f"/api/v1/items/search?collection_id=coll123&limit=1&cursor={first['next_cursor']}"
+    ).json()
+
+    assert first["items"][0]["id"] != second["items"][0]["id"]
+    assert second["next_cursor"] is None
+    assert first["complete"] is True
+    assert first["indexed_at"]
+
+
+def test_search_rejects_bad_cursor():
+    response = client.get("/api/v1/items/search?collection_id=coll123&cursor=garbage")
+    assert response.status_code == 400
+
+
+def test_export_streams_ndjson():
+    """Export emits one JSON CMSItem per line."""
+    response = client.get("/api/v1/items/export?collection_id=coll123")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.strip().split("\n")
+    assert len(lines) == 2
+    assert [json.loads(line)["id"] for line in lines] == ["item_001", "item_002"]
+
+
+def test_export_failure_aborts_the_response():
+    """A page failing mid-export must not end the body like a complete export."""
+    async def fail_after_first_page(self, collection_id):
+        yield [{"id": "item_001", "fieldData": {"name": "First"}}]
+        raise RuntimeError("Webflow unavailable")
+
+    with patch("app.services.webflow_client.MockWebflowClient.iter_collection_items", fail_after_first_page):
+        with pytest.raises(RuntimeError, match="Webflow unavailable"):
+            client.get("/api/v1/items/export?collection_id=coll123")
+
+
+def test_export_missing_collection_id():
+    with patch("app.routers.items.get_webflow_collection_id", return_value=None):
+        response = client.get("/api/v1/items/export")
+
+    assert response.status_code == 400
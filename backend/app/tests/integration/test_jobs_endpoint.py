@@ -1,7 +1,10 @@
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from app.main import app
 from app.auth import get_current_user
+from app.dependencies import get_webflow_client
+from app.services.webflow_client import MockWebflowClient
 
 STUB_USER = {"user_id": "test_user", "role": "admin", "email": "test@test.com"}
 
@@ -68,3 +71,310 @@ def test_get_nonexistent_job():
 
     assert response.status_code == 404
     assert "not found" in response.json()["detail"].lower()
+
+
+class RecordingWebflowClient(MockWebflowClient):
+    """Mock client that records update/publish calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.updates = []
+        self.publishes = []
+        self.patches = {}
+
+    async def update_item(self, collection_id, item_id, field_data, publish=True):
+        self.updates.append((item_id, publish))
+        self.patches[item_id] = field_data
+        return await super().update_item(collection_id, item_id, field_data, publish)
+
+    async def publish_items(self, collection_id, item_ids):
+        self.publishes.append(list(item_ids))
+        return await super().publish_items(collection_id, item_ids)
+
+
+def _apply(mode, item_count, batch_size=100, updates=None):
+    recorder = RecordingWebflowClient()
+    app.dependency_overrides[get_webflow_client] = lambda: recorder
+    updates = updates or [
+        {"item_id": f"item{i}", "field_name": "1-after-alt-text", "alt_text": "Alt"}
+        for i in range(item_count)
+    ]
+    with (
+        patch("app.routers.jobs.get_webflow_collection_id", return_value="coll123"),
+        patch("app.routers.jobs.settings.webflow_publish_mode", mode),
+        patch("app.routers.jobs.settings.webflow_publish_batch_size", batch_size),
+    ):
+        response = client.post("/api/v1/apply", json={"updates": updates})
+    return response, recorder
+
+
+def test_apply_batch_mode_stages_then_publishes_in_chunks():
+    response, recorder = _apply("batch", item_count=5, batch_size=2)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success_count"] == 5
+    assert data["published_count"] == 5
+    assert all(publish is False for _, publish in recorder.updates)
+    assert [len(chunk) for chunk in recorder.publishes] == [2, 2, 1]
+
+
+def test_apply_immediate_mode_publishes_each_update():
+    response, recorder = _apply("immediate", item_count=3)
+
+    data = response.json()
+    assert data["published_count"] == 3
+    assert all(publish is True for _, publish in recorder.updates)
+    assert recorder.publishes == []
+
+
+def test_apply_staged_mode_never_publishes():
+    response, recorder = _apply("staged", item_count=3)
+
+    data = response.json()
+    assert data["success_count"] == 3
+    assert data["published_count"] == 0
+    assert recorder.publishes == []
+
+
+def test_apply_image_key_resolves_to_companion_alt_field():
+    response, recorder = _apply("staged", item_count=1, updates=[
+        {"item_id": "item_001", "field_name": "1-after", "alt_text": "Alt"},
+    ])
+
+    assert response.json()["success_count"] == 1
+    assert recorder.patches["item_001"] == {"1-after-alt-text": "Alt"}
+
+
+def test_apply_native_alt_rewrites_the_image_value():
+    """Images without a companion field get ``alt`` set on their current value."""
+    response, recorder = _apply("staged", item_count=1, updates=[
+        {"item_id": "item_001", "field_name": "image", "alt_text": "New alt"},
+    ])
+
+    assert response.json()["success_count"] == 1
+    assert recorder.patches["item_001"] == {
+        "image": {"url": "https://example.com/image1.jpg", "alt": "New alt"},
+    }
+
+
+def test_apply_marks_collection_audit_stale():
+    from app.services.audit import get_collection_auditor
+
+    _apply("staged", item_count=1)
+
+    assert get_collection_auditor().is_stale("coll123")
+
+
+def test_get_proposals_compressed_with_brotli(mock_storage):
+    """Large proposal lists are brotli-compressed when the client accepts it."""
+    job_id = "job-large"
+    mock_storage["jobs"][job_id] = {"job_id": job_id, "status": "completed", "progress": {}}
+    mock_storage["proposals"][job_id] = [
+        {"proposal_id": f"p{i}", "item_id": f"item{i}", "proposed_alt_text": "A renovated kitchen"}
+        for i in range(200)
+    ]
+
+    response = client.get(f"/api/v1/jobs/{job_id}/proposals", headers={"Accept-Encoding": "br"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["total"] == 200
+
+
+def test_job_events_unknown_job_returns_404():
+    response = client.get("/api/v1/jobs/fake-job-id/events")
+    assert response.status_code == 404
+
+
+def test_job_events_for_finished_job_sends_snapshot_and_closes(mock_storage):
+    job_id = "job-done"
+    mock_storage["jobs"][job_id] = {
+        "job_id": job_id,
+        "status": "completed",
+        "progress": {"processed": 1, "total": 1, "percentage": 100.0},
+    }
+
+    response = client.get(f"/api/v1/jobs/{job_id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers
+    assert response.text.startswith("event: status\ndata: ")
+    assert "event: completed\n" in response.text
+
+
+async def test_job_event_stream_relays_published_events(fake_redis, mock_storage):
+    """Events published by the worker are relayed in order until completion."""
+    from app.routers import jobs as jobs_router
+    from app.services.job_events import get_job_events
+
+    job_id = "job-live"
+    mock_storage["jobs"][job_id] = {
+        "job_id": job_id,
+        "status": "processing",
+        "progress": {"processed": 0, "total": 2, "percentage": 0.0},
+    }
+
+    stream = jobs_router._job_event_stream(job_id)
+    first = await anext(stream)
+    assert first.startswith(b"event: status\n")
+
+    events = get_job_events()
+    events.publish(job_id, "progress", {"processed": 1, "total": 2, "percentage": 50.0})
+    events.publish(job_id, "completed", {"status": "completed", "proposal_count": 2})
+
+    frames = [frame async for frame in stream]
+    assert frames == [
+        b'event: progress\ndata: {"processed":1,"total":2,"percentage":50.0}\n\n',
+        b'event: completed\ndata: {"status":"completed","proposal_count":2}\n\n',
+    ]
+    assert fake_redis.subscribers[f"job_events:{job_id}"] == []
+
+
+async def test_job_event_stream_notices_a_finish_whose_event_was_lost(mock_storage):
+    from app.routers import jobs as jobs_router
+
+    job_id = "job-lost-event"
+    mock_storage["jobs"][job_id] = {
+        "job_id": job_id,
+        "status": "processing",
+        "progress": {"processed": 0, "total": 1, "percentage": 0.0},
+    }
+
+    with patch("app.routers.jobs.settings.job_events_heartbeat_seconds", 0.01):
+        stream = jobs_router._job_event_stream(job_id)
+        await anext(stream)
+        mock_storage["jobs"][job_id] = {**mock_storage["jobs"][job_id], "status": "failed", "error_message": "boom"}
+        frames = [frame async for frame in stream]
+
+    assert frames == [b'event: failed\ndata: {"status":"failed","error_message":"boom"}\n\n']
+
+
+async def test_job_event_stream_closes_after_max_duration(mock_storage):
+    from app.routers import jobs as jobs_router
+
+    job_id = "job-stuck"
+    mock_storage["jobs"][job_id] = {
+        "job_id": job_id,
+        "status": "processing",
+        "progress": {"processed": 0, "total": 1, "percentage": 0.0},
+    }
+
+    with (
+        patch("app.routers.jobs.settings.job_events_heartbeat_seconds", 0.01),
+        patch("app.routers.jobs.settings.job_events_max_stream_seconds", 0.05),
+    ):
+        frames = [frame async for frame in jobs_router._job_event_stream(job_id)]
+
+    assert frames[0].startswith(b"event: status\n")
+    assert frames[1:] and set(frames[1:]) == {b": keep-alive\n\n"}
+
+
+def _create_job(item_ids=("item1",)):
+    response = client.post("/api/v1/generate", json={"item_ids": list(item_ids), "collection_id": "coll123"})
+    return response.json()["job_id"]
+
+
+def test_list_jobs_newest_first_with_cursor():
+    job_ids = [_create_job() for _ in range(3)]
+
+    first = client.get("/api/v1/jobs", params={"limit": 2}).json()
+    second = client.get("/api/v1/jobs", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+
+    listed = [j["job_id"] for j in first["jobs"] + second["jobs"]]
+    assert listed == list(reversed(job_ids))
+    assert second["next_cursor"] is None
+    assert first["jobs"][0]["created_by"] == STUB_USER["user_id"]
+
+
+def test_list_jobs_filters_by_status_and_user():
+    _create_job()
+
+    assert len(client.get("/api/v1/jobs", params={"status": "queued"}).json()["jobs"]) == 1
+    assert client.get("/api/v1/jobs", params={"status": "completed"}).json()["jobs"] == []
+    assert client.get("/api/v1/jobs", params={"created_by": "someone_else"}).json()["jobs"] == []
+
+
+def test_list_jobs_batch_ids_lookup():
+    a, b = _create_job(), _create_job()
+
+    response = client.get("/api/v1/jobs", params={"ids": f"{b},missing,{a}"})
+
+    assert response.status_code == 200
+    assert [j["job_id"] for j in response.json()["jobs"]] == [b, a]
+
+
+def test_list_jobs_rejects_bad_cursor():
+    response = client.get("/api/v1/jobs", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+
+def test_job_status_revalidation_returns_304_until_job_changes(mock_storage):
+    job_id = _create_job()
+    first = client.get(f"/api/v1/jobs/{job_id}")
+    etag = first.headers["etag"]
+
+    unchanged = client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    job = mock_storage["jobs"][job_id]
+    job["progress"]["processed"] = 1
+    job["version"] += 1
+    mock_storage["jobs"][job_id] = job
+
+    changed = client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["progress"]["processed"] == 1
+
+
+def test_proposals_revalidation_skips_loading_proposals(mock_storage):
+    from app.routers import jobs as jobs_router
+
+    job_id = "job-etag"
+    mock_storage["jobs"][job_id] = {"job_id": job_id, "status": "completed", "version": 5, "progress": {}}
+    mock_storage["proposals"][job_id] = [{"proposal_id": "p1"}]
+
+    etag = client.get(f"/api/v1/jobs/{job_id}/proposals").headers["etag"]
+    with patch.object(jobs_router.proposals_db, "get", side_effect=AssertionError("loaded proposals")):
+        response = client.get(f"/api/v1/jobs/{job_id}/proposals", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_legacy_job_without_version_gets_body_etag(mock_storage):
+    job_id = "job-legacy"
+    mock_storage["jobs"][job_id] = {
+        "job_id": job_id, "status": "queued", "progress": {"processed": 0, "total": 1, "percentage": 0.0},
+    }
+
+    etag = client.get(f"/api/v1/jobs/{job_id}").headers["etag"]
+
+    assert client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_job_status_reads_job_once_per_request():
+    from app.routers import jobs as jobs_router
+
+    job_id = _create_job()
+    backend = jobs_router.jobs_db.backend
+    with patch.object(backend, "get", wraps=backend.get) as get:
+        client.get(f"/api/v1/jobs/{job_id}")
+        client.get(f"/api/v1/jobs/{job_id}/proposals")
+
+    # One read per request: the identity map is not shared between requests
+    assert get.call_count == 2
+
+
+def test_archived_proposals_are_gone(mock_storage):
+    job_id = "job-archived"
+    mock_storage["jobs"][job_id] = {"job_id": job_id, "status": "completed", "progress": {}}
+    mock_storage["proposals"][job_id] = {"archived_at": "2026-03-31T12:00:00", "archive": "file", "total": 3}
+
+    response = client.get(f"/api/v1/jobs/{job_id}/proposals")
+
+    assert response.status_code == 410
+    assert "2026-03-31" in response.json()["detail"]
@@ -0,0 +1,99 @@
+import io
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.auth import create_thumbnail_token, get_current_user, get_thumbnail_user
+from app.main import app
+from app.services.thumbnails import ThumbnailDiskCache, ThumbnailService, get_thumbnail_service
+
+FILE_ID = "65a1b2c3d4e5f60718293a4b"
+SOURCE_URL = f"https://cdn.prod.website-files.com/site/{FILE_ID}_kitchen.jpg"
+
+STUB_USER = {"user_id": "test_user", "role": "user", "email": "test@test.com"}
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def override_auth():
+    app.dependency_overrides[get_thumbnail_user] = lambda: STUB_USER
+    yield
+    app.dependency_overrides.pop(get_thumbnail_user, None)
+
+
+@pytest.fixture(autouse=True)
+def thumbnail_service(tmp_path):
+    def handler(request):
+        out = io.BytesIO()
+        Image.new("RGB", (1200, 800), (10, 20, 30)).save(out, format="JPEG")
+        return httpx.Response(200, content=out.getvalue())
+
+    service = ThumbnailService(
+        cache=ThumbnailDiskCache(str(tmp_path), 10_000_000),
+        widths=[160, 320, 640],
+        allowed_hosts=["cdn.prod.website-files.com"],
+        max_source_bytes=5_000_000,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    app.dependency_overrides[get_thumbnail_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_thumbnail_service, None)
+
+
+def test_thumbnail_requires_a_session_or_token():
+    app.dependency_overrides.pop(get_thumbnail_user, None)
+
+    response = client.get(f"/api/v1/thumbnails/{FILE_ID}", params={"w": 160, "src": SOURCE_URL})
+    forged = client.get(f"/api/v1/thumbnails/{FILE_ID}", params={"w": 160, "src": SOURCE_URL, "t": "forged"})
+
+    assert response.status_code == 401
+    assert forged.status_code == 401
+
+
+def test_thumbnail_served_with_token():
+    app.dependency_overrides.pop(get_thumbnail_user, None)
+    app.dependency_overrides[get_current_user] = lambda: STUB_USER
+    try:
+        token = client.get("/api/v1/auth/thumbnail-token").json()["token"]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    response = client.get(f"/api/v1/thumbnails/{FILE_ID}", params={"w": 160, "src": SOURCE_URL, "t": token})
+
+    assert response.status_code == 200
+    assert token == create_thumbnail_token("test_user")[0]  # stable within its window
+
+
+def test_thumbnail_served_with_private_cache_headers():
+    response = client.get(
+        f"/api/v1/thumbnails/{FILE_ID}",
+        params={"w": 320, "src": SOURCE_URL},
+        headers={"Accept-Encoding": "br, gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["cache-control"] == "private, max-age=31536000"
+    assert "content-encoding" not in response.headers  # images are not recompressed
+    assert Image.open(io.BytesIO(response.content)).width == 320
+
+
+def test_thumbnail_revalidation_returns_304():
+    params = {"w": 160, "src": SOURCE_URL}
+    etag = client.get(f"/api/v1/thumbnails/{FILE_ID}", params=params).headers["etag"]
+
+    response = client.get(f"/api/v1/thumbnails/{FILE_ID}", params=params, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_thumbnail_rejects_disallowed_host():
+    response = client.get(
+        f"/api/v1/thumbnails/{FILE_ID}",
+        params={"w": 160, "src": f"https://example.com/{FILE_ID}.jpg"},
+    )
+
+    assert response.status_code == 400
@@ -21,3 +21,11 @@ def test_root_endpoint():
     data = response.json()
     assert "message" in data
     assert "docs" in data
+
+
+def test_lifespan_manages_shared_webflow_pool():
+    """The lifespan handler creates the shared Webflow client pool."""
+    from app.services.webflow_client import WebflowClientPool
+
+    with TestClient(app):
+        assert isinstance(app.state.webflow_clients, WebflowClientPool)
@@ -0,0 +1,201 @@
+"""Tests for the async storage used by request handlers and its identity map."""
+import threading
+
+import pytest
+from fastapi import HTTPException
+from unittest.mock import patch
+
+from app.async_storage import (
+    AsyncRedisStorage,
+    IdentityMappedStorage,
+    ThreadedStorage,
+    _async_view,
+    identity_map_scope,
+)
+from app.storage import RedisStorage
+from app.tests.conftest import AsyncFakeRedis, AsyncInMemoryStorage, InMemoryStorage
+
+
+@pytest.fixture
+def redis(fake_redis):
+    with (
+        patch("app.async_storage.async_redis_client", AsyncFakeRedis(fake_redis)),
+        patch("app.async_storage.async_redis_binary_client", AsyncFakeRedis(fake_redis)),
+        patch("app.storage.redis_client", fake_redis),
+        patch("app.storage.redis_binary_client", fake_redis),
+    ):
+        yield fake_redis
+
+
+async def test_round_trip(redis):
+    jobs = AsyncRedisStorage("job")
+    await jobs.set("j1", {"status": "queued"})
+
+    assert await jobs.get("j1") == {"status": "queued"}
+    assert await jobs.exists("j1")
+    assert await jobs.get_many(["j1", "missing"]) == {"j1": {"status": "queued"}}
+
+    await jobs.delete("j1")
+    assert await jobs.get("j1") is None
+
+
+async def test_set_many(redis):
+    jobs = AsyncRedisStorage("job", track_members=True)
+    await jobs.set_many({"a": {"n": 1}, "b": {"n": 2}})
+
+    assert RedisStorage("job").get_many(["a", "b"]) == {"a": {"n": 1}, "b": {"n": 2}}
+    assert redis.smembers("idx:members:job") == {"a", "b"}
+
+
+async def test_shares_data_with_sync_storage(redis):
+    RedisStorage("job").set("from-worker", {"status": "completed"})
+
+    assert await AsyncRedisStorage("job").get("from-worker") == {"status": "completed"}
+
+
+async def test_iter_all_in_batches(redis):
+    jobs = AsyncRedisStorage("job", scan_count=2)
+    for i in range(5):
+        await jobs.set(f"k{i}", {"n": i})
+    redis.set("job_events:x", "not a job")
+
+    with patch.object(redis, "mget", wraps=redis.mget) as mget:
+        values = [value async for value in jobs.iter_all()]
+
+    assert sorted(v["n"] for v in values) == [0, 1, 2, 3, 4]
+    assert [len(call.args[0]) for call in mget.call_args_list] == [2, 2, 1]
+
+
+async def test_member_set_matches_sync_storage(redis):
+    jobs = AsyncRedisStorage("job", track_members=True)
+    await jobs.set("a", {"n": 1})
+    await jobs.set("b", {"n": 2})
+    await jobs.delete("a")
+
+    assert redis.smembers("idx:members:job") == {"b"}
+    assert [v["n"] for v in RedisStorage("job", track_members=True).list_all()] == [2]
+
+
+async def test_unique_index(redis):
+    users = AsyncRedisStorage("users")
+
+    assert await users.claim_unique("email", "ann@example.com", "user_1")
+    assert not await users.claim_unique("email", "ann@example.com", "user_2")
+    assert RedisStorage("users").lookup_unique("email", "ann@example.com") == "user_1"
+
+    await users.release_unique("email", "ann@example.com", "user_1")
+    assert await users.lookup_unique("email", "ann@example.com") is None
+
+
+async def test_threaded_storage_runs_off_the_event_loop():
+    seen = []
+
+    class RecordingStorage(InMemoryStorage):
+        def get(self, key):
+            seen.append(threading.current_thread())
+            return super().get(key)
+
+    storage = ThreadedStorage(RecordingStorage())
+    await storage.set("k", {"n": 1})
+
+    assert await storage.get("k") == {"n": 1}
+    assert seen and seen[0] is not threading.main_thread()
+    assert [value async for value in storage.iter_all()] == [{"n": 1}]
+
+
+def test_async_view_picks_backend():
+    view = _async_view(RedisStorage("users", track_members=True, scan_count=50))
+    assert isinstance(view, AsyncRedisStorage)
+    assert (view.prefix, view.track_members, view.scan_count) == ("users", True, 50)
+
+    assert isinstance(_async_view(InMemoryStorage()), ThreadedStorage)
+
+
+# --- Identity map ---
+
+@pytest.fixture
+def mapped():
+    backend = AsyncInMemoryStorage(InMemoryStorage())
+    return IdentityMappedStorage(backend), backend
+
+
+async def test_identity_map_reads_each_key_once(mapped):
+    store, backend = mapped
+    await backend.set("j1", {"n": 1})
+
+    with identity_map_scope(), patch.object(backend, "get", wraps=backend.get) as get:
+        assert await store.exists("j1")
+        first = await store.get("j1")
+        second = await store.get_or_404("j1")
+        assert not await store.exists("missing")
+        assert await store.get("missing") is None
+
+    assert first is second
+    assert get.call_count == 2
+
+
+async def test_identity_map_get_many_fetches_only_unmapped_keys(mapped):
+    store, backend = mapped
+    for key in ("a", "b"):
+        await backend.set(key, {"key": key})
+
+    with identity_map_scope(), patch.object(backend, "get_many", wraps=backend.get_many) as get_many:
+        await store.get("a")
+        assert await store.get_many(["a", "b", "c"]) == {"a": {"key": "a"}, "b": {"key": "b"}}
+        assert await store.get("c") is None
+
+    get_many.assert_called_once_with(["b", "c"])
+
+
+async def test_identity_map_writes_through(mapped):
+    store, backend = mapped
+    with identity_map_scope():
+        await store.set("j1", {"n": 1})
+        assert await backend.get("j1") == {"n": 1}
+        assert await store.get("j1") == {"n": 1}
+
+        await store.delete("j1")
+        assert await store.get("j1") is None
+        assert not await backend.exists("j1")
+
+        await store.set_many({"j1": {"n": 2}, "j2": {"n": 3}})
+        with patch.object(backend, "get_many", side_effect=AssertionError("backend read")):
+            assert await store.get_many(["j1", "j2"]) == {"j1": {"n": 2}, "j2": {"n": 3}}
+
+
+async def test_refresh_rereads_backend(mapped):
+    store, backend = mapped
+    await backend.set("j1", {"n": 1})
+    with identity_map_scope():
+        await store.get("j1")
+        await backend.set("j1", {"n": 2})
+        assert (await store.get("j1"))["n"] == 1
+        assert (await store.refresh("j1"))["n"] == 2
+        assert (await store.get("j1"))["n"] == 2
+
+
+async def test_without_scope_every_call_reads_backend(mapped):
+    store, backend = mapped
+    await backend.set("j1", {"n": 1})
+    with patch.object(backend, "get", wraps=backend.get) as get:
+        await store.get("j1")
+        await store.get("j1")
+    assert get.call_count == 2
+
+
+async def test_scopes_do_not_share_entries(mapped):
+    store, backend = mapped
+    await backend.set("j1", {"n": 1})
+    with identity_map_scope():
+        await store.get("j1")
+    await backend.set("j1", {"n": 2})
+    with identity_map_scope():
+        assert (await store.get("j1"))["n"] == 2
+
+
+async def test_get_or_404_raises_http_404(mapped):
+    store, _ = mapped
+    with pytest.raises(HTTPException) as exc:
+        await store.get_or_404("missing", "Job not found")
+    assert exc.value.status_code == 404
+    assert exc.value.detail == "Job not found"
@@ -0,0 +1,128 @@
+"""Tests for the incremental collection alt-text audit."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.audit import CollectionAuditor
+from app.services.webflow_client import MockWebflowClient
+
+
+def _item(item_id, alts, updated="2025-01-01T00:00:00Z", name=None):
+    field_data = {"name": name or f"Project {item_id}"}
+    for i, alt in enumerate(alts, start=1):
+        field_data[f"{i}-after"] = {"url": f"https://example.com/{item_id}-{i}.jpg"}
+        field_data[f"{i}-after-alt-text"] = alt
+    return {"id": item_id, "lastUpdated": updated, "fieldData": field_data}
+
+
+class CollectionClient(MockWebflowClient):
+    """Serves a mutable list of items in pages of two."""
+
+    def __init__(self, items):
+        super().__init__()
+        self.items = items
+
+    async def iter_collection_items(self, collection_id, limit=100):
+        for start in range(0, len(self.items), 2):
+            yield self.items[start:start + 2]
+
+
+@pytest.fixture
+def auditor(fake_redis):
+    return CollectionAuditor(fake_redis)
+
+
+async def test_report_covers_coverage_histogram_and_duplicates(auditor):
+    client = CollectionClient([
+        _item("a", ["Modern kitchen", None]),
+        _item("b", ["Modern kitchen", "x" * 130]),
+        _item("c", ["  Modern kitchen  ", "Bathroom with walk-in shower"], updated="2025-02-01T00:00:00Z"),
+    ])
+
+    report = await auditor.run(client, "coll")
+
+    assert report["items"] == 3
+    assert report["images"] == 6
+    assert report["with_alt"] == 5
+    assert report["missing_alt"] == 1
+    assert report["over_limit"] == 1
+    assert report["coverage_percentage"] == 83.33
+    assert report["length_histogram"] == {
+        "missing": 1, "1-25": 3, "26-50": 1, "51-100": 0, "101-125": 0, "126+": 1,
+    }
+    assert report["duplicate_group_count"] == 1
+    group = report["duplicate_groups"][0]
+    assert group["alt_text"] == "Modern kitchen"
+    assert [ref["item_id"] for ref in group["images"]] == ["a", "b", "c"]
+    assert auditor.get_report("coll") == report
+
+
+async def test_rerun_only_recomputes_changed_items(auditor):
+    items = [_item("a", ["Kitchen"]), _item("b", [None]), _item("c", ["Porch"])]
+    client = CollectionClient(items)
+    await auditor.run(client, "coll")
+
+    items[1] = _item("b", ["Living room"], updated="2025-03-01T00:00:00Z")
+    del items[2]
+    report = await auditor.run(client, "coll")
+
+    assert report["items_recomputed"] == 1
+    assert report["items_removed"] == 1
+    assert report["items"] == 2
+    assert report["missing_alt"] == 0
+
+
+async def test_unchanged_items_use_stored_contribution(auditor, fake_redis):
+    client = CollectionClient([_item("a", ["Kitchen"])])
+    await auditor.run(client, "coll")
+
+    # Same lastUpdated: the stored contribution wins over the (unseen) new data
+    client.items = [_item("a", [None])]
+    report = await auditor.run(client, "coll")
+
+    assert report["items_recomputed"] == 0
+    assert report["with_alt"] == 1
+
+
+async def test_run_clears_stale_flag(auditor):
+    auditor.mark_stale("coll")
+    assert auditor.is_stale("coll")
+
+    await auditor.run(CollectionClient([]), "coll")
+
+    assert not auditor.is_stale("coll")
+
+
+def test_report_past_max_age_is_stale(fake_redis):
+    auditor = CollectionAuditor(fake_redis, report_max_age_seconds=3600)
+    fresh = {"generated_at": datetime.now(timezone.utc).isoformat()}
+    old = {"generated_at": (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()}
+
+    assert not auditor.is_stale("coll", fresh)
+    assert auditor.is_stale("coll", old)
+
+
+def test_retry_cooldown_follows_failed_at(fake_redis):
+    auditor = CollectionAuditor(fake_redis, retry_cooldown_seconds=300)
+    recent = {"error": "boom", "failed_at": datetime.now(timezone.utc).isoformat()}
+    old = {"error": "boom", "failed_at": (datetime.now(timezone.utc) - timedelta(minutes=10)).isoformat()}
+
+    assert auditor.in_cooldown(recent)
+    assert not auditor.in_cooldown(old)
+    assert not auditor.in_cooldown(None)
+
+
+async def test_successful_run_clears_last_error(auditor):
+    auditor.record_error("coll", "boom")
+    assert auditor.get_error("coll")["error"] == "boom"
+
+    await auditor.run(CollectionClient([]), "coll")
+
+    assert auditor.get_error("coll") is None
+
+
+def test_only_one_run_lock_per_collection(auditor):
+    assert auditor.try_acquire("coll")
+    assert not auditor.try_acquire("coll")
+    auditor.release("coll")
+    assert auditor.try_acquire("coll")
@@ -1,6 +1,16 @@
+import time
+
 import pytest
-from unittest.mock import patch, MagicMock
-from app.auth import hash_password, verify_password, create_session, get_session, delete_session
+from unittest.mock import AsyncMock, patch, MagicMock
+from app.auth import (
+    hash_password,
+    verify_password,
+    create_session,
+    get_session,
+    delete_session,
+    create_thumbnail_token,
+    verify_thumbnail_token,
+)
 
 
 class TestPasswordHashing:
@@ -31,16 +41,16 @@ class TestPasswordHashing:
 class TestSessionManagement:
     @pytest.fixture(autouse=True)
     def setup_mock_redis(self):
-        """Mock redis_client for session tests."""
+        """Mock async_redis_client for session tests."""
         self.redis_data = {}
 
-        def mock_setex(key, ttl, value):
+        async def mock_setex(key, ttl, value):
             self.redis_data[key] = value
 
-        def mock_get(key):
+        async def mock_get(key):
             return self.redis_data.get(key)
 
-        def mock_delete(key):
+        async def mock_delete(key):
             self.redis_data.pop(key, None)
 
         mock = MagicMock()
@@ -48,30 +58,47 @@ class TestSessionManagement:
         mock.get = mock_get
         mock.delete = mock_delete
 
-        with patch("app.auth.redis_client", mock):
+        with patch("app.auth.async_redis_client", mock):
             yield
 
-    def test_create_and_get_session(self):
-        signed = create_session("user_123", "admin", "test@example.com")
+    async def test_create_and_get_session(self):
+        signed = await create_session("user_123", "admin", "test@example.com")
         assert isinstance(signed, str)
 
-        session = get_session(signed)
+        session = await get_session(signed)
         assert session is not None
         assert session["user_id"] == "user_123"
         assert session["role"] == "admin"
         assert session["email"] == "test@example.com"
 
-    def test_get_session_invalid_token(self):
-        session = get_session("invalid-token")
+    async def test_get_session_invalid_token(self):
+        session = await get_session("invalid-token")
         assert session is None
 
-    def test_delete_session(self):
-        signed = create_session("user_123", "admin", "test@example.com")
-        assert get_session(signed) is not None
+    async def test_delete_session(self):
+        signed = await create_session("user_123", "admin", "test@example.com")
+        assert await get_session(signed) is not None
 
-        delete_session(signed)
-        assert get_session(signed) is None
+        await delete_session(signed)
+        assert await get_session(signed) is None
 
-    def test_delete_session_invalid_token(self):
+    async def test_delete_session_invalid_token(self):
         # Should not raise
-        delete_session("invalid-token")
+        await delete_session("invalid-token")
+
+
+class TestThumbnailTokens:
+    def test_round_trip(self):
+        token, expires_at = create_thumbnail_token("user_123")
+        assert verify_thumbnail_token(token) == "user_123"
+        assert expires_at > time.time()
+
+    def test_expired_token_rejected(self):
+        with patch("app.auth.time.time", return_value=time.time() - 3 * 86400):
+            token, _ = create_thumbnail_token("user_123")
+        assert verify_thumbnail_token(token) is None
+
+    async def test_session_token_is_not_a_thumbnail_token(self):
+        with patch("app.auth.async_redis_client", MagicMock(setex=AsyncMock())):
+            signed = await create_session("user_123", "admin", "test@example.com")
+        assert verify_thumbnail_token(signed) is None
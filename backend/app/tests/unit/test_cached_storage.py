@@ -0,0 +1,207 @@
+"""Tests for the in-process storage cache (LRU, TTL, pub/sub invalidation, metrics)."""
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+import redis
+
+from app.async_storage import AsyncRedisStorage, _async_view
+from app.cached_storage import (
+    INVALIDATION_CHANNEL,
+    AsyncCachedStorage,
+    CachedStorage,
+    StorageCache,
+    uncached,
+)
+from app.storage import RedisStorage
+from app.tests.conftest import AsyncFakeRedis, AsyncInMemoryStorage, InMemoryStorage
+
+
+@pytest.fixture
+def cache(fake_redis):
+    cache = StorageCache(fake_redis, max_entries=3)
+    cache._set_listening(True)
+    return cache
+
+
+@pytest.fixture
+def backend():
+    backend = InMemoryStorage()
+    backend.set("invite_code", {"code": "abc"})
+    return backend
+
+
+def test_reads_hit_the_backend_once(cache, backend):
+    store = CachedStorage(backend, "settings", 60, cache)
+
+    with patch.object(backend, "get", wraps=backend.get) as get:
+        assert store.get("invite_code") == {"code": "abc"}
+        assert store.get("invite_code") == {"code": "abc"}
+        assert store.get("missing") is None
+        assert store.get("missing") is None
+        assert "invite_code" in store
+
+    assert get.call_count == 2
+    assert cache.stats()["stores"]["settings"] == {
+        "hits": 3, "misses": 2, "evictions": 0, "invalidations": 0, "hit_ratio": 0.6,
+    }
+
+
+def test_callers_get_their_own_copy(cache, backend):
+    store = CachedStorage(backend, "settings", 60, cache)
+    store.get("invite_code")["code"] = "mutated"
+
+    assert store.get("invite_code") == {"code": "abc"}
+
+
+def test_nothing_is_cached_until_subscribed(fake_redis, backend):
+    store = CachedStorage(backend, "settings", 60, StorageCache(fake_redis))
+
+    with patch.object(backend, "get", wraps=backend.get) as get:
+        store.get("invite_code")
+        store.get("invite_code")
+
+    assert get.call_count == 2
+
+
+def test_write_invalidates_and_publishes(cache, backend, fake_redis):
+    store = CachedStorage(backend, "settings", 60, cache)
+    store.get("invite_code")
+
+    store.set("invite_code", {"code": "new"})
+
+    assert store.get("invite_code") == {"code": "new"}
+    channel, message = fake_redis.published[-1]
+    assert channel == INVALIDATION_CHANNEL
+    assert orjson.loads(message) == {"origin": cache.origin, "store": "settings", "keys": ["invite_code"]}
+
+
+def test_set_many_publishes_one_invalidation(cache, backend, fake_redis):
+    store = CachedStorage(backend, "users", 60, cache)
+    store.get("a")
+
+    store.set_many({"a": {"n": 1}, "b": {"n": 2}})
+
+    assert store.get("a") == {"n": 1}
+    assert [orjson.loads(message)["keys"] for _, message in fake_redis.published] == [["a", "b"]]
+
+
+def test_invalidation_from_another_process(cache, backend):
+    store = CachedStorage(backend, "settings", 60, cache)
+    store.get("invite_code")
+    backend.set("invite_code", {"code": "changed elsewhere"})
+
+    cache.handle_message(orjson.dumps({"origin": cache.origin, "store": "settings", "keys": ["invite_code"]}))
+    assert store.get("invite_code") == {"code": "abc"}
+
+    cache.handle_message(orjson.dumps({"origin": "other", "store": "settings", "keys": ["invite_code"]}))
+    cache.handle_message(b"not json")
+    assert store.get("invite_code") == {"code": "changed elsewhere"}
+
+
+def test_single_key_invalidation_from_older_process(cache, backend):
+    store = CachedStorage(backend, "settings", 60, cache)
+    store.get("invite_code")
+    backend.set("invite_code", {"code": "changed elsewhere"})
+
+    cache.handle_message(orjson.dumps({"origin": "other", "store": "settings", "key": "invite_code"}))
+
+    assert store.get("invite_code") == {"code": "changed elsewhere"}
+
+
+def test_entries_expire_after_ttl(cache, backend):
+    store = CachedStorage(backend, "settings", 60, cache)
+    with patch("app.cached_storage.time.monotonic", return_value=1000.0):
+        store.get("invite_code")
+    backend.set("invite_code", {"code": "unannounced"})
+
+    with patch("app.cached_storage.time.monotonic", return_value=1059.0):
+        assert store.get("invite_code") == {"code": "abc"}
+    with patch("app.cached_storage.time.monotonic", return_value=1061.0):
+        assert store.get("invite_code") == {"code": "unannounced"}
+
+
+def test_least_recently_used_entry_is_evicted(cache, backend):
+    store = CachedStorage(backend, "users", 60, cache)
+    for key in ("a", "b", "c"):
+        store.get(key)
+    store.get("a")
+    store.get("d")
+
+    with patch.object(backend, "get", wraps=backend.get) as get:
+        store.get("a")
+        store.get("b")
+
+    assert [call.args[0] for call in get.call_args_list] == ["b"]
+    assert cache.stats()["stores"]["users"]["evictions"] == 2
+
+
+def test_read_racing_a_write_is_not_cached(cache, backend):
+    store = CachedStorage(backend, "settings", 60, cache)
+
+    def read_then_write_lands(key):
+        value = InMemoryStorage.get(backend, key)
+        cache.invalidate("settings", key)
+        return value
+
+    with patch.object(backend, "get", side_effect=read_then_write_lands):
+        store.get("invite_code")
+    assert cache.stats()["entries"] == 0
+
+
+def test_listener_invalidates_and_stops_caching_on_error(cache):
+    pubsub = MagicMock()
+    messages = [
+        None,
+        {"data": orjson.dumps({"origin": "other", "store": "settings", "keys": ["invite_code"]})},
+        redis.ConnectionError("gone"),
+    ]
+
+    def get_message(timeout):
+        message = messages.pop(0)
+        if message is None:
+            # Subscribed: cache something for the next message to invalidate
+            cache.put("settings", "invite_code", {"code": "abc"}, 60, cache.generation)
+        if isinstance(message, Exception):
+            cache._stop.set()
+            raise message
+        return message
+
+    pubsub.get_message.side_effect = get_message
+    cache._redis = MagicMock()
+    cache._redis.pubsub.return_value = pubsub
+
+    cache._listen()
+
+    pubsub.subscribe.assert_called_once_with(INVALIDATION_CHANNEL)
+    assert cache.stats()["stores"]["settings"]["invalidations"] == 1
+    assert not cache.listening
+    pubsub.close.assert_called_once()
+
+
+async def test_async_wrapper_shares_the_cache(cache, backend, fake_redis):
+    sync_store = CachedStorage(backend, "settings", 60, cache)
+    async_store = AsyncCachedStorage(AsyncInMemoryStorage(backend), "settings", 60, cache, AsyncFakeRedis(fake_redis))
+    backend.set("other", {"n": 1})
+
+    assert await async_store.get_many(["invite_code", "other", "missing"]) == {
+        "invite_code": {"code": "abc"}, "other": {"n": 1},
+    }
+    with patch.object(backend, "get", side_effect=AssertionError("backend read")):
+        assert sync_store.get("other") == {"n": 1}
+        assert sync_store.get("missing") is None
+
+    await async_store.set("other", {"n": 2})
+    assert sync_store.get("other") == {"n": 2}
+    assert fake_redis.published[-1][0] == INVALIDATION_CHANNEL
+
+
+def test_async_view_keeps_the_cache():
+    cached = CachedStorage(RedisStorage("users"), "users", 60, StorageCache(MagicMock()))
+
+    view = _async_view(cached)
+
+    assert isinstance(view, AsyncCachedStorage)
+    assert isinstance(view.backend, AsyncRedisStorage)
+    assert view.cache is cached.cache
+    assert uncached(cached) is cached.backend
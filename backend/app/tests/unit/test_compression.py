@@ -0,0 +1,107 @@
+"""Tests for the brotli/gzip response compression middleware."""
+
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import CompressionMiddleware, negotiate_encoding
+
+LARGE_BODY = "alt text " * 500
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(LARGE_BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(["line\n"] * 300), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter(["data: 1\n\n"] * 300), media_type="text/event-stream")
+
+    return app
+
+
+@pytest.fixture
+def client():
+    return TestClient(_build_app())
+
+
+def _raw_get(client, path, accept_encoding):
+    """GET without httpx decoding the body, so the wire bytes can be checked."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_prefers_brotli_when_accepted(client):
+    response, body = _raw_get(client, "/large", "gzip, deflate, br")
+    assert response.headers["content-encoding"] == "br"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(body)
+    assert brotli.decompress(body).decode() == LARGE_BODY
+
+
+def test_falls_back_to_gzip(client):
+    response, body = _raw_get(client, "/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body).decode() == LARGE_BODY
+
+
+def test_identity_when_no_supported_encoding(client):
+    response, body = _raw_get(client, "/large", "identity")
+    assert "content-encoding" not in response.headers
+    assert body.decode() == LARGE_BODY
+
+
+def test_q_zero_refuses_an_encoding(client):
+    response, body = _raw_get(client, "/large", "br;q=0, gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body).decode() == LARGE_BODY
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("gzip;q=0.5, br;q=0.8", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br, gzip", "br"),
+    ("*", "br"),
+    ("*;q=0.5, gzip;q=0", "br"),
+    ("gzip;q=0, br;q=0", None),
+    ("brotli, xgzip", None),
+    ("GZIP;Q=0.3", "gzip"),
+    ("gzip;q=bogus", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, ("br", "gzip")) == expected
+
+
+def test_small_bodies_are_not_compressed(client):
+    response, body = _raw_get(client, "/small", "br")
+    assert "content-encoding" not in response.headers
+    assert body == b"ok"
+
+
+def test_streaming_body_is_compressed_incrementally(client):
+    response, body = _raw_get(client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body).decode() == "line\n" * 300
+
+
+def test_event_stream_is_never_compressed(client):
+    response, body = _raw_get(client, "/events", "br, gzip")
+    assert "content-encoding" not in response.headers
+    assert body.decode() == "data: 1\n\n" * 300
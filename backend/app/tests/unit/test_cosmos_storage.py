@@ -1,8 +1,20 @@
-"""Tests for CosmosStorage dict-like interface with mocked Cosmos client."""
+"""Tests for CosmosStorage (mocked Cosmos client) and AsyncCosmosStorage (in-process fake)."""
+import asyncio
+import time
+from datetime import datetime
+
 import pytest
-from unittest.mock import MagicMock
-from azure.cosmos.exceptions import CosmosResourceNotFoundError
-from app.cosmos_storage import CosmosStorage
+from unittest.mock import MagicMock, patch
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosResourceExistsError,
+    CosmosResourceNotFoundError,
+)
+from app import async_storage
+from app.cosmos_storage import AsyncCosmosStorage, CosmosStorage
+from app.storage import StorageCodec
+from app.tests.conftest import FakeCosmosClient
 
 
 @pytest.fixture
@@ -52,6 +64,14 @@ def test_set_calls_upsert(cosmos_storage):
     assert doc["data"] == {"status": "processing"}
 
 
+def test_set_many_upserts_each_document(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    storage.set_many({"job1": {"n": 1}, "job2": {"n": 2}, "job3": {"n": 3}})
+
+    upserted = sorted(call.args[0]["id"] for call in mock_container.upsert_item.call_args_list)
+    assert upserted == ["job1", "job2", "job3"]
+
+
 def test_contains_true(cosmos_storage):
     storage, mock_container = cosmos_storage
     mock_container.read_item.return_value = {"id": "job1", "data": {}}
@@ -99,3 +119,214 @@ def test_delete_missing_no_error(cosmos_storage):
     storage, mock_container = cosmos_storage
     mock_container.delete_item.side_effect = CosmosResourceNotFoundError()
     storage.delete("missing")  # Should not raise
+
+
+def test_iter_all_pages_data_payloads(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    mock_container.query_items.return_value = iter([{"data": {"n": 1}}, {"data": None}, {"data": {"n": 2}}])
+    assert list(storage.iter_all(batch_size=50)) == [{"n": 1}, {"n": 2}]
+    assert mock_container.query_items.call_args.kwargs["max_item_count"] == 50
+
+
+def test_claim_unique_creates_index_document(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    assert storage.claim_unique("email", "ann@example.com", "user_1")
+    doc = mock_container.create_item.call_args[0][0]
+    assert doc["id"].startswith("idx:email:")
+    assert doc["job_id"] == doc["id"]
+    assert doc["target"] == "user_1"
+    assert "data" not in doc
+
+
+def test_claim_unique_taken_by_other_key(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    mock_container.create_item.side_effect = CosmosResourceExistsError()
+    mock_container.read_item.return_value = {"target": "user_2"}
+    assert not storage.claim_unique("email", "ann@example.com", "user_1")
+
+
+def test_release_unique_deletes_only_the_read_revision(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    mock_container.read_item.return_value = {"target": "user_1", "claimed_at": 0, "_etag": "etag-1"}
+
+    assert storage.release_unique("email", "ann@example.com", "user_1", min_age_seconds=60)
+    kwargs = mock_container.delete_item.call_args.kwargs
+    assert kwargs["etag"] == "etag-1"
+    assert kwargs["match_condition"] == MatchConditions.IfNotModified
+
+    mock_container.delete_item.side_effect = CosmosAccessConditionFailedError()
+    assert not storage.release_unique("email", "ann@example.com", "user_1")
+
+
+def test_release_unique_keeps_recent_claim(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    mock_container.read_item.return_value = {"target": "user_1", "claimed_at": time.time(), "_etag": "etag-1"}
+
+    assert not storage.release_unique("email", "ann@example.com", "user_1", min_age_seconds=60)
+    mock_container.delete_item.assert_not_called()
+
+
+def test_lookup_unique_missing(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    mock_container.read_item.side_effect = CosmosResourceNotFoundError()
+    assert storage.lookup_unique("email", "nobody@example.com") is None
+
+
+def test_set_default_ttl_keeps_container_settings(cosmos_storage):
+    storage, mock_container = cosmos_storage
+    definition = {
+        "id": "test-container",
+        "partitionKey": {"paths": ["/job_id"], "kind": "Hash"},
+        "indexingPolicy": {"indexingMode": "consistent", "excludedPaths": [{"path": "/data/*"}]},
+        "uniqueKeyPolicy": {"uniqueKeys": [{"paths": ["/email"]}]},
+        "conflictResolutionPolicy": {"mode": "LastWriterWins", "conflictResolutionPath": "/_ts"},
+    }
+    mock_container.read.return_value = {**definition, "defaultTtl": 600, "_rid": "abc", "_etag": '"1"'}
+    mock_container.container_link = "dbs/test-db/colls/test-container"
+
+    assert storage.default_ttl() == 600
+    storage.set_default_ttl(86400)
+
+    replace = storage._database.client_connection.ReplaceContainer
+    replace.assert_called_once_with("dbs/test-db/colls/test-container", {**definition, "defaultTtl": 86400})
+
+    storage.set_default_ttl(None)
+    assert replace.call_args.args[1] == definition
+
+
+# --- AsyncCosmosStorage against the in-process fake ---
+
+@pytest.fixture
+def cosmos_client():
+    return FakeCosmosClient()
+
+
+@pytest.fixture
+def async_users(cosmos_client):
+    storage = AsyncCosmosStorage("test-db", "users", partition_key_field="user_id")
+    storage.open(cosmos_client)
+    return storage
+
+
+async def test_async_round_trip(async_users, cosmos_client):
+    await async_users.set("user_1", {"email": "ann@example.com", "at": datetime(2026, 1, 1)})
+
+    assert await async_users.get("user_1") == {"email": "ann@example.com", "at": "2026-01-01 00:00:00"}
+    assert await async_users.exists("user_1")
+    assert cosmos_client.containers["users"].items["user_1"]["user_id"] == "user_1"
+
+    await async_users.delete("user_1")
+    await async_users.delete("user_1")  # missing is not an error
+    assert await async_users.get("user_1") is None
+    assert not await async_users.exists("user_1")
+
+
+async def test_large_values_stored_compressed(cosmos_client):
+    proposals = AsyncCosmosStorage("test-db", "proposals", codec=StorageCodec("msgpack", compression_min_bytes=512))
+    proposals.open(cosmos_client)
+    big = [{"proposal_id": f"p{i}", "proposed_alt_text": "A renovated kitchen"} for i in range(100)]
+
+    await proposals.set("big", big)
+    await proposals.set("small", [{"proposal_id": "p0"}])
+
+    items = cosmos_client.containers["proposals"].items
+    assert "data" not in items["big"] and items["big"]["blob"]
+    assert items["small"]["data"] == [{"proposal_id": "p0"}]
+    assert await proposals.get("big") == big
+    assert (await proposals.get_many(["big", "small"]))["big"] == big
+    assert len(await proposals.list_all()) == 2
+
+
+async def test_async_set_many(async_users):
+    await async_users.set_many({"a": {"n": 1}, "b": {"n": 2}})
+
+    assert await async_users.get_many(["a", "b"]) == {"a": {"n": 1}, "b": {"n": 2}}
+
+
+async def test_async_set_many_bounds_concurrent_upserts(async_users):
+    container = async_users._container
+    upsert = container.upsert_item
+    in_flight = peak = 0
+
+    async def tracked_upsert(body):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return await upsert(body)
+
+    with patch.object(container, "upsert_item", tracked_upsert), \
+            patch("app.cosmos_storage._ASYNC_BULK_CONCURRENCY", 3):
+        await async_users.set_many({f"u{i}": {"n": i} for i in range(10)})
+
+    assert peak == 3
+    assert len(await async_users.list_all()) == 10
+
+
+async def test_async_get_many(async_users):
+    await async_users.set("a", {"n": 1})
+    await async_users.set("b", {"n": 2})
+
+    assert await async_users.get_many(["a", "b", "missing"]) == {"a": {"n": 1}, "b": {"n": 2}}
+    assert await async_users.get_many([]) == {}
+
+
+async def test_async_unique_index_hidden_from_listing(async_users, cosmos_client):
+    await async_users.set("user_1", {"n": 1})
+
+    assert await async_users.claim_unique("email", "ann@example.com", "user_1")
+    assert await async_users.claim_unique("email", "ann@example.com", "user_1")
+    assert not await async_users.claim_unique("email", "ann@example.com", "user_2")
+    assert await async_users.lookup_unique("email", "ann@example.com") == "user_1"
+
+    assert await async_users.list_all() == [{"n": 1}]
+    query, _, page_size = cosmos_client.containers["users"].queries[-1]
+    assert query == "SELECT c.data, c.blob FROM c" and page_size == 1000
+
+    assert not await async_users.release_unique("email", "ann@example.com", "user_2")
+    assert await async_users.lookup_unique("email", "ann@example.com") == "user_1"
+    assert not await async_users.release_unique("email", "ann@example.com", "user_1", min_age_seconds=60)
+    assert await async_users.release_unique("email", "ann@example.com", "user_1")
+    assert await async_users.lookup_unique("email", "ann@example.com") is None
+
+
+async def test_async_release_unique_skips_a_changed_claim(async_users, cosmos_client):
+    await async_users.claim_unique("email", "ann@example.com", "user_1")
+    container = cosmos_client.containers["users"]
+    read_item = container.read_item
+
+    async def read_then_reclaim(item, partition_key):
+        # Another request releases and re-claims between the read and the delete
+        document = await read_item(item, partition_key)
+        container.items[item]["_etag"] = "changed"
+        return document
+
+    container.read_item = read_then_reclaim
+
+    assert not await async_users.release_unique("email", "ann@example.com", "user_1")
+    assert await async_users.lookup_unique("email", "ann@example.com") == "user_1"
+
+
+async def test_async_storage_requires_open():
+    storage = AsyncCosmosStorage("test-db", "jobs")
+    with pytest.raises(RuntimeError):
+        await storage.get("job1")
+
+
+async def test_open_async_storage_binds_cosmos_stores_once(cosmos_client):
+    jobs = AsyncCosmosStorage("test-db", "jobs")
+    users = AsyncCosmosStorage("test-db", "users", partition_key_field="user_id")
+    with (
+        patch.multiple("app.async_storage", _backends=[jobs, users], _cosmos_client=None),
+        patch("app.cosmos_storage.create_async_cosmos_client", return_value=cosmos_client) as create,
+    ):
+        await async_storage.open_async_storage()
+        await async_storage.open_async_storage()
+        await jobs.set("job1", {"status": "queued"})
+
+        assert create.call_count == 1
+        assert "job1" in cosmos_client.containers["jobs"].items
+
+        await async_storage.close_async_storage()
+        assert cosmos_client.closed
@@ -0,0 +1,24 @@
+"""Tests for ETag helpers."""
+from app.utils.etag import etag_matches, payload_etag, version_etag
+
+
+def test_payload_etag_is_strong_and_content_based():
+    etag = payload_etag('{"a": 1}')
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == payload_etag(b'{"a": 1}')
+    assert etag != payload_etag('{"a": 2}')
+
+
+def test_version_etag():
+    assert version_etag("job1", 3) == '"job1.3"'
+    assert version_etag("job1", 3, "proposals") == '"job1.3.proposals"'
+
+
+def test_etag_matches_lists_wildcards_and_weak_prefix():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", "abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
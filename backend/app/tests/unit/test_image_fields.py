@@ -0,0 +1,124 @@
+"""Tests for collection schema discovery and image field extraction."""
+import pytest
+
+from app.services.image_fields import ImageFieldExtractor, SchemaRegistry, LEGACY_EXTRACTOR
+from app.services.webflow_client import MockWebflowClient
+
+SCHEMA = {
+    "fields": [
+        {"slug": "name", "type": "PlainText"},
+        {"slug": "hero", "type": "Image"},
+        {"slug": "hero-alt-text", "type": "PlainText"},
+        {"slug": "gallery-cover", "type": "Image"},
+        {"slug": "gallery-cover-alt-text", "type": "PlainText"},
+        {"slug": "logo", "type": "Image"},  # no alt-text companion
+        {"slug": "gallery", "type": "MultiImage"},
+    ]
+}
+
+
+def test_from_schema_pairs_image_fields_with_alt_fields():
+    extractor = ImageFieldExtractor.from_schema(SCHEMA)
+    assert extractor.pairs == (
+        ("hero", "hero-alt-text"),
+        ("gallery-cover", "gallery-cover-alt-text"),
+    )
+    assert extractor.native_alt_fields == ("logo",)
+    assert extractor.multi_image_fields == ("gallery",)
+
+
+def test_image_without_companion_uses_native_alt():
+    extractor = ImageFieldExtractor.from_schema(SCHEMA)
+    item = extractor.to_cms_item({
+        "id": "abc",
+        "fieldData": {"logo": {"url": "https://example.com/logo.png", "fileId": "f2", "alt": "Company logo"}},
+    })
+
+    assert [(i.field_name, i.current_alt_text, i.file_id) for i in item.images] == [("logo", "Company logo", "f2")]
+
+
+def test_multi_image_yields_each_image_with_its_alt():
+    extractor = ImageFieldExtractor.from_schema(SCHEMA)
+    images = list(extractor.iter_images({
+        "gallery": [
+            {"url": "https://example.com/g0.jpg", "alt": "Front porch"},
+            {"url": "https://example.com/g1.jpg", "alt": None},
+        ],
+    }))
+
+    assert [(key, alt_key, alt) for key, alt_key, _, alt in images] == [
+        ("gallery[0]", "gallery[0]", "Front porch"),
+        ("gallery[1]", "gallery[1]", None),
+    ]
+
+
+def test_build_update_writes_native_and_multi_image_alts():
+    extractor = ImageFieldExtractor.from_schema(SCHEMA)
+    field_data = {
+        "logo": {"url": "https://example.com/logo.png", "alt": "old"},
+        "gallery": [{"url": "https://example.com/g0.jpg"}, {"url": "https://example.com/g1.jpg"}],
+    }
+    alt_texts = {"hero-alt-text": "Hero", "logo": "Logo", "gallery[1]": "Second"}
+
+    assert extractor.needs_current_item(alt_texts)
+    assert extractor.build_update(alt_texts, field_data) == {
+        "hero-alt-text": "Hero",
+        "logo": {"url": "https://example.com/logo.png", "alt": "Logo"},
+        "gallery": [{"url": "https://example.com/g0.jpg"}, {"url": "https://example.com/g1.jpg", "alt": "Second"}],
+    }
+    assert field_data["logo"]["alt"] == "old"
+
+
+def test_build_update_rejects_missing_image():
+    extractor = ImageFieldExtractor.from_schema(SCHEMA)
+    with pytest.raises(ValueError):
+        extractor.build_update({"gallery[3]": "Nope"}, {"gallery": []})
+
+
+def test_to_cms_item_projects_present_images():
+    extractor = ImageFieldExtractor.from_schema(SCHEMA)
+    item = extractor.to_cms_item({
+        "id": "abc",
+        "fieldData": {
+            "name": "Kitchen",
+            "slug": "kitchen",
+            "hero": {"url": "https://example.com/hero.jpg", "fileId": "f1"},
+            "hero-alt-text": "Bright kitchen",
+            "gallery-cover": None,
+        },
+    })
+
+    assert item.name == "Kitchen"
+    assert len(item.images) == 1
+    assert item.images[0].field_name == "hero"
+    assert item.images[0].current_alt_text == "Bright kitchen"
+    assert item.images[0].file_id == "f1"
+
+
+async def test_registry_caches_schema():
+    class CountingClient(MockWebflowClient):
+        calls = 0
+
+        async def get_collection(self, collection_id):
+            CountingClient.calls += 1
+            return SCHEMA
+
+    registry = SchemaRegistry(ttl_seconds=60)
+    client = CountingClient()
+    first = await registry.get_extractor(client, "coll")
+    second = await registry.get_extractor(client, "coll")
+
+    assert first is second
+    assert CountingClient.calls == 1
+
+
+async def test_registry_falls_back_to_legacy_fields_on_error():
+    class FailingClient(MockWebflowClient):
+        async def get_collection(self, collection_id):
+            raise RuntimeError("boom")
+
+    registry = SchemaRegistry()
+    extractor = await registry.get_extractor(FailingClient(), "coll")
+
+    assert extractor is LEGACY_EXTRACTOR
+    assert extractor.pairs[0] == ("1-after", "1-after-alt-text")
@@ -0,0 +1,101 @@
+"""Tests for the Redis sorted-set job index."""
+from datetime import datetime
+
+import pytest
+from unittest.mock import patch
+
+from app.models import JobStatus
+from app.services.job_index import AsyncJobIndex, JobIndex, decode_cursor
+from app.tests.conftest import AsyncFakeRedis
+
+
+@pytest.fixture
+def index(fake_redis):
+    return JobIndex(fake_redis)
+
+
+def _job(job_id, minute, created_by="alice", status=JobStatus.QUEUED):
+    return {
+        "job_id": job_id,
+        "status": status,
+        "created_by": created_by,
+        "created_at": f"2025-03-01T10:{minute:02d}:00",
+    }
+
+
+def test_query_returns_newest_first(index):
+    for i in range(3):
+        index.upsert(_job(f"job{i}", i))
+
+    job_ids, next_cursor = index.query()
+
+    assert job_ids == ["job2", "job1", "job0"]
+    assert next_cursor is None
+
+
+def test_status_change_moves_job_between_sets(index, fake_redis):
+    index.upsert(_job("job1", 0))
+    index.upsert(_job("job1", 0, status=JobStatus.COMPLETED))
+
+    assert index.query(status=JobStatus.QUEUED)[0] == []
+    assert index.query(status=JobStatus.COMPLETED)[0] == ["job1"]
+    assert index.query(created_by="alice", status="completed")[0] == ["job1"]
+    assert fake_redis.zscore("idx:jobs:user:alice:status:queued", "job1") is None
+
+
+def test_upsert_is_one_transaction(index, fake_redis):
+    with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as pipeline:
+        index.upsert(_job("job1", 0, status=JobStatus.COMPLETED))
+
+    pipeline.assert_called_once_with(transaction=True)
+    assert index.query(status=JobStatus.COMPLETED)[0] == ["job1"]
+
+
+def test_filters_by_user_and_time_range(index):
+    index.upsert(_job("a1", 1, created_by="alice"))
+    index.upsert(_job("b1", 2, created_by="bob"))
+    index.upsert(_job("a2", 3, created_by="alice"))
+    index.upsert(_job("a3", 5, created_by="alice"))
+
+    job_ids, _ = index.query(
+        created_by="alice",
+        since=datetime(2025, 3, 1, 10, 1),
+        until=datetime(2025, 3, 1, 10, 4),
+    )
+
+    assert job_ids == ["a2", "a1"]
+
+
+def test_cursor_pages_through_ties_without_gaps(index):
+    # Five jobs share one timestamp, so paging relies on the job ID tiebreak
+    for i in range(5):
+        index.upsert(_job(f"job{i}", 0))
+    index.upsert(_job("older", 0) | {"created_at": "2025-03-01T09:00:00"})
+
+    seen = []
+    cursor = None
+    while True:
+        job_ids, cursor = index.query(cursor=cursor, limit=2)
+        seen.extend(job_ids)
+        if cursor is None:
+            break
+
+    assert seen == ["job4", "job3", "job2", "job1", "job0", "older"]
+
+
+def test_invalid_cursor_raises_value_error(index):
+    with pytest.raises(ValueError):
+        index.query(cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        decode_cursor("!!!")
+
+
+async def test_async_index_shares_the_sync_sets(index, fake_redis):
+    async_index = AsyncJobIndex(AsyncFakeRedis(fake_redis))
+    await async_index.upsert(_job("job1", 0))
+    index.upsert(_job("job2", 1))
+    await async_index.upsert(_job("job1", 0, status=JobStatus.COMPLETED))
+
+    assert await async_index.query(limit=1) == (["job2"], index.query(limit=1)[1])
+    assert (await async_index.query(status=JobStatus.COMPLETED))[0] == ["job1"]
+    assert index.query(status=JobStatus.QUEUED)[0] == ["job2"]
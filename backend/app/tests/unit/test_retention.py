@@ -0,0 +1,164 @@
+"""Tests for job/proposal retention: Redis TTLs, proposal archival and index pruning."""
+import base64
+import gzip
+import json
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import JobStatus
+from app.services.job_index import JobIndex
+from app.services.retention import (
+    CosmosProposalArchive,
+    FileProposalArchive,
+    RetentionManager,
+    is_archived,
+)
+from app.storage import RedisStorage
+from app.tests.conftest import InMemoryStorage
+
+NOW = datetime(2026, 3, 31, 12, 0)
+
+
+@pytest.fixture
+def redis(fake_redis):
+    with patch("app.storage.redis_client", fake_redis), patch("app.storage.redis_binary_client", fake_redis):
+        yield fake_redis
+
+
+@pytest.fixture
+def stores():
+    return InMemoryStorage(), InMemoryStorage()
+
+
+def _add_job(fake_redis, stores, job_id, created_at, proposals=2):
+    jobs, proposals_store = stores
+    job = {
+        "job_id": job_id,
+        "status": JobStatus.COMPLETED,
+        "collection_id": "coll1",
+        "created_by": "alice",
+        "created_at": created_at,
+    }
+    jobs.set(job_id, job)
+    proposals_store.set(job_id, [{"proposal_id": f"{job_id}-p{i}"} for i in range(proposals)])
+    JobIndex(fake_redis).upsert(job)
+
+
+def _manager(fake_redis, stores, archive, **kwargs):
+    jobs, proposals_store = stores
+    return RetentionManager(fake_redis, jobs, proposals_store, archive=archive, **kwargs)
+
+
+def _read_archive(directory):
+    records = []
+    for path in sorted(directory.iterdir()):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records += [json.loads(line) for line in f]
+    return records
+
+
+def test_redis_storage_sets_ttl_on_write(redis):
+    RedisStorage("job", ttl_seconds=600).set("j1", {"n": 1})
+    RedisStorage("job", track_members=True, ttl_seconds=600).set("j2", {"n": 2})
+    RedisStorage("users").set("u1", {"n": 3})
+
+    assert redis.ttl("job:j1") == 600
+    assert redis.ttl("job:j2") == 600
+    assert redis.ttl("users:u1") == -1
+
+
+def test_apply_ttl_only_touches_keys_without_expiry(redis):
+    RedisStorage("job").set("old", {"n": 0})
+    redis.set("job:recent", "{}", ex=60)
+
+    assert RedisStorage("job", scan_count=1, ttl_seconds=600).apply_ttl() == 1
+    assert redis.ttl("job:old") == 600
+    assert redis.ttl("job:recent") == 60
+
+
+def test_archives_old_proposals_to_file(fake_redis, stores, tmp_path):
+    _add_job(fake_redis, stores, "old", "2026-03-01T10:00:00", proposals=3)
+    _add_job(fake_redis, stores, "new", "2026-03-30T10:00:00")
+    manager = _manager(fake_redis, stores, FileProposalArchive(str(tmp_path)), archive_after_days=7)
+
+    result = manager.run(NOW)
+
+    assert result["archived_jobs"] == 1
+    records = _read_archive(tmp_path)
+    assert [r["job_id"] for r in records] == ["old"]
+    assert len(records[0]["proposals"]) == 3
+    assert records[0]["created_by"] == "alice"
+
+    proposals_store = stores[1]
+    assert is_archived(proposals_store.get("old"))
+    assert proposals_store.get("old")["total"] == 3
+    assert len(proposals_store.get("new")) == 2
+
+
+def test_archive_resumes_after_watermark(fake_redis, stores, tmp_path):
+    _add_job(fake_redis, stores, "first", "2026-03-01T10:00:00")
+    manager = _manager(fake_redis, stores, FileProposalArchive(str(tmp_path)), archive_after_days=7)
+    manager.run(NOW)
+
+    _add_job(fake_redis, stores, "second", "2026-03-28T10:00:00")
+    with patch.object(stores[1], "get_many", wraps=stores[1].get_many) as get_many:
+        assert manager.run(datetime(2026, 4, 10))["archived_jobs"] == 1
+
+    assert get_many.call_args.args[0] == ["second"]
+    assert [r["job_id"] for r in _read_archive(tmp_path)] == ["first", "second"]
+
+
+def test_already_archived_jobs_are_skipped(fake_redis, stores, tmp_path):
+    _add_job(fake_redis, stores, "old", "2026-03-01T10:00:00")
+    manager = _manager(fake_redis, stores, FileProposalArchive(str(tmp_path)), archive_after_days=7)
+    manager.run(NOW)
+    fake_redis.delete("retention:archived_until")
+
+    assert manager.run(NOW)["archived_jobs"] == 0
+    assert len(_read_archive(tmp_path)) == 1
+
+
+def test_cosmos_archive_compresses_proposals():
+    storage = MagicMock()
+    proposals = [{"proposal_id": "p1", "proposed_alt_text": "A kitchen"}]
+
+    CosmosProposalArchive(storage).write([{"job_id": "j1", "proposals": proposals}], NOW)
+
+    (documents,) = storage.set_many.call_args.args
+    document = documents["j1"]
+    assert "proposals" not in document
+    assert json.loads(gzip.decompress(base64.b64decode(document["proposals_gzip"]))) == proposals
+
+
+def test_prune_drops_expired_jobs_from_every_index_set(fake_redis, stores):
+    _add_job(fake_redis, stores, "expired", "2026-01-01T10:00:00")
+    _add_job(fake_redis, stores, "kept", "2026-03-25T10:00:00")
+    manager = _manager(fake_redis, stores, None, retention_days=30)
+
+    result = manager.run(NOW)
+
+    assert result == {"ran_at": NOW.isoformat(), "archived_jobs": 0, "index_entries_pruned": 4}
+    index = JobIndex(fake_redis)
+    assert index.query()[0] == ["kept"]
+    assert index.query(created_by="alice", status=JobStatus.COMPLETED)[0] == ["kept"]
+
+
+def test_stats(fake_redis, stores, tmp_path):
+    _add_job(fake_redis, stores, "a", "2026-01-01T10:00:00")
+    _add_job(fake_redis, stores, "b", "2026-03-01T10:00:00")
+    _add_job(fake_redis, stores, "c", "2026-03-30T10:00:00")
+    manager = _manager(
+        fake_redis, stores, FileProposalArchive(str(tmp_path)), retention_days=60, archive_after_days=7
+    )
+    manager.archive_proposals(NOW)
+
+    stats = manager.stats(NOW)
+
+    assert stats["retention_days"] == 60
+    assert stats["jobs"] == {"indexed": 3, "past_archive_cutoff": 2, "past_retention": 1}
+    assert stats["archive"]["type"] == "file"
+    assert stats["archive"]["files"] == 1
+    assert stats["archive"]["archived_until"] == "2026-03-24T12:00:00"
+    assert stats["last_run"] is None
@@ -0,0 +1,85 @@
+"""Tests for the SQLite item search index."""
+import pytest
+
+from app.services.image_fields import LEGACY_EXTRACTOR
+from app.services.search_index import ItemSearchIndex
+
+
+def _item(item_id, name, alts, updated="2026-01-01T00:00:00Z"):
+    field_data = {"name": name, "slug": name.lower().replace(" ", "-")}
+    for i, alt in enumerate(alts, start=1):
+        field_data[f"{i}-after"] = {"url": f"https://example.com/{item_id}-{i}.jpg"}
+        field_data[f"{i}-after-alt-text"] = alt
+    return {"id": item_id, "lastUpdated": updated, "fieldData": field_data}
+
+
+@pytest.fixture
+def index():
+    idx = ItemSearchIndex(":memory:", short_alt_chars=10)
+    idx.upsert_items("coll", [
+        _item("a", "Lakeside Kitchen", ["A bright modern kitchen remodel", None]),
+        _item("b", "Downtown Loft", ["Loft", "Open plan loft living room"], updated="2026-03-01T00:00:00Z"),
+        _item("c", "Lakeside Basement", ["Finished basement with bar", "Home theater area"]),
+    ], LEGACY_EXTRACTOR)
+    return idx
+
+
+def test_filter_missing_alt(index):
+    rows, _, total = index.search("coll", missing_alt=True)
+    assert [r["item_id"] for r in rows] == ["a"]
+    assert total == 1
+
+
+def test_filter_short_alt(index):
+    rows, _, _ = index.search("coll", short_alt=True)
+    assert [r["item_id"] for r in rows] == ["b"]
+
+
+def test_text_search_matches_name_prefix(index):
+    rows, _, total = index.search("coll", q="lakes")
+    assert {r["item_id"] for r in rows} == {"a", "c"}
+    assert total == 2
+
+
+def test_cursor_pagination_walks_all_rows(index):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor, _ = index.search("coll", sort="name", limit=1, cursor=cursor)
+        seen.extend(r["name"] for r in rows)
+        if not cursor:
+            break
+    assert seen == ["Downtown Loft", "Lakeside Basement", "Lakeside Kitchen"]
+
+
+def test_sort_by_last_updated_descending(index):
+    rows, _, _ = index.search("coll", sort="last_updated", descending=True)
+    assert rows[0]["item_id"] == "b"
+
+
+def test_update_alt_texts_clears_missing_flag(index):
+    index.update_alt_texts("coll", "a", {"2-after-alt-text": "Kitchen island with pendant lights"})
+    rows, _, _ = index.search("coll", missing_alt=True)
+    assert rows == []
+
+
+def test_remove_stale_drops_unseen_items(index):
+    index.upsert_items("coll", [_item("a", "Lakeside Kitchen", ["ok alt text here"])], LEGACY_EXTRACTOR, generation=7)
+    removed = index.remove_stale("coll", generation=7)
+    rows, _, total = index.search("coll")
+    assert removed == 2
+    assert [r["item_id"] for r in rows] == ["a"]
+    assert index.search("coll", q="loft")[2] == 0
+
+
+def test_indexed_at_set_by_completed_reindex(index):
+    assert index.indexed_at("coll") is None
+    index.upsert_items("coll", [_item("a", "Lakeside Kitchen", ["ok alt text here"])], LEGACY_EXTRACTOR, generation=7)
+    index.remove_stale("coll", generation=7)
+    assert index.indexed_at("coll") is not None
+    assert index.indexed_at("other") is None
+
+
+def test_invalid_cursor_raises(index):
+    with pytest.raises(ValueError):
+        index.search("coll", cursor="not-a-cursor")
@@ -0,0 +1,112 @@
+"""Tests for request coalescing."""
+import asyncio
+
+import pytest
+
+from app.services.single_flight import RedisSingleFlight, SingleFlight, RESULT_PREFIX, LOCK_PREFIX
+from app.tests.conftest import AsyncFakeRedis
+
+
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"items": [1, 2]}
+
+    results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+
+    assert calls == 1
+    assert all(r == {"items": [1, 2]} for r in results)
+    assert flight.stats() == {"leaders": 1, "coalesced": 4}
+
+
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0)
+        return value
+
+    a, b = await asyncio.gather(flight.do("a", lambda: fetch(1)), flight.do("b", lambda: fetch(2)))
+
+    assert (a, b) == (1, 2)
+    assert flight.stats()["leaders"] == 2
+
+
+async def test_sequential_calls_run_again():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flight.do("k", fetch) == 1
+    assert await flight.do("k", fetch) == 2
+
+
+async def test_errors_propagate_to_all_waiters():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*(flight.do("k", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_redis_leader_publishes_result_and_releases_lock(fake_redis):
+    flight = RedisSingleFlight(AsyncFakeRedis(fake_redis))
+
+    async def fetch():
+        return {"items": ["x"]}
+
+    assert await flight.do("k", fetch) == {"items": ["x"]}
+    assert fake_redis.get(f"{LOCK_PREFIX}:k") is None
+    assert any(key.startswith(RESULT_PREFIX) for key in fake_redis._data)
+
+
+async def test_redis_leader_keeps_a_lock_taken_over_after_expiry(fake_redis):
+    flight = RedisSingleFlight(AsyncFakeRedis(fake_redis))
+
+    async def fetch():
+        # Our lock expired mid-call and another process took it
+        fake_redis.set(f"{LOCK_PREFIX}:k", "new-leader")
+        return "value"
+
+    assert await flight.do("k", fetch) == "value"
+    assert fake_redis.get(f"{LOCK_PREFIX}:k") == "new-leader"
+
+
+async def test_redis_follower_reuses_leader_result(fake_redis):
+    # Another process holds the lock and has already published its result
+    fake_redis.set(f"{LOCK_PREFIX}:k", "other-token")
+    fake_redis.set(f"{RESULT_PREFIX}:other-token", '{"items": ["shared"]}')
+    flight = RedisSingleFlight(AsyncFakeRedis(fake_redis), poll_interval=0)
+
+    async def fetch():
+        pytest.fail("follower must not call upstream")
+
+    assert await flight.do("k", fetch) == {"items": ["shared"]}
+
+
+async def test_redis_follower_falls_back_when_leader_vanishes(fake_redis):
+    fake_redis.set(f"{LOCK_PREFIX}:k", "other-token")
+    flight = RedisSingleFlight(AsyncFakeRedis(fake_redis), poll_interval=0)
+
+    async def fetch():
+        return "direct"
+
+    async def release_lock():
+        await asyncio.sleep(0.01)
+        fake_redis.delete(f"{LOCK_PREFIX}:k")
+
+    result, _ = await asyncio.gather(flight.do("k", fetch), release_lock())
+    assert result == "direct"
@@ -0,0 +1,139 @@
+"""Tests for RedisStorage listing (SCAN/membership set + MGET batches) and unique indexes."""
+import pytest
+from unittest.mock import patch
+
+from app.storage import RedisStorage
+
+
+@pytest.fixture
+def redis(fake_redis):
+    with patch("app.storage.redis_client", fake_redis), patch("app.storage.redis_binary_client", fake_redis):
+        yield fake_redis
+
+
+def _fill(storage, count):
+    for i in range(count):
+        storage.set(f"k{i:03d}", {"n": i})
+
+
+def test_list_all_scans_only_own_prefix(redis):
+    jobs = RedisStorage("job", scan_count=2)
+    _fill(jobs, 5)
+    redis.set("job_events:x", "not a job")
+    redis.set("proposals:p1", '{"n": -1}')
+
+    values = sorted(v["n"] for v in jobs.list_all())
+
+    assert values == [0, 1, 2, 3, 4]
+
+
+def test_set_many_writes_in_one_pipeline(redis):
+    jobs = RedisStorage("job", track_members=True, ttl_seconds=600)
+
+    with patch.object(redis, "pipeline", wraps=redis.pipeline) as pipeline:
+        jobs.set_many({"a": {"n": 1}, "b": {"n": 2}})
+        jobs.set_many({})
+
+    pipeline.assert_called_once_with(transaction=False)
+    assert jobs.get_many(["a", "b"]) == {"a": {"n": 1}, "b": {"n": 2}}
+    assert redis.smembers(jobs.members_key) == {"a", "b"}
+    assert 0 < redis.ttl("job:b") <= 600
+
+
+def test_iter_all_fetches_in_mget_batches(redis):
+    jobs = RedisStorage("job", scan_count=2)
+    _fill(jobs, 5)
+
+    with patch.object(redis, "mget", wraps=redis.mget) as mget:
+        assert len(list(jobs.iter_all())) == 5
+
+    assert [len(call.args[0]) for call in mget.call_args_list] == [2, 2, 1]
+
+
+def test_iter_all_is_lazy(redis):
+    users = RedisStorage("users", scan_count=2)
+    _fill(users, 6)
+
+    with patch.object(redis, "mget", wraps=redis.mget) as mget:
+        first = next(users.iter_all())
+
+    assert first is not None
+    assert mget.call_count == 1
+
+
+def test_iter_all_skips_keys_repeated_by_scan(redis):
+    jobs = RedisStorage("job")
+    _fill(jobs, 2)
+
+    with patch.object(redis, "scan_iter", return_value=iter(["job:k000", "job:k001", "job:k000"])):
+        assert len(jobs.list_all()) == 2
+
+
+def test_member_set_tracks_writes_and_deletes(redis):
+    jobs = RedisStorage("job", track_members=True)
+    _fill(jobs, 3)
+    jobs.delete("k001")
+
+    assert redis.smembers("idx:members:job") == {"k000", "k002"}
+    assert sorted(v["n"] for v in jobs.list_all()) == [0, 2]
+
+
+def test_member_set_listing_does_not_scan(redis):
+    jobs = RedisStorage("job", track_members=True)
+    _fill(jobs, 3)
+
+    with patch.object(redis, "scan_iter", side_effect=AssertionError("scanned")):
+        assert len(jobs.list_all()) == 3
+
+
+def test_member_set_drops_keys_deleted_elsewhere(redis):
+    jobs = RedisStorage("job", track_members=True)
+    _fill(jobs, 2)
+    redis.delete("job:k000")
+
+    assert [v["n"] for v in jobs.list_all()] == [1]
+    assert redis.smembers("idx:members:job") == {"k001"}
+
+
+def test_rebuild_members_indexes_existing_keys(redis):
+    RedisStorage("job").set("old", {"n": 0})
+    jobs = RedisStorage("job", track_members=True, scan_count=1)
+    jobs.set("new", {"n": 1})
+
+    assert jobs.rebuild_members() == 1
+    assert redis.smembers("idx:members:job") == {"old", "new"}
+
+
+def test_claim_unique_is_exclusive(redis):
+    users = RedisStorage("users")
+
+    assert users.claim_unique("email", "ann@example.com", "user_1")
+    assert users.claim_unique("email", "ann@example.com", "user_1")
+    assert not users.claim_unique("email", "ann@example.com", "user_2")
+    assert users.lookup_unique("email", "ann@example.com") == "user_1"
+    assert redis.hget("idx:users:email", "ann@example.com") == "user_1"
+
+
+def test_release_unique_only_for_holder(redis):
+    users = RedisStorage("users")
+    users.claim_unique("email", "ann@example.com", "user_1")
+
+    assert not users.release_unique("email", "ann@example.com", "user_2")
+    assert users.lookup_unique("email", "ann@example.com") == "user_1"
+
+    assert users.release_unique("email", "ann@example.com", "user_1")
+    assert users.lookup_unique("email", "ann@example.com") is None
+    assert redis.hget("idx:users:email:claimed_at", "ann@example.com") is None
+
+
+def test_release_unique_respects_min_age(redis):
+    users = RedisStorage("users")
+    users.claim_unique("email", "ann@example.com", "user_1")
+
+    assert not users.release_unique("email", "ann@example.com", "user_1", min_age_seconds=60)
+    assert users.lookup_unique("email", "ann@example.com") == "user_1"
+
+    claimed_at = float(redis.hget("idx:users:email:claimed_at", "ann@example.com"))
+    redis.hset("idx:users:email:claimed_at", "ann@example.com", str(claimed_at - 61))
+    assert users.release_unique("email", "ann@example.com", "user_1", min_age_seconds=60)
+    assert users.lookup_unique("email", "ann@example.com") is None
@@ -0,0 +1,129 @@
+"""Tests for the job pipeline in app.tasks."""
+import json
+
+import pytest
+from unittest.mock import patch
+
+from app.models import JobStatus
+from app.services.openai_client import MockAltTextGenerator
+from app.services.webflow_client import MockWebflowClient, WebflowClient
+from app.tasks import process_job_async
+
+
+def _make_item(item_id: str) -> dict:
+    return {
+        "id": item_id,
+        "fieldData": {
+            "name": f"Project {item_id}",
+            "1-after": {"url": f"https://example.com/{item_id}-1.jpg"},
+            "2-after": {"url": f"https://example.com/{item_id}-2.jpg"},
+        },
+    }
+
+
+class PagedWebflowClient(MockWebflowClient):
+    """Serves ``total`` items in pages and records which pages were fetched."""
+
+    def __init__(self, total: int, page_size: int = 10):
+        super().__init__()
+        self.items = [_make_item(f"item_{i:03d}") for i in range(total)]
+        self.page_size = page_size
+        self.offsets_fetched = []
+
+    async def get_collection_items(self, collection_id, limit=100, offset=0):
+        self.offsets_fetched.append(offset)
+        page = self.items[offset:offset + self.page_size]
+        return {"items": page, "pagination": {"total": len(self.items)}}
+
+    async def iter_collection_items(self, collection_id, limit=100):
+        # Route through the real paging logic with this client's page size
+        async for page in WebflowClient.iter_collection_items(self, collection_id, limit=self.page_size):
+            yield page
+
+
+@pytest.fixture
+def job(mock_storage):
+    def _create(job_id="job1", item_ids=None):
+        mock_storage["jobs"][job_id] = {
+            "job_id": job_id,
+            "status": JobStatus.QUEUED,
+            "created_at": "2025-01-01T12:00:00",
+            "progress": {"processed": 0, "total": len(item_ids), "percentage": 0.0},
+        }
+        return job_id
+    return _create
+
+
+async def _run(client, job_id, item_ids, image_keys=None):
+    with (
+        patch("app.tasks.get_webflow_client", return_value=client),
+        patch("app.tasks.get_alt_text_generator", return_value=MockAltTextGenerator()),
+    ):
+        await process_job_async(job_id, "coll", item_ids, image_keys)
+
+
+async def test_pipeline_generates_for_targets_only(job, mock_storage):
+    client = PagedWebflowClient(total=30)
+    item_ids = ["item_002", "item_015"]
+    job_id = job(item_ids=item_ids)
+
+    await _run(client, job_id, item_ids)
+
+    job_data = mock_storage["jobs"][job_id]
+    assert job_data["status"] == JobStatus.COMPLETED
+    assert job_data["progress"]["processed"] == 2
+    proposals = mock_storage["proposals"][job_id]
+    assert {p["item_id"] for p in proposals} == set(item_ids)
+    assert len(proposals) == 4  # two images per item
+
+
+async def test_pipeline_stops_paging_once_targets_found(job, mock_storage):
+    client = PagedWebflowClient(total=100)
+    item_ids = ["item_005"]
+    job_id = job(item_ids=item_ids)
+
+    await _run(client, job_id, item_ids)
+
+    assert client.offsets_fetched == [0]
+
+
+async def test_pipeline_respects_image_keys(job, mock_storage):
+    client = PagedWebflowClient(total=5)
+    item_ids = ["item_001"]
+    job_id = job(item_ids=item_ids)
+
+    await _run(client, job_id, item_ids, image_keys=["item_001:2-after"])
+
+    proposals = mock_storage["proposals"][job_id]
+    assert [p["field_name"] for p in proposals] == ["2-after-alt-text"]
+
+
+async def test_missing_items_complete_progress(job, mock_storage):
+    client = PagedWebflowClient(total=5)
+    item_ids = ["item_001", "does_not_exist"]
+    job_id = job(item_ids=item_ids)
+
+    await _run(client, job_id, item_ids)
+
+    job_data = mock_storage["jobs"][job_id]
+    assert job_data["status"] == JobStatus.COMPLETED
+    assert job_data["progress"]["processed"] == 2
+    assert job_data["progress"]["percentage"] == 100.0
+
+
+async def test_pipeline_publishes_job_events(job, mock_storage, fake_redis):
+    client = PagedWebflowClient(total=5)
+    item_ids = ["item_001", "item_003"]
+    job_id = job(item_ids=item_ids)
+
+    await _run(client, job_id, item_ids)
+
+    events = [json.loads(message) for channel, message in fake_redis.published if channel == f"job_events:{job_id}"]
+    names = [e["event"] for e in events]
+    assert names.count("proposal") == 4
+    assert names.count("progress") == 2
+    assert names[-1] == "completed"
+    assert events[-1]["data"] == {"status": "completed", "proposal_count": 4}
+    proposal = next(e["data"] for e in events if e["event"] == "proposal")
+    assert proposal["item_id"] == "item_001"
+    assert isinstance(proposal["generated_at"], str)
@@ -0,0 +1,130 @@
+"""Tests for the thumbnail service and its LRU disk cache."""
+import io
+import os
+
+import httpx
+import pytest
+from PIL import Image
+
+from app.services.thumbnails import ThumbnailDiskCache, ThumbnailError, ThumbnailService, cache_key, etag_for
+
+FILE_ID = "65a1b2c3d4e5f60718293a4b"
+SOURCE_URL = f"https://cdn.prod.website-files.com/site/{FILE_ID}_kitchen.jpg"
+
+
+def _jpeg(width=1600, height=1200) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 120, 40)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+def _service(tmp_path, handler, max_bytes=10_000_000, max_source_bytes=5_000_000):
+    return ThumbnailService(
+        cache=ThumbnailDiskCache(str(tmp_path), max_bytes),
+        widths=[160, 320],
+        allowed_hosts=["cdn.prod.website-files.com"],
+        max_source_bytes=max_source_bytes,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+async def test_downloads_once_and_caches_every_width(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url)
+        return httpx.Response(200, content=_jpeg())
+
+    service = _service(tmp_path, handler)
+
+    small = await service.get(FILE_ID, 160, SOURCE_URL)
+    large = await service.get(FILE_ID, 320, SOURCE_URL)
+    again = await service.get(FILE_ID, 160, SOURCE_URL)
+
+    assert len(requests) == 1
+    assert again == small
+    assert Image.open(io.BytesIO(small)).size == (160, 120)
+    assert Image.open(io.BytesIO(large)).format == "WEBP"
+    key = cache_key(FILE_ID, SOURCE_URL)
+    assert sorted(os.listdir(tmp_path)) == [f"{key}_160.webp", f"{key}_320.webp"]
+
+
+async def test_other_sources_for_a_file_id_get_their_own_entries(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(200, content=_jpeg())
+
+    service = _service(tmp_path, handler)
+    other_site = f"https://cdn.prod.website-files.com/attacker-site/{FILE_ID}_kitchen.jpg"
+
+    await service.get(FILE_ID, 160, SOURCE_URL)
+    await service.get(FILE_ID, 160, other_site)
+
+    assert requests == [SOURCE_URL, other_site]
+    assert etag_for(FILE_ID, 160, SOURCE_URL) != etag_for(FILE_ID, 160, other_site)
+    # Host case and fragments don't make a new entry
+    assert cache_key(FILE_ID, SOURCE_URL) == cache_key(FILE_ID, SOURCE_URL.replace("cdn.prod", "CDN.prod") + "#x")
+
+
+async def test_small_originals_are_not_upscaled(tmp_path):
+    service = _service(tmp_path, lambda request: httpx.Response(200, content=_jpeg(100, 50)))
+
+    data = await service.get(FILE_ID, 320, SOURCE_URL)
+
+    assert Image.open(io.BytesIO(data)).size == (100, 50)
+
+
+@pytest.mark.parametrize(
+    "file_id, width, url",
+    [
+        (FILE_ID, 200, SOURCE_URL),  # width not offered
+        (FILE_ID, 160, f"https://evil.example.com/{FILE_ID}.jpg"),  # host not allowed
+        (FILE_ID, 160, f"http://cdn.prod.website-files.com/{FILE_ID}.jpg"),  # not https
+        (FILE_ID, 160, "https://cdn.prod.website-files.com/site/other.jpg"),  # URL for another file
+        (FILE_ID, 160, f"https://cdn.prod.website-files.com/site/abc_{FILE_ID}.jpg"),  # file ID only in the name
+        (FILE_ID, 160, f"https://cdn.prod.website-files.com/site/x{FILE_ID}_kitchen.jpg"),  # not a whole segment
+        ("../etc", 160, SOURCE_URL),  # unsafe file ID
+    ],
+)
+async def test_rejects_invalid_requests_without_fetching(tmp_path, file_id, width, url):
+    def handler(request):
+        raise AssertionError("should not fetch")
+
+    service = _service(tmp_path, handler)
+
+    with pytest.raises(ThumbnailError) as exc:
+        await service.get(file_id, width, url)
+    assert exc.value.status_code == 400
+
+
+async def test_oversized_source_is_rejected(tmp_path):
+    service = _service(tmp_path, lambda request: httpx.Response(200, content=_jpeg()), max_source_bytes=1000)
+
+    with pytest.raises(ThumbnailError) as exc:
+        await service.get(FILE_ID, 160, SOURCE_URL)
+    assert exc.value.status_code == 413
+
+
+async def test_non_image_source_is_rejected(tmp_path):
+    service = _service(tmp_path, lambda request: httpx.Response(200, content=b"<html></html>"))
+
+    with pytest.raises(ThumbnailError) as exc:
+        await service.get(FILE_ID, 160, SOURCE_URL)
+    assert exc.value.status_code == 422
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = ThumbnailDiskCache(str(tmp_path), max_bytes=250)
+    cache.put("a", 160, b"x" * 100)
+    cache.put("b", 160, b"x" * 100)
+    os.utime(tmp_path / "a_160.webp", (1, 1))
+    os.utime(tmp_path / "b_160.webp", (2, 2))
+    assert cache.get("a", 160) is not None  # touching "a" makes "b" the oldest
+
+    cache.put("c", 160, b"x" * 100)
+
+    assert cache.get("b", 160) is None
+    assert cache.get("a", 160) is not None
+    assert cache.get("c", 160) is not None
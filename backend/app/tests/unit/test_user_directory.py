@@ -0,0 +1,66 @@
+"""Tests for email lookups through the users_db unique index."""
+from unittest.mock import patch
+
+from app.user_directory import (
+    EMAIL_INDEX,
+    ORPHANED_CLAIM_SECONDS,
+    create_user,
+    find_user_by_email,
+    normalize_email,
+    save_user,
+)
+
+
+def _user(user_id="user_1", email="Ann@Example.com"):
+    return {"user_id": user_id, "email": email, "role": "user", "is_active": True}
+
+
+def test_normalize_email():
+    assert normalize_email("  Ann@Example.COM ") == "ann@example.com"
+
+
+async def test_create_then_find_by_email(mock_storage):
+    assert await create_user(_user())
+    assert (await find_user_by_email("ann@example.com"))["user_id"] == "user_1"
+    assert mock_storage["users"].lookup_unique(EMAIL_INDEX, "ann@example.com") == "user_1"
+
+
+async def test_find_unknown_email(mock_storage):
+    mock_storage["users"].set("user_1", _user())
+    with patch.object(mock_storage["users"], "iter_all", side_effect=AssertionError("listed users")):
+        assert await find_user_by_email("nobody@example.com") is None
+        assert await create_user(_user("user_2", "new@example.com"))
+
+
+async def test_create_rejects_taken_email(mock_storage):
+    await create_user(_user())
+    assert not await create_user(_user("user_2", "ANN@example.com"))
+    assert mock_storage["users"].get("user_2") is None
+
+
+async def test_create_takes_over_orphaned_claim(mock_storage):
+    # Claimed by a create that failed before the user was stored
+    users = mock_storage["users"]
+    users.claim_unique(EMAIL_INDEX, "ann@example.com", "user_ghost")
+    users._claimed_at[(EMAIL_INDEX, "ann@example.com")] -= ORPHANED_CLAIM_SECONDS + 1
+
+    assert await create_user(_user())
+    assert (await find_user_by_email("ann@example.com"))["user_id"] == "user_1"
+
+
+async def test_create_leaves_recent_claim_alone(mock_storage):
+    # Claimed by a create that hasn't stored its user yet
+    mock_storage["users"].claim_unique(EMAIL_INDEX, "ann@example.com", "user_racing")
+
+    assert not await create_user(_user())
+    assert mock_storage["users"].lookup_unique(EMAIL_INDEX, "ann@example.com") == "user_racing"
+    assert mock_storage["users"].get("user_1") is None
+
+
+async def test_save_user_indexes_users_created_before_the_index(mock_storage):
+    mock_storage["users"].set("user_1", _user())
+    assert await find_user_by_email("ann@example.com") is None
+
+    await save_user(_user())
+
+    assert (await find_user_by_email("ann@example.com"))["user_id"] == "user_1"
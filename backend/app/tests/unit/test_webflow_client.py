@@ -1,5 +1,8 @@
+import httpx
 import pytest
-from app.services.webflow_client import MockWebflowClient
+from app.services.response_cache import ResponseCache
+from app.tests.conftest import AsyncFakeRedis
+from app.services.webflow_client import MockWebflowClient, WebflowClient, WebflowClientPool
 
 
 @pytest.mark.asyncio
@@ -35,3 +38,131 @@ async def test_client_close():
     """Test client cleanup."""
     client = MockWebflowClient()
     await client.close()  # Should not raise exception
+
+
+def _client_with_transport(handler, cache, api_token="token"):
+    """Build a WebflowClient whose HTTP calls go to ``handler``."""
+    client = WebflowClient(api_token=api_token, cache=cache)
+    client.client = httpx.AsyncClient(
+        base_url=client.base_url, transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_serves_cached_body_on_304(fake_redis):
+    """Second fetch sends If-None-Match and reuses the cached body on 304."""
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"items": [{"id": "a"}]}, headers={"ETag": '"v1"'})
+
+    cache = ResponseCache(AsyncFakeRedis(fake_redis), ttl_seconds=60)
+    client = _client_with_transport(handler, cache)
+
+    first = await client.get_collection_items("coll", limit=10, offset=0)
+    second = await client.get_collection_items("coll", limit=10, offset=0)
+    await client.close()
+
+    assert first == second == {"items": [{"id": "a"}]}
+    assert "if-none-match" not in seen_headers[0]
+    assert seen_headers[1]["if-none-match"] == '"v1"'
+    assert await cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_cached_body_is_not_shared_across_tokens(fake_redis):
+    """A client with another token never gets a 304 answered from the first token's entry."""
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        return httpx.Response(200, json={"items": []}, headers={"ETag": '"v1"'})
+
+    cache = ResponseCache(AsyncFakeRedis(fake_redis))
+    first = _client_with_transport(handler, cache, api_token="token-a")
+    second = _client_with_transport(handler, cache, api_token="token-b")
+    await first.get_collection_items("coll")
+    await second.get_collection_items("coll")
+    await first.close()
+    await second.close()
+
+    assert "if-none-match" not in seen_headers[1]
+    assert cache.make_key("/items", api_token="token-a") != cache.make_key("/items", api_token="token-b")
+
+
+@pytest.mark.asyncio
+async def test_cache_key_includes_params(fake_redis):
+    """Different pages are cached independently."""
+    cache = ResponseCache(AsyncFakeRedis(fake_redis))
+    assert cache.make_key("/items", {"offset": 0}) != cache.make_key("/items", {"offset": 100})
+    assert cache.make_key("/items", {"a": 1, "b": 2}) == cache.make_key("/items", {"b": 2, "a": 1})
+
+
+@pytest.mark.asyncio
+async def test_response_without_validators_is_not_cached(fake_redis):
+    """Responses lacking ETag/Last-Modified are never stored."""
+    def handler(request):
+        return httpx.Response(200, json={"items": []})
+
+    cache = ResponseCache(AsyncFakeRedis(fake_redis))
+    client = _client_with_transport(handler, cache)
+    await client.get_collection_items("coll")
+    await client.close()
+
+    key = cache.make_key(f"{client.base_url}/collections/coll/items", {"limit": 100, "offset": 0}, "token")
+    assert await cache.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_client_for_same_token():
+    """The pool hands out one shared client per token."""
+    pool = WebflowClientPool()
+    first = pool.get("token-a")
+    assert pool.get("token-a") is first
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_rebuilds_client_on_token_change():
+    """A new token produces a new client; the old one is closed on shutdown."""
+    pool = WebflowClientPool()
+    old = pool.get("token-a")
+    new = pool.get("token-b")
+
+    assert new is not old
+    assert new.api_token == "token-b"
+
+    await pool.aclose()
+    assert old.client.is_closed
+    assert new.client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_pool_closes_retired_client_once_released():
+    """A client replaced by a token change is closed when its last request finishes."""
+    pool = WebflowClientPool()
+    old = await pool.acquire("token-a")
+    new = await pool.acquire("token-b")
+
+    assert not old.client.is_closed
+    await pool.release(old)
+    assert old.client.is_closed
+    assert not new.client.is_closed
+
+    await pool.release(new)
+    assert not new.client.is_closed
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_closes_idle_retired_client_at_rotation():
+    pool = WebflowClientPool()
+    old = pool.get("token-a")
+    await pool.release(await pool.acquire("token-b"))
+
+    assert old.client.is_closed
+    await pool.aclose()
@@ -0,0 +1,67 @@
+"""User lookups by email through a unique secondary index.
+
+``users_db`` is keyed by user ID, so finding a user by email used to mean
+listing every user (a cross-partition ``SELECT *`` on Cosmos DB). Each
+user's normalized email is now claimed in a unique index on the storage
+backend (``claim_unique``/``lookup_unique``), which makes login a point
+read and makes registration race-free: two requests for one email can't
+both claim it.
+
+Users created before the index existed are added by
+``scripts.backfill_email_index``.
+"""
+
+import logging
+from typing import Optional
+
+from app.async_storage import users_db
+
+logger = logging.getLogger(__name__)
+
+EMAIL_INDEX = "email"
+
+# A claim whose user still isn't stored after this long belongs to a create
+# that failed; younger ones may be a create still in progress
+ORPHANED_CLAIM_SECONDS = 300
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+async def find_user_by_email(email: str) -> Optional[dict]:
+    """Return the user registered with ``email`` (case-insensitive), or None."""
+    user_id = await users_db.lookup_unique(EMAIL_INDEX, normalize_email(email))
+    if user_id is None:
+        return None
+    return await users_db.get(user_id)
+
+
+async def create_user(user_data: dict) -> bool:
+    """Claim the user's email and store the user. Returns False if the email is taken."""
+    email = normalize_email(user_data["email"])
+    user_id = user_data["user_id"]
+    if not await users_db.claim_unique(EMAIL_INDEX, email, user_id):
+        holder = await users_db.lookup_unique(EMAIL_INDEX, email)
+        if holder is None or await users_db.get(holder) is not None:
+            return False
+        # Claimed by a user that was never stored (failed create): take it
+        # over, unless the claim is recent enough to be a create in progress
+        if not await users_db.release_unique(EMAIL_INDEX, email, holder, min_age_seconds=ORPHANED_CLAIM_SECONDS):
+            return False
+        logger.warning("Released orphaned email claim", extra={"user_id": holder})
+        if not await users_db.claim_unique(EMAIL_INDEX, email, user_id):
+            return False
+    try:
+        await users_db.set(user_id, user_data)
+    except Exception:
+        await users_db.release_unique(EMAIL_INDEX, email, user_id)
+        raise
+    return True
+
+
+async def save_user(user_data: dict) -> None:
+    """Store changes to an existing user, keeping its email claimed."""
+    await users_db.set(user_data["user_id"], user_data)
+    if not await users_db.claim_unique(EMAIL_INDEX, normalize_email(user_data["email"]), user_data["user_id"]):
+        logger.warning("Email claimed by another user", extra={"user_id": user_data["user_id"]})
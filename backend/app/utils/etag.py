@@ -0,0 +1,44 @@
+"""Strong ETags and ``If-None-Match`` handling for JSON endpoints."""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# Clients may reuse a stored response but must revalidate it first
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def payload_etag(payload: bytes | str) -> str:
+    """Strong ETag from the exact response body."""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+def version_etag(*parts) -> str:
+    """Strong ETag from a record identity and version counter, without serializing the body."""
+    return '"' + ".".join(str(p) for p in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an ``If-None-Match`` header value matches ``etag``.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    ``W/`` prefix added by a proxy (e.g. after compression) still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    """Empty 304 response carrying the validator."""
+    return Response(status_code=304, headers={**cache_headers(etag), **(headers or {})})
@@ -0,0 +1,133 @@
+"""RedisStorage listing benchmark: KEYS + GET vs SCAN + MGET vs membership set.
+
+Fills a throwaway prefix with 10k, 100k and 1M job-sized documents and times
+listing them three ways:
+
+- ``keys+get``: the old ``list_all`` (one blocking KEYS, then one GET per key)
+- ``scan+mget``: ``RedisStorage.iter_all`` walking the keyspace with SCAN
+- ``members+mget``: ``iter_all`` with ``track_members`` (SSCAN of the member set)
+
+While each runs, a second connection PINGs Redis continuously; the worst PING
+latency shows how long other clients (e.g. the Celery broker) were stalled.
+
+Needs a running Redis at ``REDIS_URL``; everything it writes is deleted
+afterwards. Run from ``backend/``::
+
+    python -m benchmarks.bench_list_all [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import json
+import threading
+import time
+
+import redis
+
+from app.config import settings
+from app.storage import RedisStorage, redis_client
+
+PREFIX = "bench_list_all"
+DOCUMENT = {
+    "job_id": "00000000-0000-0000-0000-000000000000",
+    "status": "completed",
+    "collection_id": "64f1c0ffee0000000000beef",
+    "created_by": "user_0123456789ab",
+    "created_at": "2026-01-01T00:00:00",
+    "progress": 100,
+    "total_images": 40,
+    "processed_images": 40,
+}
+
+
+class PingMonitor:
+    """Measures the worst PING round trip on a separate connection."""
+
+    def __init__(self):
+        self._client = redis.from_url(settings.redis_url)
+        self._stop = threading.Event()
+        self.worst_ms = 0.0
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            self._client.ping()
+            self.worst_ms = max(self.worst_ms, (time.perf_counter() - start) * 1000)
+            time.sleep(0.001)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def fill(size: int, chunk: int = 10_000) -> None:
+    data = json.dumps(DOCUMENT)
+    storage = RedisStorage(PREFIX)
+    for start in range(0, size, chunk):
+        pipe = redis_client.pipeline(transaction=False)
+        keys = [f"job-{i:07d}" for i in range(start, min(start + chunk, size))]
+        for key in keys:
+            pipe.set(f"{PREFIX}:{key}", data)
+        pipe.sadd(storage.members_key, *keys)
+        pipe.execute()
+
+
+def clear() -> None:
+    batch = []
+    for name in redis_client.scan_iter(match=f"{PREFIX}:*", count=10_000):
+        batch.append(name)
+        if len(batch) >= 10_000:
+            redis_client.unlink(*batch)
+            batch = []
+    if batch:
+        redis_client.unlink(*batch)
+    redis_client.unlink(RedisStorage(PREFIX).members_key)
+
+
+def keys_then_get() -> int:
+    count = 0
+    for key in redis_client.keys(f"{PREFIX}:*"):
+        if redis_client.get(key):
+            count += 1
+    return count
+
+
+def run(label: str, fn) -> None:
+    with PingMonitor() as monitor:
+        start = time.perf_counter()
+        count = fn()
+        elapsed = time.perf_counter() - start
+    print(f"  {label:<16}{count:>10}{elapsed:>10.2f}{monitor.worst_ms:>16.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument(
+        "--legacy-max", type=int, default=100_000,
+        help="largest size to run keys+get on (one GET per key is very slow beyond this)",
+    )
+    args = parser.parse_args()
+
+    scan = RedisStorage(PREFIX, scan_count=settings.redis_scan_count)
+    members = RedisStorage(PREFIX, track_members=True, scan_count=settings.redis_scan_count)
+    try:
+        for size in args.sizes:
+            clear()
+            fill(size)
+            print(f"{size} keys (batch {settings.redis_scan_count})")
+            print(f"  {'strategy':<16}{'items':>10}{'s':>10}{'worst PING ms':>16}")
+            if size <= args.legacy_max:
+                run("keys+get", keys_then_get)
+            run("scan+mget", lambda: sum(1 for _ in scan.iter_all()))
+            run("members+mget", lambda: sum(1 for _ in members.iter_all()))
+    finally:
+        clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Serialization and compression benchmark for a large proposals payload.
+
+Builds a 2,000-proposal job response from the ``Proposal`` model, as
+``GET /jobs/{id}/proposals`` returns it, and compares the stdlib JSON path
+FastAPI uses by default with orjson, then reports the bytes on the wire
+uncompressed, gzipped and brotli-compressed.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_serialization
+"""
+
+import gzip
+import json
+import time
+import uuid
+from datetime import datetime
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.models import Proposal, ProposalResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROPOSAL_COUNT = 2000
+ROUNDS = 20
+
+
+def build_payload(count: int = PROPOSAL_COUNT) -> dict:
+    """The body ``GET /jobs/{id}/proposals`` sends: stored ``Proposal.model_dump()`` dicts."""
+    job_id = str(uuid.uuid4())
+    proposals = [
+        Proposal(
+            proposal_id=str(uuid.uuid4()),
+            job_id=job_id,
+            item_id=f"64f1c0ffee{i // 4:014d}",
+            field_name=f"{i % 4 + 1}-after-alt-text",
+            proposed_alt_text=(
+                f"Renovated kitchen in project {i // 4} with white shaker cabinets, "
+                "quartz countertops and a large island"
+            ),
+            confidence_score=0.9,
+            generated_at=datetime.now(),
+        )
+        for i in range(count)
+    ]
+    return ProposalResponse(job_id=job_id, proposals=proposals, total=count).model_dump()
+
+
+def _time(fn, rounds: int = ROUNDS) -> float:
+    """Best-of-``rounds`` wall time of ``fn()`` in milliseconds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    payload = build_payload()
+
+    def stdlib():
+        # What JSONResponse does for a dict returned from a route
+        return json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    def fast():
+        return orjson.dumps(payload)
+
+    body = fast()
+    print(f"Proposals: {PROPOSAL_COUNT}")
+    print(f"{'serializer':<28}{'ms':>10}")
+    print(f"{'jsonable_encoder + json':<28}{_time(stdlib):>10.2f}")
+    print(f"{'orjson':<28}{_time(fast):>10.2f}")
+    print()
+    print(f"{'encoding':<28}{'bytes':>10}{'ms':>10}")
+    print(f"{'identity':<28}{len(body):>10}{0:>10.2f}")
+    print(f"{'gzip (level 6)':<28}{len(gzip.compress(body, 6)):>10}{_time(lambda: gzip.compress(body, 6)):>10.2f}")
+    if brotli is not None:
+        size = len(brotli.compress(body, quality=4))
+        print(f"{'br (quality 4)':<28}{size:>10}{_time(lambda: brotli.compress(body, quality=4)):>10.2f}")
+    else:
+        print("br: brotli not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Storage codec benchmark: encode/decode time and bytes stored for a large job.
+
+Builds the value ``proposals_db`` stores for a 5,000-proposal job (a list of
+``Proposal.model_dump()`` dicts, as ``process_job_async`` writes it) and runs
+it through every ``StorageCodec`` configuration: the original untagged JSON,
+orjson and msgpack, each uncompressed and zstd-compressed.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_storage_codec [--proposals 5000]
+"""
+
+import argparse
+import time
+import uuid
+from datetime import datetime
+
+from app.models import Proposal
+from app.storage import StorageCodec, msgpack, zstandard
+
+ROUNDS = 10
+
+
+def build_proposals(count: int) -> list[dict]:
+    job_id = str(uuid.uuid4())
+    return [
+        Proposal(
+            proposal_id=str(uuid.uuid4()),
+            job_id=job_id,
+            item_id=f"64f1c0ffee{i // 4:014d}",
+            field_name=f"{i % 4 + 1}-after",
+            proposed_alt_text=(
+                f"Renovated kitchen in project {i // 4} with white shaker cabinets, "
+                "quartz countertops and a large island"
+            ),
+            confidence_score=0.9,
+            generated_at=datetime.now(),
+        ).model_dump()
+        for i in range(count)
+    ]
+
+
+def _time(fn, rounds: int = ROUNDS) -> float:
+    """Best-of-``rounds`` wall time of ``fn()`` in milliseconds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--proposals", type=int, default=5000)
+    args = parser.parse_args()
+
+    proposals = build_proposals(args.proposals)
+    configurations = [("json (untagged)", StorageCodec("json"))]
+    for fmt in ("orjson", "msgpack"):
+        if fmt == "msgpack" and msgpack is None:
+            print("msgpack: not installed")
+            continue
+        configurations.append((fmt, StorageCodec(fmt, compression_min_bytes=0)))
+        if zstandard is not None:
+            configurations.append((f"{fmt} + zstd", StorageCodec(fmt, compression_min_bytes=1)))
+    if zstandard is None:
+        print("zstd: zstandard not installed")
+
+    baseline = None
+    print(f"Proposals: {args.proposals}")
+    print(f"{'codec':<20}{'bytes':>12}{'ratio':>8}{'encode ms':>12}{'decode ms':>12}")
+    for label, codec in configurations:
+        data = codec.encode(proposals)
+        size = len(data)
+        baseline = baseline or size
+        encode_ms = _time(lambda: codec.encode(proposals))
+        decode_ms = _time(lambda: codec.decode(data))
+        print(f"{label:<20}{size:>12}{size / baseline:>8.2f}{encode_ms:>12.2f}{decode_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""Storage backend benchmark: the app's access patterns against each backend.
+
+Replays job progress polling, progress updates, proposal writes, user
+lookups, ``list_all`` and bulk ``set_many`` writes (see ``workloads``)
+against:
+
+- ``memory``: the tests' ``InMemoryStorage`` (the floor: no I/O or encoding)
+- ``redis``: ``RedisStorage`` on the Redis at ``REDIS_URL`` (skipped if it
+  isn't reachable; everything written is deleted afterwards)
+- ``cosmos``: ``CosmosStorage`` on an in-process container with injectable
+  round-trip latency (``fake_cosmos``)
+
+and reports ops/s and p50/p99 latency per operation (and, for Cosmos DB,
+requests per operation), optionally as JSON for comparing runs.
+
+Run from ``backend/``::
+
+    python -m benchmarks.storage [--backends memory redis cosmos] [--jobs 1000]
+        [--ops 1000] [--cosmos-latency-ms 5] [--json results.json]
+"""
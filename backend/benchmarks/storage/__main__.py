@@ -0,0 +1,151 @@
+import argparse
+import json
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import redis
+
+from app.config import settings
+from app.cosmos_storage import CosmosStorage
+from app.storage import RedisStorage, redis_client
+from benchmarks.storage import __doc__ as package_doc
+from benchmarks.storage.fake_cosmos import LatencyCosmosClient
+from benchmarks.storage.workloads import OPERATIONS, Scale, Workload
+
+REDIS_PREFIX = "bench_storage"
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already-sorted ``samples``."""
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def measure(fn, ops: int, requests=None) -> dict:
+    """Run ``fn`` ``ops`` times; ops/s and latency percentiles in ms."""
+    timings = []
+    requests_before = requests() if requests else 0
+    start = time.perf_counter()
+    for _ in range(ops):
+        op_start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - op_start) * 1000)
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    return {
+        "ops": ops,
+        "ops_per_s": round(ops / elapsed, 1),
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "requests_per_op": round((requests() - requests_before) / ops, 2) if requests else None,
+    }
+
+
+# --- Backends (each yields jobs, proposals, users and a request counter or None) ---
+
+@contextmanager
+def memory_backend(args) -> Iterator[tuple]:
+    from app.tests.conftest import InMemoryStorage
+
+    yield InMemoryStorage(), InMemoryStorage(), InMemoryStorage(), None
+
+
+def _clear_redis() -> None:
+    for pattern in (f"{REDIS_PREFIX}:*", f"idx:{REDIS_PREFIX}:*", f"idx:members:{REDIS_PREFIX}:*"):
+        batch = list(redis_client.scan_iter(match=pattern, count=10_000))
+        for start in range(0, len(batch), 10_000):
+            redis_client.unlink(*batch[start:start + 10_000])
+
+
+@contextmanager
+def redis_backend(args) -> Iterator[Optional[tuple]]:
+    try:
+        redis_client.ping()
+    except redis.RedisError as e:
+        print(f"redis: not reachable at {settings.redis_url} ({e}); skipped")
+        yield None
+        return
+    options = {"track_members": settings.redis_storage_member_sets, "scan_count": settings.redis_scan_count}
+    _clear_redis()
+    try:
+        yield (
+            RedisStorage(f"{REDIS_PREFIX}:job", **options),
+            RedisStorage(f"{REDIS_PREFIX}:proposals", **options),
+            RedisStorage(f"{REDIS_PREFIX}:users", **options),
+            None,
+        )
+    finally:
+        _clear_redis()
+
+
+@contextmanager
+def cosmos_backend(args) -> Iterator[tuple]:
+    client = LatencyCosmosClient(args.cosmos_latency_ms, args.cosmos_jitter_ms, seed=args.seed)
+    yield (
+        CosmosStorage(client, "bench", "jobs"),
+        CosmosStorage(client, "bench", "proposals"),
+        CosmosStorage(client, "bench", "users", partition_key_field="user_id"),
+        lambda: client.requests,
+    )
+
+
+BACKENDS = {"memory": memory_backend, "redis": redis_backend, "cosmos": cosmos_backend}
+
+
+def run_backend(name: str, args) -> Optional[dict]:
+    with BACKENDS[name](args) as stores:
+        if stores is None:
+            return None
+        jobs, proposals, users, requests = stores
+        scale = Scale(jobs=args.jobs, users=args.users, proposals_per_job=args.proposals_per_job,
+                      active_jobs=min(args.active_jobs, args.jobs), bulk_size=args.bulk_size)
+        workload = Workload(jobs, proposals, users, scale, seed=args.seed)
+        start = time.perf_counter()
+        workload.seed()
+        seed_s = time.perf_counter() - start
+
+        label = name if name != "cosmos" else f"cosmos (latency {args.cosmos_latency_ms} ms)"
+        print(f"{label}: seeded {scale.jobs} jobs, {scale.users} users in {seed_s:.2f}s")
+        print(f"  {'operation':<18}{'ops':>7}{'ops/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'reqs/op':>9}")
+        results = {}
+        for operation in args.operations:
+            ops = args.list_all_ops if operation in ("list_all", "bulk_write") else args.ops
+            result = measure(getattr(workload, operation), ops, requests)
+            results[operation] = result
+            reqs = f"{result['requests_per_op']:.2f}" if result["requests_per_op"] is not None else "-"
+            print(f"  {operation:<18}{result['ops']:>7}{result['ops_per_s']:>11.1f}"
+                  f"{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{reqs:>9}")
+        return {"seed_s": round(seed_s, 3), "operations": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=package_doc.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--proposals-per-job", type=int, default=40)
+    parser.add_argument("--active-jobs", type=int, default=50, help="jobs polled, updated and finished")
+    parser.add_argument("--ops", type=int, default=1000, help="iterations of each operation")
+    parser.add_argument("--list-all-ops", type=int, default=10, help="iterations of list_all and bulk_write")
+    parser.add_argument("--bulk-size", type=int, default=100, help="documents per set_many in bulk_write")
+    parser.add_argument("--cosmos-latency-ms", type=float, default=5.0, help="simulated round trip per request")
+    parser.add_argument("--cosmos-jitter-ms", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.backends:
+        result = run_backend(name, args)
+        if result is not None:
+            results[name] = result
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"parameters": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
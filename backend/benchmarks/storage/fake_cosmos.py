@@ -0,0 +1,112 @@
+"""In-process Cosmos DB container with a configurable round-trip latency.
+
+Drives the real ``CosmosStorage`` without an account or the emulator. Every
+request the SDK would send (a point read/write, one page of a query) sleeps
+for ``latency_ms`` (plus Gaussian ``jitter_ms``), and documents are
+serialized on the way in and out as they would be over the wire, so results
+reflect request counts and payload sizes rather than dict lookups.
+"""
+
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+import orjson
+from azure.cosmos.exceptions import CosmosResourceExistsError, CosmosResourceNotFoundError
+
+# Page size the service uses when a query sets no max_item_count
+DEFAULT_PAGE_SIZE = 100
+
+
+class LatencyCosmosContainer:
+    """Sync container supporting the operations and queries ``CosmosStorage`` issues."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, rng: Optional[random.Random] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = rng or random.Random(0)
+        self._items: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _round_trip(self) -> None:
+        # set_many upserts from several threads
+        with self._lock:
+            self.requests += 1
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay = max(0.0, self._rng.gauss(self.latency_ms, self.jitter_ms))
+        if delay:
+            time.sleep(delay / 1000)
+
+    def read_item(self, item: str, partition_key: str) -> dict:
+        self._round_trip()
+        if item not in self._items:
+            raise CosmosResourceNotFoundError(message=f"{item} not found")
+        return orjson.loads(self._items[item])
+
+    def create_item(self, body: dict) -> dict:
+        self._round_trip()
+        if body["id"] in self._items:
+            raise CosmosResourceExistsError(message=f"{body['id']} exists")
+        self._items[body["id"]] = orjson.dumps(body)
+        return body
+
+    def upsert_item(self, body: dict) -> dict:
+        self._round_trip()
+        self._items[body["id"]] = orjson.dumps(body)
+        return body
+
+    def delete_item(self, item: str, partition_key: str) -> None:
+        self._round_trip()
+        if self._items.pop(item, None) is None:
+            raise CosmosResourceNotFoundError(message=f"{item} not found")
+
+    def query_items(self, query: str, parameters=None, max_item_count: Optional[int] = None, **kwargs) -> Iterator[dict]:
+        if query == "SELECT c.data, c.blob FROM c":
+            def project(document):
+                return {field: document[field] for field in ("data", "blob") if field in document}
+            ids = list(self._items)
+        elif "ARRAY_CONTAINS(@ids, c.id)" in query:
+            def project(document):
+                return document
+            ids = [key for key in parameters[0]["value"] if key in self._items]
+        else:
+            raise NotImplementedError(query)
+        return self._pages(ids, project, max_item_count or DEFAULT_PAGE_SIZE)
+
+    def _pages(self, ids: list[str], project, page_size: int) -> Iterator[dict]:
+        # Like the SDK's ItemPaged: one request per page, issued as iteration reaches it
+        for start in range(0, max(len(ids), 1), page_size):
+            self._round_trip()
+            for key in ids[start:start + page_size]:
+                data = self._items.get(key)
+                if data is not None:
+                    yield project(orjson.loads(data))
+
+    def read(self) -> dict:
+        self._round_trip()
+        return {"id": "bench", "defaultTtl": None}
+
+
+class LatencyCosmosClient:
+    """``CosmosClient`` stand-in: one ``LatencyCosmosContainer`` per container name."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self.containers: dict[str, LatencyCosmosContainer] = {}
+
+    def get_database_client(self, database_name: str) -> "LatencyCosmosClient":
+        return self
+
+    def get_container_client(self, container_name: str) -> LatencyCosmosContainer:
+        if container_name not in self.containers:
+            self.containers[container_name] = LatencyCosmosContainer(self.latency_ms, self.jitter_ms, self._rng)
+        return self.containers[container_name]
+
+    @property
+    def requests(self) -> int:
+        return sum(container.requests for container in self.containers.values())
@@ -0,0 +1,117 @@
+"""The storage access patterns the app issues, as repeatable operations.
+
+Each operation mirrors a code path:
+
+- ``job_poll``: ``GET /api/v1/jobs/{id}`` while a job runs (one point read)
+- ``progress_update``: the worker's ``_update_progress`` (read, bump, write)
+- ``proposal_write``: a finished job storing its proposals
+  (``process_job_async``: one write of the whole list)
+- ``user_lookup``: login / ``find_user_by_email`` (unique-index lookup,
+  then a point read of the user)
+- ``list_all``: listing every job (full scan of the jobs store)
+- ``bulk_write``: retention archival replacing ``bulk_size`` jobs' proposals
+  with stubs in one ``set_many``
+"""
+
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from benchmarks.bench_storage_codec import build_proposals
+
+OPERATIONS = ("job_poll", "progress_update", "proposal_write", "user_lookup", "list_all", "bulk_write")
+
+# Proposals one CMS item yields (four image/alt-text field pairs)
+PROPOSALS_PER_ITEM = 4
+
+
+@dataclass
+class Scale:
+    jobs: int = 1000
+    users: int = 200
+    proposals_per_job: int = 40
+    # Jobs that are "running": polled, updated and finished
+    active_jobs: int = 50
+    # Documents per set_many in bulk_write
+    bulk_size: int = 100
+
+
+class Workload:
+    """Seeds jobs/proposals/users stores and replays operations against them."""
+
+    def __init__(self, jobs, proposals, users, scale: Scale, seed: int = 0):
+        self.jobs = jobs
+        self.proposals = proposals
+        self.users = users
+        self.scale = scale
+        self._rng = random.Random(seed)
+        self.job_ids: list[str] = []
+        self.active_job_ids: list[str] = []
+        self.emails: list[str] = []
+        self._job_proposals = build_proposals(scale.proposals_per_job)
+
+    def seed(self) -> None:
+        user_ids = []
+        for i in range(self.scale.users):
+            user_id = f"user_{uuid.UUID(int=self._rng.getrandbits(128)).hex[:12]}"
+            email = f"user{i}@example.com"
+            self.users.claim_unique("email", email, user_id)
+            self.users.set(user_id, {
+                "user_id": user_id,
+                "email": email,
+                "password_hash": "$2b$12$" + "x" * 53,
+                "display_name": f"User {i}",
+                "role": "user",
+                "is_active": True,
+                "created_at": datetime.now().isoformat(),
+            })
+            user_ids.append(user_id)
+            self.emails.append(email)
+
+        for i in range(self.scale.jobs):
+            job_id = str(uuid.UUID(int=self._rng.getrandbits(128)))
+            item_ids = [f"64f1c0ffee{i:08d}{n:06d}" for n in range(self.scale.proposals_per_job // PROPOSALS_PER_ITEM)]
+            self.jobs.set(job_id, {
+                "job_id": job_id,
+                "status": "completed",
+                "collection_id": "64f1c0ffee0000000000beef",
+                "item_ids": item_ids,
+                "created_at": datetime.now().isoformat(),
+                "created_by": self._rng.choice(user_ids) if user_ids else None,
+                "version": 1,
+                "progress": {"processed": len(item_ids), "total": len(item_ids), "percentage": 100.0},
+            })
+            self.proposals.set(job_id, self._job_proposals)
+            self.job_ids.append(job_id)
+        self.active_job_ids = self.job_ids[:self.scale.active_jobs]
+
+    # --- Operations ---
+
+    def job_poll(self) -> None:
+        self.jobs.get(self._rng.choice(self.active_job_ids))
+
+    def progress_update(self) -> None:
+        job_id = self._rng.choice(self.active_job_ids)
+        job = self.jobs.get(job_id)
+        progress = job["progress"]
+        progress["processed"] = (progress["processed"] + 1) % (progress["total"] + 1)
+        progress["percentage"] = progress["processed"] / progress["total"] * 100 if progress["total"] else 100.0
+        job["version"] += 1
+        self.jobs.set(job_id, job)
+
+    def proposal_write(self) -> None:
+        # Same size every time: the stored list doesn't grow across iterations
+        self.proposals.set(self._rng.choice(self.active_job_ids), self._job_proposals)
+
+    def user_lookup(self) -> None:
+        user_id = self.users.lookup_unique("email", self._rng.choice(self.emails))
+        self.users.get(user_id)
+
+    def list_all(self) -> None:
+        self.jobs.list_all()
+
+    def bulk_write(self) -> None:
+        job_ids = self._rng.sample(self.job_ids, min(self.scale.bulk_size, len(self.job_ids)))
+        stub = {"archived_at": datetime.now().isoformat(), "archive": "file", "total": self.scale.proposals_per_job}
+        self.proposals.set_many({job_id: stub for job_id in job_ids})
@@ -0,0 +1,33 @@
+"""Script to apply JOB_RETENTION_DAYS to existing job and proposal data.
+
+New writes get the retention TTL automatically, but Redis keys written
+before it was set never expire, and Cosmos DB containers only expire items
+once their ``defaultTtl`` is set. This adds the TTL to Redis keys that have
+none (found via SCAN, so safe against a live Redis) or sets the jobs and
+proposals containers' ``defaultTtl`` (removes it with JOB_RETENTION_DAYS=0).
+Safe to re-run.
+
+Usage (from backend/ directory):
+    python -m scripts.apply_retention
+"""
+from app.cached_storage import uncached
+from app.config import settings
+from app.storage import RedisStorage, jobs_db, proposals_db
+
+
+def apply_retention():
+    ttl_seconds = settings.job_retention_days * 86400 or None
+    for storage in map(uncached, (jobs_db, proposals_db)):
+        if isinstance(storage, RedisStorage):
+            if not ttl_seconds:
+                print(f"Skipping '{storage.prefix}': JOB_RETENTION_DAYS is not set")
+                continue
+            updated = storage.apply_ttl()
+            print(f"Set a {ttl_seconds}s TTL on {updated} '{storage.prefix}' key(s)")
+        else:
+            storage.set_default_ttl(ttl_seconds)
+            print(f"Container '{storage.container_name}' defaultTtl: {ttl_seconds or 'off'}")
+
+
+if __name__ == "__main__":
+    apply_retention()
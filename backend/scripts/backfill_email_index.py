@@ -0,0 +1,29 @@
+"""One-time script to add existing users to the email index.
+
+Login, register and invite look users up by email through a unique index
+in users_db. Users created before the index existed can't log in until
+they are indexed. Safe to re-run.
+
+Usage (from backend/ directory):
+    python -m scripts.backfill_email_index
+"""
+from app.storage import users_db
+from app.user_directory import EMAIL_INDEX, normalize_email
+
+
+def backfill_email_index():
+    indexed = 0
+    conflicts = 0
+    for user in users_db.iter_all():
+        email = normalize_email(user["email"])
+        if users_db.claim_unique(EMAIL_INDEX, email, user["user_id"]):
+            indexed += 1
+        else:
+            conflicts += 1
+            holder = users_db.lookup_unique(EMAIL_INDEX, email)
+            print(f"Conflict: {user['user_id']} and {holder} share email {email}")
+    print(f"Indexed {indexed} user(s), {conflicts} conflict(s)")
+
+
+if __name__ == "__main__":
+    backfill_email_index()
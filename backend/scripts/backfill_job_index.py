@@ -0,0 +1,27 @@
+"""One-time script to add existing jobs to the Redis job index.
+
+Jobs created before the index existed are not listed by GET /api/v1/jobs
+until they are indexed. Safe to re-run: indexing a job is idempotent.
+
+Usage (from backend/ directory):
+    python -m scripts.backfill_job_index
+"""
+from app.services.job_index import get_job_index
+from app.storage import jobs_db
+
+
+def backfill_job_index():
+    index = get_job_index()
+    indexed = 0
+    skipped = 0
+    for job in jobs_db.iter_all():
+        if not job.get("job_id") or not job.get("created_at"):
+            skipped += 1
+            continue
+        index.upsert(job)
+        indexed += 1
+    print(f"Indexed {indexed} job(s), skipped {skipped} without job_id/created_at")
+
+
+if __name__ == "__main__":
+    backfill_job_index()
@@ -0,0 +1,28 @@
+"""One-time script to build the Redis storage membership sets.
+
+With REDIS_STORAGE_MEMBER_SETS=true, RedisStorage lists a prefix from the
+set ``idx:members:{prefix}`` instead of scanning the keyspace. Keys written
+before the setting was enabled are not in the set until this script adds
+them. Uses SCAN, so it is safe to run against a live Redis. Safe to re-run.
+
+Usage (from backend/ directory):
+    python -m scripts.backfill_storage_members
+"""
+from app.cached_storage import uncached
+from app.storage import RedisStorage, jobs_db, proposals_db, settings_db, users_db
+
+
+def backfill_storage_members():
+    for storage in map(uncached, (jobs_db, proposals_db, users_db, settings_db)):
+        if not isinstance(storage, RedisStorage):
+            print(f"Skipping {type(storage).__name__} (not Redis storage)")
+            continue
+        if not storage.track_members:
+            print(f"Skipping '{storage.prefix}': REDIS_STORAGE_MEMBER_SETS is not enabled")
+            continue
+        added = storage.rebuild_members()
+        print(f"Added {added} key(s) to {storage.members_key}")
+
+
+if __name__ == "__main__":
+    backfill_storage_members()
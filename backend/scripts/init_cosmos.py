@@ -8,6 +8,9 @@ Requires COSMOS_DB_URL and COSMOS_DB_KEY in environment or .env file.
 from azure.cosmos import CosmosClient, PartitionKey
 from app.config import settings
 
+# Jobs and proposals expire after JOB_RETENTION_DAYS (None: never)
+RETENTION_TTL = settings.job_retention_days * 86400 or None
+
 
 def init_cosmos():
     if not settings.cosmos_db_url or not settings.cosmos_db_key:
@@ -25,6 +28,7 @@ def init_cosmos():
     database.create_container_if_not_exists(
         id=settings.cosmos_db_jobs_container,
         partition_key=PartitionKey(path="/job_id"),
+        default_ttl=RETENTION_TTL,
     )
     print(f"Container '{settings.cosmos_db_jobs_container}' ready (partition: /job_id)")
 
@@ -32,6 +36,7 @@ def init_cosmos():
     database.create_container_if_not_exists(
         id=settings.cosmos_db_proposals_container,
         partition_key=PartitionKey(path="/job_id"),
+        default_ttl=RETENTION_TTL,
     )
     print(f"Container '{settings.cosmos_db_proposals_container}' ready (partition: /job_id)")
 
@@ -49,6 +54,14 @@ def init_cosmos():
     )
     print(f"Container '{settings.cosmos_db_settings_container}' ready (partition: /scope)")
 
+    # Create proposals archive container (cold storage, never expires)
+    if settings.retention_archive == "cosmos":
+        database.create_container_if_not_exists(
+            id=settings.cosmos_db_archive_container,
+            partition_key=PartitionKey(path="/job_id"),
+        )
+        print(f"Container '{settings.cosmos_db_archive_container}' ready (partition: /job_id)")
+
     print("Cosmos DB initialization complete!")
 
 
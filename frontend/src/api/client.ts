@@ -1,3 +1,5 @@
+import type { ReactEventHandler } from 'react'
+
 // In production (Render), set VITE_API_URL to the backend service URL.
 // In local Docker dev, leave unset — nginx proxies /api/ to the backend.
 const BASE_URL = import.meta.env.VITE_API_URL ?? ''
@@ -33,8 +35,23 @@ function getToken(): string | null {
   try { return sessionStorage.getItem('session_token') } catch { return null }
 }
 
+// Last ETag + body per GET URL, so unchanged responses come back as 304s
+const ETAG_CACHE_LIMIT = 200
+const etagCache = new Map<string, { etag: string; body: unknown }>()
+
+function rememberEtag(url: string, etag: string, body: unknown) {
+  etagCache.delete(url)
+  etagCache.set(url, { etag, body })
+  if (etagCache.size > ETAG_CACHE_LIMIT) {
+    // Maps iterate in insertion order: drop the least recently stored entry
+    etagCache.delete(etagCache.keys().next().value as string)
+  }
+}
+
 function clearToken() {
   sessionToken = null
+  thumbnailToken = null
+  etagCache.clear()
   try { sessionStorage.removeItem('session_token') } catch { /* ignore */ }
 }
 
@@ -51,6 +68,12 @@ async function request<T>(url: string, options: FetchOptions = {}): Promise<T> {
     headers['Authorization'] = `Bearer ${token}`
   }
 
+  const isGet = (rest.method ?? 'GET') === 'GET'
+  const cached = isGet ? etagCache.get(url) : undefined
+  if (cached) {
+    headers['If-None-Match'] = cached.etag
+  }
+
   let body = rest.body
   if (json !== undefined) {
     headers['Content-Type'] = 'application/json'
@@ -71,6 +94,10 @@ async function request<T>(url: string, options: FetchOptions = {}): Promise<T> {
     throw new ApiError(0, `Network error: ${networkErr instanceof Error ? networkErr.message : 'request failed'}`)
   }
 
+  if (res.status === 304 && cached) {
+    return cached.body as T
+  }
+
   if (!res.ok) {
     const text = await res.text().catch(() => res.statusText)
     const err = new ApiError(res.status, text)
@@ -84,7 +111,64 @@ async function request<T>(url: string, options: FetchOptions = {}): Promise<T> {
     throw err
   }
 
-  return res.json()
+  const data = await res.json()
+  const etag = res.headers.get('ETag')
+  if (isGet && etag) {
+    rememberEtag(url, etag, data)
+  }
+  return data
+}
+
+export interface ServerEvent {
+  event: string
+  data: unknown
+}
+
+// Read a Server-Sent Events stream with fetch (not EventSource) so the
+// Bearer token fallback works. Resolves when the server closes the stream.
+async function streamEvents(
+  url: string,
+  onEvent: (event: ServerEvent) => void,
+  signal?: AbortSignal,
+): Promise<void> {
+  const headers: Record<string, string> = { Accept: 'text/event-stream' }
+  const token = getToken()
+  if (token) {
+    headers['Authorization'] = `Bearer ${token}`
+  }
+
+  const res = await fetch(`${BASE_URL}${url}`, { headers, credentials: 'include', signal })
+  if (!res.ok || !res.body) {
+    if (res.status === 401) {
+      clearToken()
+      window.dispatchEvent(new CustomEvent('auth:unauthorized'))
+    }
+    throw new ApiError(res.status, await res.text().catch(() => res.statusText))
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) return
+    buffer += value
+
+    // Frames are separated by a blank line; comment lines (":") are keep-alives
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      const frame = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf('\n\n')
+
+      let event = 'message'
+      const data: string[] = []
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7)
+        else if (line.startsWith('data: ')) data.push(line.slice(6))
+      }
+      if (data.length > 0) onEvent({ event, data: JSON.parse(data.join('\n')) })
+    }
+  }
 }
 
 export const api = {
@@ -93,6 +177,65 @@ export const api = {
   put: <T>(url: string, json?: unknown) => request<T>(url, { method: 'PUT', json }),
   patch: <T>(url: string, json?: unknown) => request<T>(url, { method: 'PATCH', json }),
   delete: <T>(url: string) => request<T>(url, { method: 'DELETE' }),
+  events: streamEvents,
+}
+
+// Widths served by GET /api/v1/thumbnails (THUMBNAIL_WIDTHS on the backend)
+const THUMBNAIL_WIDTHS = [160, 320, 640]
+
+// <img src> requests can't send the Bearer header (and cross-site cookies
+// may be blocked), so thumbnail URLs carry a short-lived signed token
+export interface ThumbnailToken {
+  token: string
+  expires_at: number
+}
+
+// Fetch a new token once the current one has less than this left (seconds)
+export const THUMBNAIL_TOKEN_MARGIN = 60
+
+let thumbnailToken: ThumbnailToken | null = null
+let thumbnailTokenRequest: Promise<ThumbnailToken> | null = null
+
+// Current thumbnail token; concurrent callers share one request
+export function fetchThumbnailToken(): Promise<ThumbnailToken> {
+  if (thumbnailToken && thumbnailToken.expires_at - Date.now() / 1000 > THUMBNAIL_TOKEN_MARGIN) {
+    return Promise.resolve(thumbnailToken)
+  }
+  if (!thumbnailTokenRequest) {
+    thumbnailTokenRequest = request<ThumbnailToken>('/api/v1/auth/thumbnail-token')
+      .then((fetched) => {
+        thumbnailToken = fetched
+        return fetched
+      })
+      .finally(() => {
+        thumbnailTokenRequest = null
+      })
+  }
+  return thumbnailTokenRequest
+}
+
+// Resized thumbnail URLs for a Webflow image; uses the original when the
+// image has no file ID or there is no token yet, and switches to it if a
+// thumbnail fails to load
+export function thumbnailSources(
+  fileId: string | null,
+  imageUrl: string,
+  token: string | null,
+): { src: string; srcSet?: string; onError?: ReactEventHandler<HTMLImageElement> } {
+  if (!fileId || !token) return { src: imageUrl }
+  const urlFor = (width: number) =>
+    `${BASE_URL}/api/v1/thumbnails/${encodeURIComponent(fileId)}?w=${width}` +
+    `&src=${encodeURIComponent(imageUrl)}&t=${encodeURIComponent(token)}`
+  return {
+    src: urlFor(THUMBNAIL_WIDTHS[1]),
+    srcSet: THUMBNAIL_WIDTHS.map((width) => `${urlFor(width)} ${width}w`).join(', '),
+    onError: (event) => {
+      const img = event.currentTarget
+      if (img.src === imageUrl) return
+      img.removeAttribute('srcset')
+      img.src = imageUrl
+    },
+  }
 }
 
 export { ApiError, setToken, clearToken }
@@ -53,7 +53,7 @@ export function AppLayout() {
         const [itemId, fieldName] = imageKey.split(':')
         updates.push({
           item_id: itemId,
-          field_name: `${fieldName}-alt-text`,
+          field_name: fieldName,
           alt_text: text,
         })
       }
@@ -4,10 +4,13 @@ import { Checkbox } from '@/components/ui/checkbox'
 import { Badge } from '@/components/ui/badge'
 import { Textarea } from '@/components/ui/textarea'
 import { Separator } from '@/components/ui/separator'
+import { thumbnailSources } from '../api/client'
+import { useThumbnailToken } from '../hooks/useThumbnailToken'
 
 interface ImageCardProps {
   imageKey: string
   imageUrl: string | null
+  fileId: string | null
   fieldName: string
   itemName: string
   currentAltText: string | null
@@ -22,6 +25,7 @@ interface ImageCardProps {
 
 export function ImageCard({
   imageUrl,
+  fileId,
   fieldName,
   itemName,
   currentAltText,
@@ -33,6 +37,7 @@ export function ImageCard({
   onTextChange,
   onAcceptSuggestion,
 }: ImageCardProps) {
+  const thumbnailToken = useThumbnailToken()
   const charCount = displayText.length
   const isOverLimit = charCount > 125
 
@@ -42,7 +47,10 @@ export function ImageCard({
       <div className="relative">
         {imageUrl ? (
           <img
-            src={imageUrl}
+            {...thumbnailSources(fileId, imageUrl, thumbnailToken)}
+            sizes="(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+            loading="lazy"
+            decoding="async"
             alt={currentAltText || 'No alt text'}
             className="w-full h-48 object-cover"
           />
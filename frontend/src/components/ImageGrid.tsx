@@ -63,6 +63,7 @@ export function ImageGrid({
           key={img.imageKey}
           imageKey={img.imageKey}
           imageUrl={img.image_url}
+          fileId={img.file_id}
           fieldName={img.field_name}
           itemName={img.itemName}
           currentAltText={img.current_alt_text}
@@ -1,10 +1,13 @@
 import { Sparkles } from 'lucide-react'
 import { Button } from '@/components/ui/button'
 import { Textarea } from '@/components/ui/textarea'
+import { thumbnailSources } from '../api/client'
+import { useThumbnailToken } from '../hooks/useThumbnailToken'
 
 interface ImageRowProps {
   imageKey: string
   imageUrl: string
+  fileId: string | null
   fieldName: string
   itemName: string
   currentAltText: string
@@ -19,6 +22,7 @@ interface ImageRowProps {
 
 export function ImageRow({
   imageUrl,
+  fileId,
   fieldName,
   itemName,
   currentAltText,
@@ -30,6 +34,7 @@ export function ImageRow({
   onTextChange,
   onAcceptSuggestion,
 }: ImageRowProps) {
+  const thumbnailToken = useThumbnailToken()
   const charCount = displayText.length
   const isOverLimit = charCount > 125
 
@@ -57,7 +62,10 @@ export function ImageRow({
       {/* Thumbnail */}
       <div className="shrink-0">
         <img
-          src={imageUrl}
+          {...thumbnailSources(fileId, imageUrl, thumbnailToken)}
+          sizes="80px"
+          loading="lazy"
+          decoding="async"
           alt="Preview"
           className="w-20 h-20 rounded object-cover border bg-muted"
         />
@@ -143,6 +143,7 @@ export function MainPanel({
                   key={image.imageKey}
                   imageKey={image.imageKey}
                   imageUrl={image.image_url || ''}
+                  fileId={image.file_id}
                   fieldName={image.field_name}
                   itemName={image.itemName}
                   currentAltText={image.current_alt_text || ''}
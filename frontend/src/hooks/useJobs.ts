@@ -2,6 +2,10 @@ import { useState, useCallback, useRef, useEffect } from 'react'
 import type { JobResponse, Proposal } from '../types'
 import { api } from '../api/client'
 
+// Give up on a job's event stream after this long and poll instead. A little
+// longer than the server's JOB_EVENTS_MAX_STREAM_SECONDS (30 min) default.
+const STREAM_DEADLINE_MS = 31 * 60 * 1000
+
 export function useJobs() {
   const [generating, setGenerating] = useState(false)
   const [currentJob, setCurrentJob] = useState<JobResponse | null>(null)
@@ -9,14 +13,37 @@ export function useJobs() {
   const [draftTexts, setDraftTexts] = useState<Map<string, string>>(new Map())
   const [generatedTexts, setGeneratedTexts] = useState<Map<string, string>>(new Map())
   const pollRef = useRef<ReturnType<typeof setTimeout> | null>(null)
+  const streamRef = useRef<AbortController | null>(null)
 
-  // Cleanup polling on unmount
+  // Cleanup polling and the event stream on unmount
   useEffect(() => {
     return () => {
       if (pollRef.current) clearTimeout(pollRef.current)
+      streamRef.current?.abort()
     }
   }, [])
 
+  // Populate generatedTexts but never overwrite draftTexts
+  const addGeneratedTexts = useCallback((items: Proposal[]) => {
+    setGeneratedTexts((prev) => {
+      const next = new Map(prev)
+      for (const p of items) {
+        const key = `${p.item_id}:${p.field_name.replace('-alt-text', '')}`
+        next.set(key, p.proposed_alt_text)
+      }
+      return next
+    })
+  }, [])
+
+  const loadProposals = useCallback(async (jobId: string) => {
+    const data = await api.get<{ proposals: Proposal[] }>(
+      `/api/v1/jobs/${jobId}/proposals`
+    )
+    setProposals(data.proposals)
+    addGeneratedTexts(data.proposals)
+  }, [addGeneratedTexts])
+
+  // Fallback when the event stream is unavailable
   const pollJobStatus = useCallback(async (jobId: string) => {
     const maxAttempts = 60
     let attempts = 0
@@ -27,21 +54,7 @@ export function useJobs() {
         setCurrentJob(job)
 
         if (job.status === 'completed') {
-          const data = await api.get<{ proposals: Proposal[] }>(
-            `/api/v1/jobs/${jobId}/proposals`
-          )
-          setProposals(data.proposals)
-
-          // Populate generatedTexts but never overwrite draftTexts
-          setGeneratedTexts((prev) => {
-            const next = new Map(prev)
-            for (const p of data.proposals) {
-              const key = `${p.item_id}:${p.field_name.replace('-alt-text', '')}`
-              next.set(key, p.proposed_alt_text)
-            }
-            return next
-          })
-
+          await loadProposals(jobId)
           setGenerating(false)
           return
         }
@@ -64,7 +77,60 @@ export function useJobs() {
     }
 
     poll()
-  }, [])
+  }, [loadProposals])
+
+  // Follow a job over Server-Sent Events: progress and proposals arrive as they happen
+  const watchJob = useCallback(async (jobId: string) => {
+    streamRef.current?.abort()
+    const controller = new AbortController()
+    streamRef.current = controller
+    // Set inside the event callback, so keep TypeScript from narrowing it to null
+    let outcome = null as 'completed' | 'failed' | null
+    let timedOut = false
+    const deadline = setTimeout(() => {
+      timedOut = true
+      controller.abort()
+    }, STREAM_DEADLINE_MS)
+
+    try {
+      await api.events(`/api/v1/jobs/${jobId}/events`, ({ event, data }) => {
+        if (event === 'status') {
+          setCurrentJob(data as JobResponse)
+        } else if (event === 'progress') {
+          const progress = data as JobResponse['progress']
+          setCurrentJob((prev) => (prev ? { ...prev, status: 'processing', progress } : prev))
+        } else if (event === 'proposal') {
+          const proposal = data as Proposal
+          setProposals((prev) => [...prev, proposal])
+          addGeneratedTexts([proposal])
+        } else if (event === 'completed' || event === 'failed') {
+          outcome = event
+          setCurrentJob((prev) => (prev ? { ...prev, status: event } : prev))
+        }
+      }, controller.signal)
+    } catch (err) {
+      // Aborted by unmount or a newer watchJob (not our deadline): stop here
+      if (controller.signal.aborted && !timedOut) return
+      console.warn('Job event stream failed, falling back to polling:', err)
+    } finally {
+      clearTimeout(deadline)
+    }
+
+    if (outcome === null) {
+      // Stream dropped, closed by the server or timed out before the job finished
+      pollJobStatus(jobId)
+      return
+    }
+
+    if (outcome === 'completed') {
+      try {
+        await loadProposals(jobId)
+      } catch (err) {
+        console.error('Failed to load proposals:', err)
+      }
+    }
+    setGenerating(false)
+  }, [addGeneratedTexts, loadProposals, pollJobStatus])
 
   const generateAltText = useCallback(
     async (selectedImages: Set<string>) => {
@@ -85,13 +151,13 @@ export function useJobs() {
           image_keys: [...selectedImages],
         })
         setCurrentJob(job)
-        pollJobStatus(job.job_id)
+        watchJob(job.job_id)
       } catch (err) {
         console.error('Failed to generate alt text:', err)
         setGenerating(false)
       }
     },
-    [pollJobStatus]
+    [watchJob]
   )
 
   // Update user-typed draft text for a specific image
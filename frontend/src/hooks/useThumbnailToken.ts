@@ -0,0 +1,34 @@
+import { useEffect, useState } from 'react'
+import { fetchThumbnailToken, THUMBNAIL_TOKEN_MARGIN } from '../api/client'
+
+// Token for thumbnail URLs, renewed shortly before it expires. Null until
+// loaded (or if it can't be fetched): images then show the originals.
+export function useThumbnailToken(): string | null {
+  const [token, setToken] = useState<string | null>(null)
+
+  useEffect(() => {
+    let cancelled = false
+    let timer: ReturnType<typeof setTimeout> | undefined
+
+    const load = () => {
+      fetchThumbnailToken()
+        .then((fetched) => {
+          if (cancelled) return
+          setToken(fetched.token)
+          const renewIn = (fetched.expires_at - THUMBNAIL_TOKEN_MARGIN) * 1000 - Date.now()
+          timer = setTimeout(load, Math.max(renewIn, 1000))
+        })
+        .catch((err) => {
+          console.error('Failed to load thumbnail token:', err)
+        })
+    }
+
+    load()
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [])
+
+  return token
+}
@@ -50,9 +50,13 @@ export interface Proposal {
 export interface ApplyResult {
   success_count: number
   failure_count: number
+  published_count: number
+  publish_mode: 'immediate' | 'batch' | 'staged'
   results: Array<{
     item_id: string
     success: boolean
+    published?: boolean
     error?: string
+    publish_error?: string
   }>
 }